@@ -0,0 +1,10 @@
+from flask_app.asgi.app import create_asgi_app
+from flask_app.config import get_flask_config
+
+flask_config = get_flask_config()
+app = create_asgi_app(flask_config)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host=flask_config.host, port=flask_config.port)
@@ -0,0 +1,235 @@
+"""
+Fast DataFrame -> database loading used by the seeding scripts.
+
+On Postgres rows are streamed with ``COPY ... FROM STDIN``, which skips
+per-row statement parsing and ORM object construction entirely. Other
+dialects (SQLite in tests and development) fall back to a multi-row
+``executemany`` insert. Either way the frame is written in chunks so the
+text buffer stays bounded regardless of the frame size.
+
+When ``conflict_columns`` is given the rows are upserted instead:
+``ON CONFLICT (...) DO NOTHING`` or ``DO UPDATE``. COPY cannot resolve
+conflicts itself, so on Postgres each chunk is copied into a temporary
+staging table and moved with a single ``INSERT ... SELECT ... ON CONFLICT``.
+One such statement cannot affect a row twice, so rows repeating a conflict
+key within a chunk are reduced to the one that would have won had the rows
+been written one by one.
+"""
+import io
+from typing import Final
+
+import pandas as pd
+from sqlalchemy import Date, column, insert, select, table as table_clause
+from sqlalchemy.dialects import postgresql, sqlite
+
+DEFAULT_CHUNK_SIZE: Final[int] = 50_000
+ON_CONFLICT_CHOICES: Final[tuple] = ("nothing", "update")
+
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def build_copy_sql(table, columns, dialect):
+    """
+    Build the ``COPY ... FROM STDIN`` statement for a table.
+
+    Parameters
+    ----------
+    table : Table
+        The target table.
+    columns : list of str
+        The columns present in the data, in order.
+    dialect : Dialect
+        The dialect used to quote identifiers.
+
+    Returns
+    -------
+    str
+        The COPY statement reading CSV from standard input.
+    """
+    preparer = dialect.identifier_preparer
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    return (
+        f"COPY {preparer.format_table(table)} ({column_list}) "
+        "FROM STDIN WITH (FORMAT csv, NULL '')"
+    )
+
+
+def build_upsert(dialect_name, table, columns, conflict_columns,
+                 on_conflict="nothing"):
+    """
+    Build an ``INSERT ... ON CONFLICT`` statement for a table.
+
+    Parameters
+    ----------
+    dialect_name : str
+        ``"postgresql"`` or ``"sqlite"``.
+    table : Table
+        The target table.
+    columns : list of str
+        The columns being written.
+    conflict_columns : list of str
+        The unique columns that identify an existing row.
+    on_conflict : str
+        ``"nothing"`` keeps the existing row, ``"update"`` overwrites its
+        non-key columns with the incoming values.
+
+    Returns
+    -------
+    Insert
+        The dialect-specific upsert statement.
+
+    Raises
+    ------
+    ValueError
+        If the dialect has no upsert support or ``on_conflict`` is invalid.
+    """
+    dialect_insert = _UPSERT_INSERTS.get(dialect_name)
+    if dialect_insert is None:
+        raise ValueError(f"Upserts are not supported on {dialect_name}.")
+    if on_conflict not in ON_CONFLICT_CHOICES:
+        raise ValueError(
+            f"Invalid on_conflict value: {on_conflict}. "
+            f"Please use one of {ON_CONFLICT_CHOICES}."
+        )
+    statement = dialect_insert(table)
+    if on_conflict == "nothing":
+        return statement.on_conflict_do_nothing(index_elements=conflict_columns)
+    updated_columns = {
+        name: statement.excluded[name]
+        for name in columns if name not in conflict_columns
+    }
+    return statement.on_conflict_do_update(
+        index_elements=conflict_columns, set_=updated_columns)
+
+
+def iter_chunks(df, chunk_size):
+    """
+    Yield consecutive row slices of at most ``chunk_size`` rows.
+    """
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def iter_upsert_chunks(df, chunk_size, conflict_columns, on_conflict):
+    """
+    Yield chunks without repeated ``conflict_columns`` values.
+
+    The last row of a key is kept for ``"update"``, the first one for
+    ``"nothing"``.
+    """
+    keep = "last" if on_conflict == "update" else "first"
+    for chunk in iter_chunks(df, chunk_size):
+        yield chunk.drop_duplicates(subset=conflict_columns, keep=keep)
+
+
+def _copy_chunk(cursor, copy_sql, chunk):
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor.copy_expert(copy_sql, buffer)
+
+
+def _copy_chunks(connection, table, df, chunk_size):
+    copy_sql = build_copy_sql(table, list(df.columns), connection.dialect)
+    raw_connection = connection.connection.driver_connection
+    with raw_connection.cursor() as cursor:
+        for chunk in iter_chunks(df, chunk_size):
+            _copy_chunk(cursor, copy_sql, chunk)
+
+
+def _copy_upsert_chunks(connection, table, df, chunk_size, conflict_columns,
+                        on_conflict):
+    columns = list(df.columns)
+    preparer = connection.dialect.identifier_preparer
+    staging_name = f"_staging_{table.name}"
+    column_list = ", ".join(preparer.quote(name) for name in columns)
+    # columns only: no defaults, so the id sequence is not consumed
+    connection.exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {preparer.quote(staging_name)} "
+        f"ON COMMIT DROP AS SELECT {column_list} "
+        f"FROM {preparer.format_table(table)} WITH NO DATA"
+    )
+    staging = table_clause(staging_name, *(column(name) for name in columns))
+    copy_sql = build_copy_sql(staging, columns, connection.dialect)
+    move_rows = build_upsert(
+        "postgresql", table, columns, conflict_columns, on_conflict
+    ).from_select(columns, select(*staging.c))
+    clear_staging = f"TRUNCATE {preparer.quote(staging_name)}"
+
+    raw_connection = connection.connection.driver_connection
+    for chunk in iter_upsert_chunks(df, chunk_size, conflict_columns,
+                                    on_conflict):
+        with raw_connection.cursor() as cursor:
+            _copy_chunk(cursor, copy_sql, chunk)
+        connection.execute(move_rows)
+        connection.exec_driver_sql(clear_staging)
+
+
+def _to_records(table, chunk):
+    """
+    Convert a chunk to executemany parameters with Python scalars.
+
+    NaN/NaT become ``None`` and ``Date`` columns become ``datetime.date``,
+    which drivers such as sqlite3 require.
+    """
+    chunk = chunk.copy()
+    for column_name in chunk.columns:
+        if isinstance(table.c[column_name].type, Date):
+            chunk[column_name] = pd.to_datetime(chunk[column_name]).dt.date
+    chunk = chunk.astype(object).where(chunk.notna(), None)
+    return chunk.to_dict("records")
+
+
+def _insert_chunks(connection, table, chunks, statement):
+    for chunk in chunks:
+        connection.execute(statement, _to_records(table, chunk))
+
+
+def copy_dataframe(connection, table, df, chunk_size=DEFAULT_CHUNK_SIZE,
+                   conflict_columns=None, on_conflict="nothing"):
+    """
+    Write a DataFrame into a table in bounded-size chunks.
+
+    Parameters
+    ----------
+    connection : Connection
+        The SQLAlchemy connection; the caller owns the transaction.
+    table : Table
+        The target table. DataFrame column names must match its columns.
+    df : pandas.DataFrame
+        The rows to write.
+    chunk_size : int
+        Number of rows sent per COPY / executemany call.
+    conflict_columns : list of str, optional
+        Unique columns used to upsert instead of plainly inserting.
+    on_conflict : str
+        ``"nothing"`` or ``"update"``; only used with ``conflict_columns``.
+
+    Returns
+    -------
+    int
+        The number of rows processed.
+    """
+    if df.empty:
+        return 0
+    dialect_name = connection.dialect.name
+    if conflict_columns is None:
+        if dialect_name == "postgresql":
+            _copy_chunks(connection, table, df, chunk_size)
+        else:
+            _insert_chunks(connection, table, iter_chunks(df, chunk_size),
+                           insert(table))
+    elif dialect_name == "postgresql":
+        _copy_upsert_chunks(connection, table, df, chunk_size,
+                            conflict_columns, on_conflict)
+    else:
+        statement = build_upsert(dialect_name, table, list(df.columns),
+                                 conflict_columns, on_conflict)
+        _insert_chunks(connection, table,
+                       iter_upsert_chunks(df, chunk_size, conflict_columns,
+                                          on_conflict),
+                       statement)
+    return len(df)
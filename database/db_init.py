@@ -1,17 +1,19 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from database.engine import create_engine_from_config
 from flask_app.config import get_flask_config
 
 
 def get_engine_and_session(config=None):
     """
     Create SQLAlchemy engine and sessionmaker from a database URI.
+
+    The engine gets the ``SQLALCHEMY_ENGINE_OPTIONS`` Flask-SQLAlchemy
+    uses, so the pool settings apply to both.
     """
     if config is None:
         config = get_flask_config()
-    database_uri = config.SQLALCHEMY_DATABASE_URI
-    engine = create_engine(database_uri)
+    engine = create_engine_from_config(config)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return engine, SessionLocal
 
@@ -1,26 +1,61 @@
+import argparse
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from logging import basicConfig, INFO, getLogger
 from pathlib import Path
 from typing import Final
 
 import pandas as pd
 import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
 
+from database.bulk_load import (
+    DEFAULT_CHUNK_SIZE,
+    ON_CONFLICT_CHOICES,
+    copy_dataframe,
+)
+from database.engine import make_engine
+from database.manifest import FileStatus, check_manifest, record_ingestion
+from database.migrations import ensure_indexes
+from database.order_stats import refresh_order_stats
 from database.models.base import Base
 from database.models.users import User
 from database.models.orders import Order
 
 DATA_PATH: Final[Path] = Path(__file__).parents[1] / 'data'
 
+logger = getLogger(__name__)
 
-def create_tables(bind):
+DEFAULT_SEED: Final[int] = 911
+
+# dtypes applied while parsing, so chunks never go through object columns
+USERS_DTYPES: Final[dict] = {'city': 'category'}
+ORDERS_DTYPES: Final[dict] = {
+    'product': 'category',
+    'quantity': 'Int32',
+    'total_price': 'float64',
+}
+ORDERS_PARSE_DATES: Final[list] = ['order_date']
+
+
+def create_tables(bind, concurrent_indexes=False):
     """
-    Create all tables defined on Base.metadata.
+    Create all tables defined on Base.metadata, then add any model index
+    missing from tables that already existed.
 
     Parameters
     ----------
     bind : Engine or Connection
         The database bind to use.
+    concurrent_indexes : bool
+        Build the missing indexes with ``CREATE INDEX CONCURRENTLY`` on
+        PostgreSQL, so a live database keeps accepting writes meanwhile.
     """
     Base.metadata.create_all(bind)
+    ensure_indexes(bind, concurrently=concurrent_indexes)
 
 
 def seed_data(session):
@@ -64,64 +99,472 @@ def find_csvs_in_directory(directory: Path):
     list of Path
         A list of paths to CSV files found in the directory.
     """
-    return list(directory.glob("*.csv"))
+    return sorted(directory.glob("*.csv"))
+
+
+def _find_csvs_or_raise(directory: Path):
+    csvs = find_csvs_in_directory(directory)
+    if not csvs:
+        raise FileNotFoundError(f"No CSV files found in {directory}")
+    return csvs
+
+
+def iter_csv_chunks(csv_paths, chunksize=DEFAULT_CHUNK_SIZE, dtype=None,
+                    parse_dates=None):
+    """
+    Lazily read CSV files chunk by chunk.
+
+    Parameters
+    ----------
+    csv_paths : iterable of Path
+        The ``;``-separated CSV files to read, in order.
+    chunksize : int
+        Maximum number of rows per yielded DataFrame.
+    dtype : dict, optional
+        Column dtypes applied while parsing.
+    parse_dates : list of str, optional
+        Columns parsed as dates while reading.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Consecutive chunks; only one chunk is held in memory at a time.
+    """
+    for csv_path in csv_paths:
+        with pd.read_csv(csv_path, sep=';', chunksize=chunksize, dtype=dtype,
+                         parse_dates=parse_dates) as reader:
+            yield from reader
+
+
+def iter_users_csv_chunks(data_path: Path = DATA_PATH,
+                          chunksize=DEFAULT_CHUNK_SIZE):
+    user_csvs = _find_csvs_or_raise(data_path / 'users')
+    return iter_csv_chunks(user_csvs, chunksize, dtype=USERS_DTYPES)
+
+
+def iter_orders_csv_chunks(data_path: Path = DATA_PATH,
+                           chunksize=DEFAULT_CHUNK_SIZE):
+    order_csvs = _find_csvs_or_raise(data_path / 'orders')
+    return iter_csv_chunks(order_csvs, chunksize, dtype=ORDERS_DTYPES,
+                           parse_dates=ORDERS_PARSE_DATES)
+
+
+def seed_users_csv_data(data_path: Path = DATA_PATH):
+    """
+    Load every users CSV into one DataFrame (small data sets only).
+    """
+    return pd.concat(iter_users_csv_chunks(data_path), ignore_index=True)
+
+
+def seed_orders_csv_data(data_path: Path = DATA_PATH):
+    """
+    Load every orders CSV into one DataFrame (small data sets only).
+    """
+    return pd.concat(iter_orders_csv_chunks(data_path), ignore_index=True)
+
+
+@dataclass
+class FileLoadResult:
+    """
+    Outcome of loading a single CSV file.
+    """
+    path: Path
+    rows: int
+    seconds: float
+    skipped: bool = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else float('inf')
+
+
+def _log_file_load(result: FileLoadResult) -> None:
+    if result.skipped:
+        logger.info(f"Skipped {result.path.name}: already ingested")
+        return
+    logger.info(
+        f"Loaded {result.path.name}: {result.rows} rows in "
+        f"{result.seconds:.2f}s ({result.rows_per_second:,.0f} rows/s)"
+    )
+
+
+def load_users_csv(connection, csv_path: Path, chunk_size=DEFAULT_CHUNK_SIZE,
+                   on_conflict='nothing'):
+    """
+    Stream one users CSV into the ``users`` table.
+
+    Rows are upserted on ``email``: ``on_conflict='nothing'`` keeps existing
+    users, ``'update'`` overwrites their name and city.
+
+    Returns
+    -------
+    FileLoadResult
+        The number of rows processed and the time it took.
+    """
+    start = time.perf_counter()
+    rows = 0
+    for users_chunk in iter_csv_chunks([csv_path], chunk_size,
+                                       dtype=USERS_DTYPES):
+        rows += copy_dataframe(
+            connection, User.__table__, users_chunk, chunk_size,
+            conflict_columns=['email'], on_conflict=on_conflict)
+    return FileLoadResult(csv_path, rows, time.perf_counter() - start)
+
+
+def fetch_user_ids(connection) -> np.ndarray:
+    """
+    Fetch the ids of every user into a NumPy array with a single query.
+
+    The ids are ordered by email: parallel workers commit the users files
+    in any order, so ids differ between runs, while the position of a user
+    in the email order depends only on the set of users. Draws by position
+    therefore pick the same customers whatever the number of workers.
+
+    Raises
+    ------
+    ValueError
+        If there are no users to assign orders to.
+    """
+    users = User.__table__
+    result = connection.execute(select(users.c.id).order_by(users.c.email))
+    user_ids = np.fromiter(result.scalars(), dtype=np.int64)
+    if user_ids.size == 0:
+        raise ValueError(
+            "No users in the database; cannot assign customers to orders.")
+    return user_ids
+
+
+def file_rng(csv_path: Path, data_path: Path, seed: int = DEFAULT_SEED):
+    """
+    Build the random generator used for one orders file.
+
+    The generator is seeded from ``seed`` and the file's path relative to
+    ``data_path``, so the draws of a file do not depend on which other
+    orders files exist, the order they are processed in or the number of
+    workers. They index into the users ordered by email (see
+    ``fetch_user_ids``), which keeps the customers they pick stable too.
+    """
+    path_key = csv_path.relative_to(data_path).as_posix().encode()
+    return np.random.default_rng([seed, zlib.crc32(path_key)])
 
 
-def seed_users_csv_data():
-    users_dir = DATA_PATH / 'users'
-    user_csvs = find_csvs_in_directory(users_dir)
-    # load csv files
-    if not user_csvs:
-        raise FileNotFoundError(f"No CSV files found in {users_dir}")
+def assign_customers(size: int, user_ids: np.ndarray, rng) -> np.ndarray:
+    """
+    Draw ``size`` customer ids uniformly from ``user_ids`` in one vectorized op.
+    """
+    return rng.choice(user_ids, size=size, replace=True)
 
-    users_df = pd.concat((pd.read_csv(csv, sep=';')
-                         for csv in user_csvs), ignore_index=True)
 
-    return users_df
+def load_orders_csv(connection, csv_path: Path, user_ids: np.ndarray, rng,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream one orders CSV into the ``orders`` table.
+
+    Each order is assigned a customer drawn from ``user_ids`` with ``rng``.
 
+    Returns
+    -------
+    FileLoadResult
+        The number of rows written and the time it took.
+    """
+    start = time.perf_counter()
+    rows = 0
+    for orders_chunk in iter_csv_chunks([csv_path], chunk_size,
+                                        dtype=ORDERS_DTYPES,
+                                        parse_dates=ORDERS_PARSE_DATES):
+        orders_chunk['customer_id'] = assign_customers(
+            len(orders_chunk), user_ids, rng)
+        rows += copy_dataframe(
+            connection, Order.__table__, orders_chunk, chunk_size)
+    return FileLoadResult(csv_path, rows, time.perf_counter() - start)
 
-def seed_orders_csv_data():
-    orders_dir = DATA_PATH / 'orders'
-    order_csvs = find_csvs_in_directory(orders_dir)
-    # load csv files
-    if not order_csvs:
-        raise FileNotFoundError(f"No CSV files found in {orders_dir}")
 
-    orders_df = pd.concat((pd.read_csv(csv, sep=';')
-                          for csv in order_csvs), ignore_index=True)
+def seed_csv_file(connection, kind, csv_path: Path, data_path: Path,
+                  chunk_size=DEFAULT_CHUNK_SIZE, user_ids=None,
+                  on_conflict='nothing', seed=DEFAULT_SEED):
+    """
+    Ingest one CSV file unless the manifest says it is already loaded.
+
+    Users files are upserted, so re-ingesting a changed users file is safe.
+    Orders have no natural key, so the rows of a changed orders file cannot
+    be told apart from the ones loaded before; such a file is refused
+    instead of being appended a second time.
+
+    Parameters
+    ----------
+    connection : Connection
+        The connection used for the data and the manifest entry; the caller
+        commits, so both land atomically.
+    kind : str
+        ``'users'`` or ``'orders'``.
+    csv_path : Path
+        The CSV file.
+    data_path : Path
+        The data directory manifest paths are relative to.
+    chunk_size : int
+        Number of rows read and written per chunk.
+    user_ids : numpy.ndarray, optional
+        Ids of the users orders are assigned to (orders files only).
+    on_conflict : str
+        Upsert behaviour for users: ``'nothing'`` or ``'update'``.
+    seed : int
+        Base seed of the per-file customer assignment.
+
+    Returns
+    -------
+    FileLoadResult
+        The load result, with ``skipped=True`` for files already ingested.
 
-    # Convert DataFrame to list of Order objects
-    return orders_df
+    Raises
+    ------
+    ValueError
+        If an orders file changed since it was ingested.
+    """
+    status, fingerprint = check_manifest(connection, csv_path, data_path)
+    if status == FileStatus.CURRENT:
+        return FileLoadResult(csv_path, 0, 0.0, skipped=True)
+    if kind == 'users':
+        result = load_users_csv(connection, csv_path, chunk_size, on_conflict)
+    else:
+        if status == FileStatus.CHANGED:
+            raise ValueError(
+                f"{csv_path.name} changed since it was ingested; reloading it "
+                "would duplicate its orders. Put new orders in a new file, or "
+                "reseed from scratch (empty the orders and seed_manifest "
+                "tables first)."
+            )
+        rng = file_rng(csv_path, data_path, seed)
+        result = load_orders_csv(connection, csv_path, user_ids, rng,
+                                 chunk_size)
+    record_ingestion(connection, fingerprint, kind, result.rows)
+    return result
 
 
-def seed_data_from_csvs(session):
+def seed_data_from_csvs(session, chunk_size=DEFAULT_CHUNK_SIZE,
+                        data_path: Path = DATA_PATH, on_conflict='nothing',
+                        seed=DEFAULT_SEED):
     """
     Seed the database with data from CSV files.
+
+    Every CSV is read in chunks of ``chunk_size`` rows and each chunk is
+    written with ``copy_dataframe`` (``COPY FROM STDIN`` on Postgres,
+    multi-row inserts elsewhere) as soon as it is parsed, so peak memory is
+    bounded by the chunk size rather than the size of ``data/``. Files
+    already recorded in the seed manifest are skipped and each file is
+    committed with its manifest entry, so re-running the seeder only
+    processes new or changed files. Orders are linked to the ids actually
+    present in ``users``, including users inserted by earlier runs.
+
+    Parameters
+    ----------
+    session : Session
+        The session whose connection and transaction are used.
+    chunk_size : int
+        Number of rows read and written per chunk.
+    data_path : Path
+        Directory holding the ``users/`` and ``orders/`` CSV folders.
+    on_conflict : str
+        What to do with users whose email already exists: ``'nothing'`` or
+        ``'update'``.
+    seed : int
+        Seed of the customer assignment; the same seed and files always
+        assign every order to the same customer (by email).
+
+    Returns
+    -------
+    list of FileLoadResult
+        Per-file row counts and timings, users files first.
     """
-    users_df = seed_users_csv_data()
-    orders_df = seed_orders_csv_data()
-    np.random.seed(911)
+    user_csvs = _find_csvs_or_raise(data_path / 'users')
+    order_csvs = _find_csvs_or_raise(data_path / 'orders')
+    results = []
+    for csv_path in user_csvs:
+        results.append(seed_csv_file(
+            session.connection(), 'users', csv_path, data_path, chunk_size,
+            on_conflict=on_conflict))
+        session.commit()
+        _log_file_load(results[-1])
 
-    users = [User(**row.to_dict()) for _, row in users_df.iterrows()]
-    session.bulk_save_objects(users)
+    user_ids = None
+    for csv_path in order_csvs:
+        if user_ids is None:
+            user_ids = fetch_user_ids(session.connection())
+        results.append(seed_csv_file(
+            session.connection(), 'orders', csv_path, data_path, chunk_size,
+            user_ids=user_ids, seed=seed))
+        session.commit()
+        _log_file_load(results[-1])
+    return results
 
-    customer_ids = list(users_df.index)
-    orders_df['customer_id'] = np.random.choice(
-        list(customer_ids), size=len(orders_df), replace=True) + 1
 
-    # Convert DataFrame to list of Order objects
-    orders = [Order(**row.to_dict()) for _, row in orders_df.iterrows()]
-    session.bulk_save_objects(orders)
+# user ids fetched once per orders worker process by _init_orders_worker
+_worker_user_ids = None
 
-    session.commit()
 
+def _init_orders_worker(database_uri, engine_options):
+    global _worker_user_ids
+    engine = make_engine(database_uri, **engine_options)
+    try:
+        with engine.connect() as connection:
+            _worker_user_ids = fetch_user_ids(connection)
+    finally:
+        engine.dispose()
 
-if __name__ == "__main__":
+
+def _seed_file_worker(kind, csv_path, data_path, database_uri,
+                      engine_options, chunk_size, on_conflict='nothing',
+                      seed=DEFAULT_SEED):
+    """
+    Load one CSV file in a worker process over its own engine connection.
+    """
+    engine = make_engine(database_uri, **engine_options)
+    try:
+        with engine.begin() as connection:
+            return seed_csv_file(connection, kind, csv_path, data_path,
+                                 chunk_size, _worker_user_ids, on_conflict,
+                                 seed)
+    finally:
+        engine.dispose()
+
+
+def _run_in_pool(workers, kind, csv_paths, data_path, database_uri,
+                 engine_options, chunk_size, on_conflict='nothing',
+                 seed=DEFAULT_SEED):
+    pool_options = {}
+    if kind == 'orders':
+        pool_options = {
+            'initializer': _init_orders_worker,
+            'initargs': (database_uri, engine_options),
+        }
+    with ProcessPoolExecutor(max_workers=workers, **pool_options) as executor:
+        futures = [
+            executor.submit(_seed_file_worker, kind, csv_path, data_path,
+                            database_uri, engine_options, chunk_size,
+                            on_conflict, seed)
+            for csv_path in csv_paths
+        ]
+        results = []
+        for future in as_completed(futures):
+            results.append(future.result())
+            _log_file_load(results[-1])
+    return sorted(results, key=lambda result: result.path)
+
+
+def seed_data_parallel(config, workers: int, chunk_size=DEFAULT_CHUNK_SIZE,
+                       data_path: Path = DATA_PATH, on_conflict='nothing',
+                       seed=DEFAULT_SEED):
+    """
+    Seed the database from CSV files using a pool of worker processes.
+
+    Each CSV file is loaded by a worker over its own engine connection and
+    committed independently. All users files finish before any orders file
+    starts, so every ``Order.customer_id`` refers to a committed user; each
+    orders worker fetches the user ids once when it starts.
+    Files already recorded in the seed manifest are skipped.
+
+    Parameters
+    ----------
+    config : BaseConfig
+        Configuration providing ``SQLALCHEMY_DATABASE_URI`` and, optionally,
+        ``SQLALCHEMY_ENGINE_OPTIONS``.
+    workers : int
+        Number of worker processes.
+    chunk_size : int
+        Number of rows read and written per chunk.
+    data_path : Path
+        Directory holding the ``users/`` and ``orders/`` CSV folders.
+    on_conflict : str
+        What to do with users whose email already exists: ``'nothing'`` or
+        ``'update'``.
+    seed : int
+        Seed of the customer assignment; orders get the same customers (by
+        email) as in the sequential mode, for any number of workers.
+
+    Returns
+    -------
+    list of FileLoadResult
+        Per-file row counts and timings, users files first.
+
+    Raises
+    ------
+    ValueError
+        If the database is an in-memory SQLite database, which worker
+        processes cannot share.
+    """
+    database_uri = config.SQLALCHEMY_DATABASE_URI
+    url = make_url(database_uri)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise ValueError(
+            "Parallel seeding needs a database shared between processes; "
+            "in-memory SQLite is not supported."
+        )
+    engine_options = getattr(config, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+    user_csvs = _find_csvs_or_raise(data_path / 'users')
+    order_csvs = _find_csvs_or_raise(data_path / 'orders')
+
+    user_results = _run_in_pool(workers, 'users', user_csvs, data_path,
+                                database_uri, engine_options, chunk_size,
+                                on_conflict=on_conflict)
+    order_results = _run_in_pool(workers, 'orders', order_csvs, data_path,
+                                 database_uri, engine_options, chunk_size,
+                                 seed=seed)
+    return user_results + order_results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Create the tables and seed them from the data/ CSVs.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes loading CSV files in parallel")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows read and written per chunk")
+    parser.add_argument('--data-path', type=Path, default=DATA_PATH,
+                        help="directory holding users/ and orders/ CSVs")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help="seed of the random customer assignment")
+    parser.add_argument('--on-conflict', choices=ON_CONFLICT_CHOICES,
+                        default='nothing',
+                        help="keep ('nothing') or overwrite ('update') "
+                             "users whose email already exists")
+    parser.add_argument('--concurrent-indexes', action='store_true',
+                        help="build missing indexes of existing tables with "
+                             "CREATE INDEX CONCURRENTLY (PostgreSQL)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     from database.db_init import get_engine_and_session
     from flask_app.config import get_flask_config
+
+    basicConfig(level=INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
     config = get_flask_config()
     engine, SessionLocal = get_engine_and_session(config)
-    create_tables(engine)
-    session = SessionLocal()
-    seed_data_from_csvs(session)
-    session.close()
+    create_tables(engine, concurrent_indexes=args.concurrent_indexes)
+    start = time.perf_counter()
+    if args.workers > 1:
+        results = seed_data_parallel(
+            config, args.workers, args.chunk_size, args.data_path,
+            args.on_conflict, args.seed)
+    else:
+        with SessionLocal() as session:
+            results = seed_data_from_csvs(
+                session, args.chunk_size, args.data_path, args.on_conflict,
+                args.seed)
+    loaded = [result for result in results if not result.skipped]
+    total_rows = sum(result.rows for result in loaded)
+    logger.info(
+        f"Seeded {total_rows} rows from {len(loaded)} files "
+        f"({len(results) - len(loaded)} already ingested) in "
+        f"{time.perf_counter() - start:.2f}s"
+    )
+    with engine.begin() as connection:
+        refreshed = refresh_order_stats(connection)
+    logger.info(
+        f"Order statistics summary refreshed up to order id "
+        f"{refreshed.last_order_id} ({refreshed.summary_rows} rows written)"
+    )
+
+
+if __name__ == "__main__":
+    main()
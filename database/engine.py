@@ -0,0 +1,254 @@
+"""
+Engine factory shared by Flask-SQLAlchemy and the standalone scripts.
+
+Pool sizing is driven by environment variables so the number of gunicorn
+workers can be sized against Postgres ``max_connections``: every worker
+process opens at most ``DB_POOL_SIZE + DB_MAX_OVERFLOW`` connections.
+The ASGI app uses ``make_async_engine`` with the same settings.
+"""
+import os
+import time
+from threading import Lock
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, StaticPool
+
+# QueuePool's max_overflow when the engine options do not set it
+DEFAULT_MAX_OVERFLOW = 10
+
+# backend -> asyncio driver used by make_async_engine
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts take to get a connection.
+
+    The time is measured around the public ``Pool.connect``, which the
+    engine calls for every checkout: it covers waiting for a free
+    connection, opening a new one in the overflow and the pre-ping. Select
+    it with ``poolclass`` in ``SQLALCHEMY_ENGINE_OPTIONS``.
+
+    Attributes
+    ----------
+    checkouts : int
+        Number of connections handed out by the pool.
+    wait_time_total : float
+        Seconds spent getting a connection, summed over all checkouts,
+        including the ones that timed out.
+    wait_time_max : float
+        Longest single wait in seconds.
+    timeouts : int
+        Number of checkouts that gave up after ``pool_timeout``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self._record(start, timed_out=True)
+            raise
+        self._record(start)
+        return connection
+
+    def _record(self, start, timed_out=False):
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def wait_stats(self):
+        """
+        Return a snapshot of the checkout wait statistics.
+        """
+        with self._stats_lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_time_total": self.wait_time_total,
+                "wait_time_max": self.wait_time_max,
+                "timeouts": self.timeouts,
+            }
+
+
+def pool_options_from_env():
+    """
+    Build connection pool engine options from environment variables.
+
+    Returns
+    -------
+    dict
+        Keyword arguments for ``create_engine``, read from ``DB_POOL_SIZE``,
+        ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT``, ``DB_POOL_RECYCLE`` and
+        ``DB_POOL_PRE_PING``.
+    """
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower()
+        in ("1", "true", "yes"),
+    }
+
+
+def make_engine(database_uri, **engine_options):
+    """
+    Create a SQLAlchemy engine for the standalone scripts.
+
+    Flask-SQLAlchemy builds the app's engine itself from the same
+    ``SQLALCHEMY_ENGINE_OPTIONS``, ``poolclass`` included.
+
+    Parameters
+    ----------
+    database_uri : str or URL
+        The database URI.
+    **engine_options
+        Passed through to ``create_engine``.
+
+    Returns
+    -------
+    Engine
+        The configured engine.
+    """
+    return create_engine(database_uri, **engine_options)
+
+
+def async_database_uri(database_uri):
+    """
+    Swap the driver of a database URI for its asyncio counterpart.
+
+    Parameters
+    ----------
+    database_uri : str or URL
+        A synchronous URI such as ``postgresql://...`` or ``sqlite:///...``.
+
+    Returns
+    -------
+    URL
+        The URI using the driver from ``ASYNC_DRIVERS``.
+
+    Raises
+    ------
+    ValueError
+        If the backend has no configured async driver.
+    """
+    url = make_url(database_uri)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(
+            f"No async driver for {url.get_backend_name()} databases. "
+            f"Supported backends: {', '.join(ASYNC_DRIVERS)}."
+        )
+    return url.set(drivername=driver)
+
+
+def make_async_engine(database_uri, **engine_options):
+    """
+    Create an ``AsyncEngine`` from a synchronous URI and engine options.
+
+    The pool class is left to SQLAlchemy (``AsyncAdaptedQueuePool``), since
+    ``InstrumentedQueuePool`` blocks a thread while waiting; the sizing
+    options apply unchanged. In-memory SQLite gets a single shared
+    connection, as Flask-SQLAlchemy does for the sync engine.
+
+    Parameters
+    ----------
+    database_uri : str or URL
+        The synchronous database URI.
+    **engine_options
+        Passed through to ``create_async_engine``.
+
+    Returns
+    -------
+    AsyncEngine
+        The configured engine.
+
+    Raises
+    ------
+    RuntimeError
+        If the async driver (``asyncpg`` / ``aiosqlite``) is not installed.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_uri(database_uri)
+    options = dict(engine_options)
+    options.pop("poolclass", None)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        options = {"poolclass": StaticPool}
+    try:
+        return create_async_engine(url, **options)
+    except ImportError as err:
+        raise RuntimeError(
+            f"The async driver {url.drivername} is not installed."
+        ) from err
+
+
+def create_engine_from_config(config):
+    """
+    Create an engine from a Flask config object.
+
+    Parameters
+    ----------
+    config : BaseConfig
+        The configuration providing ``SQLALCHEMY_DATABASE_URI`` and,
+        optionally, ``SQLALCHEMY_ENGINE_OPTIONS``.
+
+    Returns
+    -------
+    Engine
+        The configured engine.
+    """
+    engine_options = getattr(config, "SQLALCHEMY_ENGINE_OPTIONS", {})
+    return make_engine(config.SQLALCHEMY_DATABASE_URI, **engine_options)
+
+
+def pool_stats(engine, engine_options=None):
+    """
+    Describe the current state of an engine's connection pool.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine to inspect.
+    engine_options : dict, optional
+        The options the engine was created with, the source of
+        ``max_overflow`` (SQLAlchemy's default of 10 when not set).
+
+    Returns
+    -------
+    dict
+        The pool class and, where the pool supports them, its size, idle
+        and checked-out connections, current overflow and checkout wait
+        statistics.
+    """
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow", "timeout"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    if isinstance(pool, QueuePool):
+        stats["max_overflow"] = (engine_options or {}).get(
+            "max_overflow", DEFAULT_MAX_OVERFLOW)
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.wait_stats())
+    return stats
@@ -0,0 +1,135 @@
+"""
+Checkpoint manifest for incremental seeding.
+
+Every ingested CSV gets a row in ``seed_manifest`` with its size,
+modification time and SHA-256. A file is re-ingested only when it is new
+or its content changed, which turns a full reload into work proportional
+to the new data.
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import StrEnum
+from pathlib import Path
+
+from sqlalchemy import select, update
+
+from database.bulk_load import build_upsert
+from database.models.seed_manifest import SeedManifest
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class FileStatus(StrEnum):
+    """
+    State of a CSV file compared with the manifest.
+
+    Attributes
+    ----------
+    NEW : str
+        The file was never ingested.
+    CHANGED : str
+        The file was ingested before but its content differs.
+    CURRENT : str
+        The recorded entry matches the file.
+    """
+    NEW = 'new'
+    CHANGED = 'changed'
+    CURRENT = 'current'
+
+
+@dataclass
+class FileFingerprint:
+    """
+    Identity of a CSV file on disk.
+
+    ``path`` is relative to the data directory so moving the directory does
+    not invalidate the manifest.
+    """
+    path: str
+    size: int
+    mtime: float
+    sha256: str | None = None
+
+
+def compute_sha256(csv_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_file(csv_path: Path, data_path: Path) -> FileFingerprint:
+    stat = csv_path.stat()
+    return FileFingerprint(
+        path=csv_path.relative_to(data_path).as_posix(),
+        size=stat.st_size,
+        mtime=stat.st_mtime,
+    )
+
+
+def check_manifest(connection, csv_path: Path, data_path: Path):
+    """
+    Compare a CSV file with its manifest entry.
+
+    Size and modification time are checked first; the file is only hashed
+    when they differ from the recorded values. A file whose content hash
+    still matches (e.g. it was touched or copied) is reported as current and
+    its recorded mtime is refreshed.
+
+    Parameters
+    ----------
+    connection : Connection
+        The connection used to read and update the manifest.
+    csv_path : Path
+        The CSV file.
+    data_path : Path
+        The data directory the manifest paths are relative to.
+
+    Returns
+    -------
+    tuple of (FileStatus, FileFingerprint)
+        The file status and its fingerprint, with ``sha256`` filled in
+        unless the file was found current by size and mtime alone.
+    """
+    fingerprint = fingerprint_file(csv_path, data_path)
+    manifest = SeedManifest.__table__
+    entry = connection.execute(
+        select(manifest).where(manifest.c.path == fingerprint.path)
+    ).first()
+    if entry is not None and (entry.size, entry.mtime) == (
+            fingerprint.size, fingerprint.mtime):
+        return FileStatus.CURRENT, fingerprint
+
+    fingerprint.sha256 = compute_sha256(csv_path)
+    if entry is None:
+        return FileStatus.NEW, fingerprint
+    if entry.sha256 == fingerprint.sha256:
+        connection.execute(
+            update(manifest)
+            .where(manifest.c.path == fingerprint.path)
+            .values(size=fingerprint.size, mtime=fingerprint.mtime)
+        )
+        return FileStatus.CURRENT, fingerprint
+    return FileStatus.CHANGED, fingerprint
+
+
+def record_ingestion(connection, fingerprint: FileFingerprint, kind: str,
+                     rows: int) -> None:
+    """
+    Insert or replace the manifest entry of an ingested file.
+    """
+    manifest = SeedManifest.__table__
+    values = {
+        'path': fingerprint.path,
+        'kind': kind,
+        'size': fingerprint.size,
+        'mtime': fingerprint.mtime,
+        'sha256': fingerprint.sha256,
+        'rows': rows,
+        'ingested_at': datetime.now(timezone.utc),
+    }
+    statement = build_upsert(connection.dialect.name, manifest, list(values),
+                             ['path'], on_conflict='update')
+    connection.execute(statement.values(**values))
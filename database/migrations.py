@@ -0,0 +1,182 @@
+"""
+Schema migrations for databases created before a model change.
+
+``Base.metadata.create_all`` skips tables that already exist, so indexes
+added to the models later never reach an existing database. ``ensure_indexes``
+creates every index declared on the models that the database lacks and
+drops the ones listed in ``RETIRED_INDEXES``; it is idempotent and runs as
+part of ``create_tables``.
+
+On PostgreSQL ``concurrently=True`` builds the indexes with ``CREATE INDEX
+CONCURRENTLY``, which does not block writes to the table while it runs (but
+takes longer and cannot run inside a transaction). If such a build fails it
+leaves an INVALID index behind, which has to be dropped before rerunning.
+
+Usage::
+
+    python -m database.migrations [--concurrently]
+"""
+import argparse
+from contextlib import contextmanager, nullcontext
+from logging import basicConfig, INFO, getLogger
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from database.models.base import Base
+
+logger = getLogger(__name__)
+
+# (table, index) pairs that are no longer declared and are superseded by
+# another index
+RETIRED_INDEXES = (
+    # leading column of ix_orders_customer_id_order_date
+    ("orders", "ix_orders_customer_id"),
+)
+
+
+def missing_indexes(bind, metadata=Base.metadata):
+    """
+    List the model indexes that do not exist in the database.
+
+    Indexes are compared by name, and only on tables that already exist;
+    ``create_all`` creates the indexes of new tables itself.
+
+    Parameters
+    ----------
+    bind : Engine or Connection
+        The database to inspect.
+    metadata : MetaData
+        The models' metadata.
+
+    Returns
+    -------
+    list of Index
+        The indexes to create.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in sorted(table.indexes, key=lambda i: i.name)
+                       if index.name not in existing)
+    return missing
+
+
+def retired_indexes(bind, retired=RETIRED_INDEXES):
+    """
+    List the retired indexes that still exist in the database.
+
+    Returns
+    -------
+    list of str
+        Names of the indexes to drop.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    present = []
+    for table_name, index_name in retired:
+        if table_name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        if index_name in existing:
+            present.append(index_name)
+    return present
+
+
+@contextmanager
+def _concurrently(index):
+    # postgresql_concurrently is read when the DDL is compiled; it is set only
+    # for this build so the model's Index keeps its declared options
+    options = index.dialect_options["postgresql"]
+    previous = options["concurrently"]
+    options["concurrently"] = True
+    try:
+        yield index
+    finally:
+        options["concurrently"] = previous
+
+
+@contextmanager
+def _ddl_bind(bind, concurrently):
+    if not concurrently:
+        yield bind
+        return
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    with bind.engine.connect() as connection:
+        yield connection.execution_options(isolation_level="AUTOCOMMIT")
+
+
+def _drop_index(bind, name, concurrently):
+    keyword = "CONCURRENTLY " if concurrently else ""
+    quoted = bind.dialect.identifier_preparer.quote(name)
+    statement = text(f"DROP INDEX {keyword}{quoted}")
+    with _ddl_bind(bind, concurrently) as ddl_bind:
+        if isinstance(ddl_bind, Engine):
+            with ddl_bind.begin() as connection:
+                connection.execute(statement)
+        else:
+            ddl_bind.execute(statement)
+
+
+def ensure_indexes(bind, metadata=Base.metadata, concurrently=False,
+                   retired=RETIRED_INDEXES):
+    """
+    Create the model indexes missing from an existing database and drop
+    retired ones.
+
+    Parameters
+    ----------
+    bind : Engine or Connection
+        The database to migrate.
+    metadata : MetaData
+        The models' metadata.
+    concurrently : bool
+        Build and drop the indexes ``CONCURRENTLY`` on PostgreSQL, without
+        locking out writes. Ignored on other databases. Each statement then
+        runs in its own autocommit connection from ``bind``'s engine.
+    retired : tuple of (str, str)
+        ``(table, index)`` pairs to drop when present.
+
+    Returns
+    -------
+    list of str
+        Names of the indexes that were created.
+    """
+    concurrently = concurrently and bind.dialect.name == "postgresql"
+    created = []
+    for index in missing_indexes(bind, metadata):
+        options = _concurrently(index) if concurrently else nullcontext()
+        with _ddl_bind(bind, concurrently) as ddl_bind, options:
+            index.create(ddl_bind, checkfirst=True)
+        logger.info(f"Created index {index.name} on {index.table.name}")
+        created.append(index.name)
+    for index_name in retired_indexes(bind, retired):
+        _drop_index(bind, index_name, concurrently)
+        logger.info(f"Dropped retired index {index_name}")
+    return created
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Create missing model indexes and drop retired ones.")
+    parser.add_argument('--concurrently', action='store_true',
+                        help="use CREATE/DROP INDEX CONCURRENTLY on PostgreSQL")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from database.db_init import get_engine_and_session
+
+    basicConfig(level=INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    engine, _ = get_engine_and_session()
+    created = ensure_indexes(engine, concurrently=args.concurrently)
+    logger.info(f"{len(created)} index(es) created")
+
+
+if __name__ == "__main__":
+    main()
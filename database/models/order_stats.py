@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Date, Float, Index, Integer, String
+
+from database.models.base import Base
+
+
+class OrderDailyStats(Base):
+    """
+    Order totals per day, product and customer city.
+
+    A summary of ``orders`` joined with ``users`` maintained by
+    ``database.order_stats.refresh_order_stats``; every coarser grouping
+    (product, month, city) is a sum over these rows.
+    """
+    __tablename__ = "order_daily_stats"
+    __table_args__ = (
+        Index("ix_order_daily_stats_order_date", "order_date"),
+    )
+    id = Column(Integer, primary_key=True)
+    order_date = Column(Date)
+    product = Column(String, nullable=False)
+    city = Column(String)
+    orders = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
+
+
+class OrderStatsState(Base):
+    """
+    High-water mark of the orders already summarized in
+    ``order_daily_stats``; a single row with ``id = 1``.
+    """
+    __tablename__ = "order_stats_state"
+    id = Column(Integer, primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Date, Index
 
 from database.models.base import Base
 
@@ -8,9 +8,17 @@ class Order(Base):
     Represents an order in the database.
     """
     __tablename__ = "orders"
+    # fetch server-generated values with INSERT/UPDATE ... RETURNING at flush
+    # time instead of a separate SELECT on first access
+    __mapper_args__ = {"eager_defaults": True}
+    # serves per-customer lookups, ordered by date or filtered by a date
+    # range, and the foreign key (a leading-column index covers it)
+    __table_args__ = (
+        Index("ix_orders_customer_id_order_date", "customer_id", "order_date"),
+    )
     id = Column(Integer, primary_key=True)
     customer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     product = Column(String, nullable=False)
     quantity = Column(Integer, default=1)
     total_price = Column(Float)
-    order_date = Column(Date)
+    order_date = Column(Date, index=True)
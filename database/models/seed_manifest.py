@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, String
+
+from database.models.base import Base
+
+
+class SeedManifest(Base):
+    """
+    Records every CSV file ingested by the seeder.
+
+    A file is skipped on the next run when its size and modification time,
+    or failing that its content hash, match the recorded entry.
+    """
+    __tablename__ = "seed_manifest"
+    path = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    mtime = Column(Float, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    rows = Column(Integer, nullable=False)
+    ingested_at = Column(
+        DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
@@ -8,7 +8,9 @@ class User(Base):
     Represents a user in the database.
     """
     __tablename__ = "users"
+    # see Order: server defaults come back through RETURNING at flush time
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False)
-    city = Column(String)
+    city = Column(String, index=True)
@@ -0,0 +1,258 @@
+"""
+Order analytics: order count, quantity and revenue grouped in SQL.
+
+``order_stats`` answers a grouping either with a live ``GROUP BY`` over
+``orders`` (outer-joined with ``users`` for the city) or from the
+``order_daily_stats`` summary table, which holds one row per day, product
+and city and is orders of magnitude smaller than ``orders``.
+
+``refresh_order_stats`` keeps the summary up to date incrementally. It
+reads the orders above the stored high-water mark id, deletes the summary
+rows of the days those orders fall on and aggregates the days again from
+``orders``. Recomputing whole days keeps the refresh idempotent and also
+picks up edits to other orders of those days. A ``full`` rebuild is
+needed after edits or deletions on days without new orders, after a
+user's city changes, or if a transaction committed an order id below the
+mark after a refresh had already passed it.
+
+Usage::
+
+    python -m database.order_stats [--full]
+"""
+import argparse
+from dataclasses import dataclass
+from logging import basicConfig, INFO, getLogger
+from typing import Final
+
+from sqlalchemy import and_, delete, exists, func, insert, or_, select
+
+from database.bulk_load import build_upsert
+from database.models.order_stats import OrderDailyStats, OrderStatsState
+from database.models.orders import Order
+from database.models.users import User
+
+logger = getLogger(__name__)
+
+DIMENSIONS: Final[tuple] = ('product', 'day', 'month', 'city')
+STATE_ID: Final[int] = 1
+
+
+def _month_bucket(column, dialect_name):
+    if dialect_name == 'postgresql':
+        return func.to_char(column, 'YYYY-MM')
+    if dialect_name == 'sqlite':
+        return func.strftime('%Y-%m', column)
+    raise ValueError(f"Monthly statistics are not supported on {dialect_name}.")
+
+
+def _live_source():
+    columns = {'day': Order.order_date, 'product': Order.product,
+               'city': User.city}
+    measures = (func.count(Order.id),
+                func.coalesce(func.sum(Order.quantity), 0),
+                func.coalesce(func.sum(Order.total_price), 0.0))
+    # outer join: an order whose customer is gone still counts, city unknown
+    from_clause = Order.__table__.outerjoin(
+        User.__table__, User.id == Order.customer_id)
+    return columns, measures, from_clause
+
+
+def _summary_source():
+    columns = {'day': OrderDailyStats.order_date,
+               'product': OrderDailyStats.product,
+               'city': OrderDailyStats.city}
+    measures = (func.sum(OrderDailyStats.orders),
+                func.sum(OrderDailyStats.quantity),
+                func.sum(OrderDailyStats.revenue))
+    return columns, measures, OrderDailyStats.__table__
+
+
+def stats_statement(dimension, dialect_name, summary=False, order_date_from=None,
+                    order_date_to=None, product=None, city=None):
+    """
+    Build the ``GROUP BY`` query of one statistics dimension.
+
+    Parameters
+    ----------
+    dimension : str
+        One of ``DIMENSIONS``.
+    dialect_name : str
+        The database dialect, used to truncate dates to months.
+    summary : bool
+        Read ``order_daily_stats`` instead of ``orders``.
+    order_date_from, order_date_to : date, optional
+        Inclusive order date range.
+    product, city : str, optional
+        Only count orders of this product / from customers in this city.
+
+    Returns
+    -------
+    Select
+        Rows of ``(key, orders, quantity, revenue)`` ordered by key.
+
+    Raises
+    ------
+    ValueError
+        If the dimension is unknown.
+    """
+    if dimension not in DIMENSIONS:
+        raise ValueError(
+            f"Invalid dimension: {dimension}. Please use one of {DIMENSIONS}.")
+    columns, measures, from_clause = (
+        _summary_source() if summary else _live_source())
+    if dimension == 'month':
+        key = _month_bucket(columns['day'], dialect_name)
+    else:
+        key = columns[dimension]
+    clauses = []
+    if order_date_from is not None:
+        clauses.append(columns['day'] >= order_date_from)
+    if order_date_to is not None:
+        clauses.append(columns['day'] <= order_date_to)
+    if product is not None:
+        clauses.append(columns['product'] == product)
+    if city is not None:
+        clauses.append(columns['city'] == city)
+    return (select(key.label('key'), *measures)
+            .select_from(from_clause)
+            .where(*clauses)
+            .group_by(key)
+            .order_by(key))
+
+
+def order_stats(connection, dimension, summary=False, **filters):
+    """
+    Order count, quantity and revenue per value of ``dimension``.
+
+    Parameters
+    ----------
+    connection : Connection
+        The connection to query.
+    dimension : str
+        One of ``DIMENSIONS``.
+    summary : bool
+        Read the ``order_daily_stats`` summary instead of ``orders``.
+    **filters
+        ``order_date_from``, ``order_date_to``, ``product``, ``city``; see
+        ``stats_statement``.
+
+    Returns
+    -------
+    list of dict
+        ``{dimension: key, "orders": ..., "quantity": ..., "revenue": ...}``
+        per group; days are ISO formatted and revenue is rounded to cents.
+    """
+    statement = stats_statement(
+        dimension, connection.dialect.name, summary, **filters)
+    return [
+        {
+            dimension: key.isoformat() if dimension == 'day' and key else key,
+            'orders': int(orders),
+            'quantity': int(quantity),
+            'revenue': round(float(revenue), 2),
+        }
+        for key, orders, quantity, revenue in connection.execute(statement)
+    ]
+
+
+@dataclass
+class RefreshResult:
+    """
+    Outcome of one summary refresh.
+    """
+    last_order_id: int
+    summary_rows: int
+    full: bool = False
+
+
+def _lock_state(connection):
+    state = OrderStatsState.__table__
+    connection.execute(
+        build_upsert(connection.dialect.name, state, ['id', 'last_order_id'],
+                     ['id']).values(id=STATE_ID, last_order_id=0))
+    # serializes concurrent refreshes (FOR UPDATE is a no-op on SQLite,
+    # which locks the whole database for writes anyway)
+    return connection.scalar(
+        select(state.c.last_order_id)
+        .where(state.c.id == STATE_ID)
+        .with_for_update())
+
+
+def refresh_order_stats(connection, full=False):
+    """
+    Bring ``order_daily_stats`` up to date with ``orders``.
+
+    Parameters
+    ----------
+    connection : Connection
+        The connection to use; the caller owns the transaction.
+    full : bool
+        Rebuild the whole summary instead of only the days of new orders.
+
+    Returns
+    -------
+    RefreshResult
+        The new high-water mark and the number of summary rows written.
+    """
+    last_order_id = _lock_state(connection)
+    high_order_id = connection.scalar(select(func.max(Order.id))) or 0
+    if not full and high_order_id <= last_order_id:
+        return RefreshResult(last_order_id, 0)
+
+    summary = OrderDailyStats.__table__
+    columns, measures, from_clause = _live_source()
+    stale_rows = delete(summary)
+    aggregate = (select(columns['day'], columns['product'], columns['city'],
+                        *measures)
+                 .select_from(from_clause)
+                 .group_by(columns['day'], columns['product'], columns['city']))
+    if not full:
+        # both filters read the new orders, not the summary rows being
+        # replaced, so the delete and the insert see the same days
+        new_orders = and_(Order.id > last_order_id, Order.id <= high_order_id)
+        new_days = select(Order.order_date).where(
+            new_orders, Order.order_date.is_not(None)).distinct()
+        has_undated = exists().where(new_orders, Order.order_date.is_(None))
+        stale_rows = stale_rows.where(or_(
+            summary.c.order_date.in_(new_days),
+            and_(summary.c.order_date.is_(None), has_undated)))
+        aggregate = aggregate.where(or_(
+            Order.order_date.in_(new_days),
+            and_(Order.order_date.is_(None), has_undated)))
+
+    connection.execute(stale_rows)
+    result = connection.execute(insert(summary).from_select(
+        ['order_date', 'product', 'city', 'orders', 'quantity', 'revenue'],
+        aggregate))
+    state = OrderStatsState.__table__
+    connection.execute(state.update()
+                       .where(state.c.id == STATE_ID)
+                       .values(last_order_id=high_order_id))
+    return RefreshResult(high_order_id, result.rowcount, full)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Refresh the order_daily_stats summary table.")
+    parser.add_argument('--full', action='store_true',
+                        help="rebuild the whole summary instead of the days "
+                             "with new orders")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from database.db_init import get_engine_and_session
+    from database.db_seed import create_tables
+
+    basicConfig(level=INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    engine, _ = get_engine_and_session()
+    create_tables(engine)
+    with engine.begin() as connection:
+        result = refresh_order_stats(connection, full=args.full)
+    logger.info(f"Summarized orders up to id {result.last_order_id}: "
+                f"{result.summary_rows} summary rows written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Synthetic users/orders generator for load-scale benchmarks.
+
+Writes ``users/users_<city>.csv`` and ``orders/orders_YYYYMM.csv`` files in
+the same ``;``-separated layout as ``data/``, so the output directory can be
+passed straight to ``python -m database.db_seed --data-path``. Every column
+is drawn with vectorized NumPy operations and rows are written in chunks,
+so memory stays bounded by ``--chunk-rows`` whatever the requested size.
+
+Usage::
+
+    python -m database.synthetic_data --users 1000000 --orders 10000000 \
+        --start-month 2025-01 --months 12 --out data_bench
+"""
+import argparse
+import time
+from logging import basicConfig, INFO, getLogger
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+import pandas as pd
+
+logger = getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS: Final[int] = 1_000_000
+
+# city -> relative share of users (larger cities get more customers)
+CITIES: Final[dict] = {
+    'Warsaw': 0.30,
+    'Cracow': 0.16,
+    'Wroclaw': 0.13,
+    'Lodz': 0.11,
+    'Poznan': 0.09,
+    'Gdansk': 0.08,
+    'Szczecin': 0.07,
+    'Lublin': 0.06,
+}
+
+# product -> typical unit price, ordered from most to least popular
+PRODUCTS: Final[dict] = {
+    'Smartwatch': 250.0,
+    'Wireless Earbuds': 180.0,
+    'VR Headset': 420.0,
+    'Bluetooth Speaker': 150.0,
+    'Noise Cancelling Headphones': 320.0,
+    'Portable Projector': 390.0,
+    'Smartphone': 690.0,
+    'Laptop Stand': 90.0,
+    'Power Bank': 70.0,
+    'Gaming Mouse': 120.0,
+    'Action Camera': 350.0,
+}
+PRODUCT_ZIPF_EXPONENT: Final[float] = 1.1
+
+FIRST_NAMES: Final[tuple] = (
+    'Anna', 'Piotr', 'Maria', 'Krzysztof', 'Katarzyna', 'Andrzej', 'Agnieszka',
+    'Tomasz', 'Barbara', 'Pawel', 'Ewa', 'Michal', 'Magdalena', 'Marcin',
+    'Joanna', 'Jakub', 'Rachel', 'Laura', 'Mary', 'Jamie', 'Desiree', 'April',
+)
+EMAIL_TOKENS: Final[tuple] = (
+    'nowak', 'kowalski', 'wisniewski', 'wojcik', 'kaminski', 'lewandowski',
+    'zielinski', 'szymanski', 'booker', 'grey', 'jenkins', 'smith', 'burns',
+    'daniel', 'robert', 'colleen',
+)
+
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+_HEX_SHIFTS = np.arange(28, -1, -4, dtype=np.uint64)
+# odd multiplier: i -> i * K mod 2**32 is a bijection, so ids stay unique
+_SCRAMBLE_MULTIPLIER = np.uint64(0x9E3779B1)
+
+
+def _zipf_weights(size, exponent):
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _hex8(values):
+    """
+    Format unsigned 32-bit integers as 8 lowercase hex digits, vectorized.
+    """
+    digits = _HEX_DIGITS[(values[:, None] >> _HEX_SHIFTS) & np.uint64(0xF)]
+    return np.ascontiguousarray(digits).view('S8').ravel().astype(str)
+
+
+def generate_users(size, rng, start_index=0):
+    """
+    Generate a chunk of users.
+
+    Emails are made unique by a hex suffix derived from the row's global
+    index through a bijective scramble, so they never collide within a data
+    set of up to 2**32 users, across chunks included.
+
+    Parameters
+    ----------
+    size : int
+        Number of users to generate.
+    rng : numpy.random.Generator
+        The random generator.
+    start_index : int
+        Global index of the first user of the chunk.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns ``name``, ``email`` and ``city``.
+    """
+    city_names = np.array(list(CITIES))
+    city_weights = np.array(list(CITIES.values()))
+    cities = rng.choice(city_names, size=size, p=city_weights / city_weights.sum())
+    names = rng.choice(np.array(FIRST_NAMES), size=size)
+    tokens = rng.choice(np.array(EMAIL_TOKENS), size=size)
+
+    indices = np.arange(start_index, start_index + size, dtype=np.uint64)
+    scrambled = (indices * _SCRAMBLE_MULTIPLIER) & np.uint64(0xFFFFFFFF)
+    domains = np.char.add(np.char.add('@', np.char.lower(cities)), '.com')
+    emails = np.char.add(np.char.add(tokens, _hex8(scrambled)), domains)
+    return pd.DataFrame({'name': names, 'email': emails, 'city': cities})
+
+
+def generate_orders(size, rng, month):
+    """
+    Generate a chunk of orders placed in one month.
+
+    Products follow a Zipf distribution over ``PRODUCTS``, quantities a
+    geometric distribution capped at 10, and the total price is the unit
+    price times quantity with +/-20% noise, rounded like the source data.
+
+    Parameters
+    ----------
+    size : int
+        Number of orders to generate.
+    rng : numpy.random.Generator
+        The random generator.
+    month : pandas.Period
+        The month the orders are placed in.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns ``product``, ``quantity``, ``total_price`` and
+        ``order_date``.
+    """
+    product_names = np.array(list(PRODUCTS))
+    unit_prices = np.array(list(PRODUCTS.values()))
+    product_index = rng.choice(
+        len(product_names), size=size,
+        p=_zipf_weights(len(product_names), PRODUCT_ZIPF_EXPONENT))
+    quantity = np.minimum(rng.geometric(0.25, size=size), 10)
+    noise = rng.uniform(0.8, 1.2, size=size)
+    total_price = np.rint(unit_prices[product_index] * quantity * noise)
+
+    first_day = np.datetime64(month.start_time.date(), 'D')
+    day_offsets = rng.integers(0, month.days_in_month, size=size)
+    return pd.DataFrame({
+        'product': product_names[product_index],
+        'quantity': quantity,
+        'total_price': total_price.astype(np.int64),
+        'order_date': first_day + day_offsets,
+    })
+
+
+def _split(total, parts):
+    base, remainder = divmod(total, parts)
+    return [base + (1 if i < remainder else 0) for i in range(parts)]
+
+
+def _chunk_sizes(total, chunk_rows):
+    for start in range(0, total, chunk_rows):
+        yield min(chunk_rows, total - start)
+
+
+def _append_csv(df, path, written):
+    header = path not in written
+    df.to_csv(path, sep=';', index=False, mode='w' if header else 'a',
+              header=header)
+    written.add(path)
+
+
+def write_dataset(out_path: Path, users: int, orders: int,
+                  start_month='2025-01', months=1, seed=0,
+                  chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Generate a full users/orders data set on disk.
+
+    Parameters
+    ----------
+    out_path : Path
+        Output directory; ``users/`` and ``orders/`` are created inside.
+    users : int
+        Number of users.
+    orders : int
+        Number of orders, spread evenly over the months.
+    start_month : str
+        First month of orders, ``YYYY-MM``.
+    months : int
+        Number of monthly orders files.
+    seed : int
+        Seed of the random generator; equal seeds give identical files.
+    chunk_rows : int
+        Rows generated and written per chunk.
+
+    Returns
+    -------
+    list of Path
+        The files written.
+    """
+    rng = np.random.default_rng(seed)
+    users_dir = out_path / 'users'
+    orders_dir = out_path / 'orders'
+    users_dir.mkdir(parents=True, exist_ok=True)
+    orders_dir.mkdir(parents=True, exist_ok=True)
+    written = set()
+
+    start_index = 0
+    for size in _chunk_sizes(users, chunk_rows):
+        users_df = generate_users(size, rng, start_index)
+        start_index += size
+        for city, city_df in users_df.groupby('city', sort=True):
+            _append_csv(city_df, users_dir / f'users_{city.lower()}.csv',
+                        written)
+
+    first_month = pd.Period(start_month, freq='M')
+    for offset, month_orders in enumerate(_split(orders, months)):
+        month = first_month + offset
+        path = orders_dir / f'orders_{month.strftime("%Y%m")}.csv'
+        for size in _chunk_sizes(month_orders, chunk_rows):
+            _append_csv(generate_orders(size, rng, month), path, written)
+    return sorted(written)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic users/orders CSVs in the data/ format.")
+    parser.add_argument('--users', type=int, required=True,
+                        help="number of users")
+    parser.add_argument('--orders', type=int, required=True,
+                        help="number of orders")
+    parser.add_argument('--out', type=Path, required=True,
+                        help="output directory (users/ and orders/ inside)")
+    parser.add_argument('--start-month', default='2025-01',
+                        help="first month of orders, YYYY-MM")
+    parser.add_argument('--months', type=int, default=1,
+                        help="number of monthly orders files")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="random seed")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="rows generated and written per chunk")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    basicConfig(level=INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    start = time.perf_counter()
+    files = write_dataset(args.out, args.users, args.orders, args.start_month,
+                          args.months, args.seed, args.chunk_rows)
+    logger.info(
+        f"Generated {args.users} users and {args.orders} orders in "
+        f"{len(files)} files under {args.out} in "
+        f"{time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
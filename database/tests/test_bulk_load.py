@@ -0,0 +1,129 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from database.bulk_load import (
+    build_copy_sql,
+    build_upsert,
+    copy_dataframe,
+    iter_upsert_chunks,
+)
+from database.db_seed import seed_data_from_csvs, seed_orders_csv_data, seed_users_csv_data
+from database.models.base import Base
+from database.models.orders import Order
+from database.models.users import User
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_build_copy_sql_quotes_identifiers():
+    sql = build_copy_sql(
+        User.__table__, ["name", "email", "city"], postgresql.dialect())
+    assert sql == (
+        "COPY users (name, email, city) FROM STDIN WITH (FORMAT csv, NULL '')")
+
+
+def test_copy_dataframe_inserts_in_chunks(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    users_df = pd.DataFrame({
+        "name": ["a", "b", "c", "d", "e"],
+        "email": [f"{n}@example.com" for n in "abcde"],
+        "city": ["Warsaw", None, "Cracow", np.nan, "Warsaw"],
+    })
+    with engine.begin() as connection:
+        written = copy_dataframe(connection, User.__table__, users_df, chunk_size=2)
+    assert written == 5
+    assert len(statements) == 3
+    with engine.connect() as connection:
+        cities = connection.execute(
+            select(User.city).order_by(User.id)).scalars().all()
+    assert cities == ["Warsaw", None, "Cracow", None, "Warsaw"]
+
+
+def test_copy_dataframe_converts_dates(engine):
+    with engine.begin() as connection:
+        copy_dataframe(connection, User.__table__, pd.DataFrame(
+            {"name": ["a"], "email": ["a@example.com"]}))
+        copy_dataframe(connection, Order.__table__, pd.DataFrame({
+            "customer_id": [1, 1],
+            "product": ["Book", "Pen"],
+            "quantity": [1, 2],
+            "total_price": [10.0, np.nan],
+            "order_date": ["2025-01-02", "2025-02-03"],
+        }))
+        rows = connection.execute(
+            select(Order.order_date, Order.total_price).order_by(Order.id)).all()
+    assert rows == [(datetime.date(2025, 1, 2), 10.0),
+                    (datetime.date(2025, 2, 3), None)]
+
+
+def test_copy_dataframe_empty_frame(engine):
+    with engine.begin() as connection:
+        assert copy_dataframe(connection, User.__table__, pd.DataFrame()) == 0
+
+
+def test_seed_data_from_csvs(engine):
+    with Session(engine) as session:
+        seed_data_from_csvs(session, chunk_size=50)
+        user_count = session.scalar(select(func.count()).select_from(User))
+        order_count = session.scalar(select(func.count()).select_from(Order))
+        max_customer = session.scalar(select(func.max(Order.customer_id)))
+    assert user_count == len(seed_users_csv_data())
+    assert order_count == len(seed_orders_csv_data())
+    assert max_customer <= user_count
+
+
+def test_build_upsert_postgres_update():
+    statement = build_upsert("postgresql", User.__table__,
+                             ["name", "email", "city"], ["email"], "update")
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (email) DO UPDATE SET name = excluded.name, city = excluded.city" in sql
+
+
+def test_build_upsert_rejects_invalid_arguments():
+    with pytest.raises(ValueError):
+        build_upsert("sqlite", User.__table__, ["email"], ["email"], "replace")
+    with pytest.raises(ValueError):
+        build_upsert("mssql", User.__table__, ["email"], ["email"])
+
+
+def test_copy_dataframe_upsert_skips_existing_rows(engine):
+    users_df = pd.DataFrame({"name": ["a", "b"],
+                             "email": ["a@example.com", "b@example.com"]})
+    with engine.begin() as connection:
+        copy_dataframe(connection, User.__table__, users_df)
+        copy_dataframe(connection, User.__table__, users_df,
+                       conflict_columns=["email"])
+        count = connection.execute(select(func.count()).select_from(User)).scalar()
+    assert count == 2
+
+
+@pytest.mark.parametrize("on_conflict, city", [("update", "Gdansk"),
+                                               ("nothing", "Warsaw")])
+def test_copy_dataframe_upsert_with_repeated_key_in_a_chunk(engine, on_conflict,
+                                                           city):
+    # one INSERT ... ON CONFLICT DO UPDATE cannot affect a row twice
+    users_df = pd.DataFrame({"name": ["a", "b", "a"],
+                             "email": ["a@example.com", "b@example.com",
+                                       "a@example.com"],
+                             "city": ["Warsaw", "Cracow", "Gdansk"]})
+    chunks = list(iter_upsert_chunks(users_df, 10, ["email"], on_conflict))
+    assert [len(chunk) for chunk in chunks] == [2]
+    with engine.begin() as connection:
+        copy_dataframe(connection, User.__table__, users_df,
+                       conflict_columns=["email"], on_conflict=on_conflict)
+        cities = dict(connection.execute(select(User.email, User.city)).all())
+    assert cities == {"a@example.com": city, "b@example.com": "Cracow"}
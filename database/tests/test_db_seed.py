@@ -0,0 +1,279 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from database.db_seed import (
+    assign_customers,
+    fetch_user_ids,
+    file_rng,
+    iter_csv_chunks,
+    iter_orders_csv_chunks,
+    parse_args,
+    seed_data_from_csvs,
+    seed_data_parallel,
+)
+from flask_app.config import TestingConfig
+from database.models.base import Base
+from database.models.orders import Order
+from database.models.users import User
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    (tmp_path / 'users').mkdir()
+    (tmp_path / 'orders').mkdir()
+    (tmp_path / 'users' / 'users_a.csv').write_text(
+        "name;email;city\n"
+        "Ann;ann@a.com;Warsaw\n"
+        "Bob;bob@a.com;Cracow\n"
+        "Cid;cid@a.com;Warsaw\n"
+    )
+    (tmp_path / 'orders' / 'orders_202501.csv').write_text(
+        "product;quantity;total_price;order_date\n"
+        "Book;1;10;2025-01-01\n"
+        "Pen;2;4.5;2025-01-02\n"
+        "Book;3;30;2025-01-03\n"
+    )
+    (tmp_path / 'orders' / 'orders_202502.csv').write_text(
+        "product;quantity;total_price;order_date\n"
+        "Lamp;1;99;2025-02-01\n"
+        "Book;;10;2025-02-02\n"
+    )
+    return tmp_path
+
+
+def test_iter_csv_chunks_bounds_chunk_size(data_path):
+    csvs = sorted((data_path / 'orders').glob('*.csv'))
+    chunks = list(iter_csv_chunks(csvs, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1, 2]
+
+
+def test_iter_orders_csv_chunks_applies_dtypes(data_path):
+    chunk = next(iter_orders_csv_chunks(data_path, chunksize=10))
+    assert isinstance(chunk['product'].dtype, pd.CategoricalDtype)
+    assert chunk['quantity'].dtype == 'Int32'
+    assert pd.api.types.is_datetime64_any_dtype(chunk['order_date'])
+
+
+def test_iter_orders_csv_chunks_missing_directory(tmp_path):
+    (tmp_path / 'orders').mkdir()
+    with pytest.raises(FileNotFoundError):
+        iter_orders_csv_chunks(tmp_path)
+
+
+def test_seed_data_from_csvs_in_chunks(data_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed_data_from_csvs(session, chunk_size=2, data_path=data_path)
+        assert session.scalar(select(func.count()).select_from(User)) == 3
+        orders = session.execute(
+            select(Order).order_by(Order.id)).scalars().all()
+    assert [order.product for order in orders] == [
+        "Book", "Pen", "Book", "Lamp", "Book"]
+    assert orders[-1].quantity is None
+    assert str(orders[0].order_date) == "2025-01-01"
+    assert all(1 <= order.customer_id <= 3 for order in orders)
+
+
+def test_seed_data_from_csvs_reports_per_file_results(data_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        results = seed_data_from_csvs(session, data_path=data_path)
+    assert [(r.path.name, r.rows) for r in results] == [
+        ("users_a.csv", 3), ("orders_202501.csv", 3), ("orders_202502.csv", 2)]
+    assert all(r.rows_per_second > 0 for r in results)
+
+
+def test_seed_data_parallel(data_path, tmp_path):
+    (data_path / 'users' / 'users_b.csv').write_text(
+        "name;email;city\nDan;dan@b.com;Gdansk\n")
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'seed.db'}"
+
+    engine = create_engine(FileConfig.SQLALCHEMY_DATABASE_URI)
+    Base.metadata.create_all(engine)
+    results = seed_data_parallel(FileConfig, workers=2, data_path=data_path)
+    assert [r.rows for r in results] == [3, 1, 3, 2]
+    with Session(engine) as session:
+        assert session.scalar(select(func.count()).select_from(User)) == 4
+        customer_ids = session.execute(select(Order.customer_id)).scalars().all()
+        user_ids = set(session.execute(select(User.id)).scalars())
+    assert len(customer_ids) == 5
+    assert set(customer_ids) <= user_ids
+    engine.dispose()
+
+
+def test_seed_data_parallel_rejects_in_memory_sqlite(data_path):
+    with pytest.raises(ValueError):
+        seed_data_parallel(TestingConfig, workers=2, data_path=data_path)
+
+
+def test_parse_args():
+    args = parse_args(['--workers', '4', '--chunk-size', '100'])
+    assert args.workers == 4
+    assert args.chunk_size == 100
+    assert not args.concurrent_indexes
+    assert parse_args(['--concurrent-indexes']).concurrent_indexes
+
+
+def _seed_counts(engine, data_path, **kwargs):
+    with Session(engine) as session:
+        results = seed_data_from_csvs(session, data_path=data_path, **kwargs)
+        users = session.scalar(select(func.count()).select_from(User))
+        orders = session.scalar(select(func.count()).select_from(Order))
+    return results, users, orders
+
+
+def test_reseeding_skips_ingested_files(data_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    _, users, orders = _seed_counts(engine, data_path)
+    assert (users, orders) == (3, 5)
+
+    results, users, orders = _seed_counts(engine, data_path)
+    assert all(result.skipped for result in results)
+    assert (users, orders) == (3, 5)
+
+
+def test_reseeding_only_processes_new_files(data_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    _seed_counts(engine, data_path)
+    (data_path / 'orders' / 'orders_202503.csv').write_text(
+        "product;quantity;total_price;order_date\n"
+        "Mug;1;12;2025-03-01\n"
+    )
+    results, _, orders = _seed_counts(engine, data_path)
+    loaded = [r.path.name for r in results if not r.skipped]
+    assert loaded == ["orders_202503.csv"]
+    assert orders == 6
+
+
+def test_touched_file_is_recognised_by_hash(data_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    _seed_counts(engine, data_path)
+    users_csv = data_path / 'users' / 'users_a.csv'
+    users_csv.write_text(users_csv.read_text())
+    results, users, _ = _seed_counts(engine, data_path)
+    assert all(result.skipped for result in results)
+    assert users == 3
+
+
+def test_changed_users_file_is_upserted(data_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    _seed_counts(engine, data_path)
+    (data_path / 'users' / 'users_a.csv').write_text(
+        "name;email;city\n"
+        "Ann;ann@a.com;Gdansk\n"
+        "Eve;eve@a.com;Poznan\n"
+    )
+    _, users, _ = _seed_counts(engine, data_path)
+    with Session(engine) as session:
+        ann_city = session.scalar(select(User.city).where(User.email == "ann@a.com"))
+    assert users == 4
+    assert ann_city == "Warsaw"
+
+    (data_path / 'users' / 'users_a.csv').write_text(
+        "name;email;city\nAnn;ann@a.com;Gdansk\n")
+    _seed_counts(engine, data_path, on_conflict='update')
+    with Session(engine) as session:
+        ann_city = session.scalar(select(User.city).where(User.email == "ann@a.com"))
+    assert ann_city == "Gdansk"
+
+
+def test_changed_orders_file_is_refused(data_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    _seed_counts(engine, data_path)
+    orders_csv = data_path / 'orders' / 'orders_202502.csv'
+    orders_csv.write_text(orders_csv.read_text() + "Mug;1;12;2025-02-03\n")
+    with pytest.raises(ValueError, match="orders_202502.csv changed"):
+        _seed_counts(engine, data_path)
+    with Session(engine) as session:
+        assert session.scalar(select(func.count()).select_from(Order)) == 5
+
+
+def _customer_ids(engine):
+    # parallel workers commit files in any order, so ids are not comparable;
+    # order dates are unique in the fixture
+    with Session(engine) as session:
+        return session.execute(
+            select(Order.customer_id).order_by(Order.order_date)).scalars().all()
+
+
+def _customer_emails(engine):
+    with Session(engine) as session:
+        return session.execute(
+            select(User.email)
+            .join(Order, Order.customer_id == User.id)
+            .order_by(Order.order_date)).scalars().all()
+
+
+def test_orders_link_to_existing_user_ids(data_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # pre-populated table with a gap: only id 100 survives
+        session.add_all(User(name=f"old{i}", email=f"old{i}@x.com")
+                        for i in range(100))
+        session.commit()
+        session.query(User).filter(User.id < 100).delete()
+        session.commit()
+    _seed_counts(engine, data_path)
+    with Session(engine) as session:
+        user_ids = set(session.execute(select(User.id)).scalars())
+    assert user_ids == {100, 101, 102, 103}
+    assert set(_customer_ids(engine)) <= user_ids
+
+
+def test_customer_assignment_is_deterministic(data_path, tmp_path):
+    # with two users files, parallel workers insert users in any order
+    (data_path / 'users' / 'users_b.csv').write_text(
+        "name;email;city\n"
+        "Dan;dan@b.com;Gdansk\n"
+        "Ada;ada@b.com;Poznan\n"
+    )
+    first = create_engine("sqlite://")
+    second = create_engine("sqlite://")
+    for engine in (first, second):
+        Base.metadata.create_all(engine)
+        _seed_counts(engine, data_path, seed=7)
+    assert _customer_ids(first) == _customer_ids(second)
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'parallel.db'}"
+
+    parallel = create_engine(FileConfig.SQLALCHEMY_DATABASE_URI)
+    Base.metadata.create_all(parallel)
+    seed_data_parallel(FileConfig, workers=2, data_path=data_path, seed=7)
+    assert _customer_emails(parallel) == _customer_emails(first)
+    parallel.dispose()
+
+
+def test_file_rng_depends_on_relative_path(data_path):
+    csv_path = data_path / 'orders' / 'orders_202501.csv'
+    draws = [file_rng(csv_path, data_path, 1).integers(1 << 30) for _ in range(2)]
+    assert draws[0] == draws[1]
+    other = file_rng(data_path / 'orders' / 'orders_202502.csv', data_path, 1)
+    assert other.integers(1 << 30) != draws[0]
+
+
+def test_assign_customers_draws_from_given_ids():
+    user_ids = np.array([5, 17, 42], dtype=np.int64)
+    assigned = assign_customers(1000, user_ids, np.random.default_rng(0))
+    assert assigned.shape == (1000,)
+    assert set(assigned) == {5, 17, 42}
+
+
+def test_fetch_user_ids_requires_users():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection, pytest.raises(ValueError):
+        fetch_user_ids(connection)
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from database.db_init import get_engine_and_session
+from database.engine import (
+    InstrumentedQueuePool,
+    make_engine,
+    pool_options_from_env,
+    pool_stats,
+)
+from flask_app.app import create_app, db
+from flask_app.config import TestingConfig
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    engine = make_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "5")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    options = pool_options_from_env()
+    assert options == {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": 20,
+        "max_overflow": 5,
+        "pool_timeout": 2.5,
+        "pool_recycle": 600,
+        "pool_pre_ping": False,
+    }
+
+
+def test_pool_stats_track_checkouts_and_overflow(pooled_engine):
+    first = pooled_engine.connect()
+    second = pooled_engine.connect()
+    stats = pool_stats(pooled_engine, {"max_overflow": 1})
+    assert stats["pool_class"] == "InstrumentedQueuePool"
+    assert stats["checkedout"] == 2
+    assert stats["overflow"] == 1
+    assert stats["max_overflow"] == 1
+    with pytest.raises(PoolTimeoutError):
+        pooled_engine.connect()
+    first.close()
+    second.close()
+    stats = pool_stats(pooled_engine)
+    assert stats["checkedout"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["wait_time_max"] >= 0.05
+
+
+def test_get_engine_and_session_uses_engine_options(tmp_path):
+    class PooledConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'seed.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            "poolclass": InstrumentedQueuePool, "pool_size": 3}
+
+    engine, SessionLocal = get_engine_and_session(PooledConfig)
+    with SessionLocal() as session:
+        assert session.execute(text("SELECT 1")).scalar() == 1
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    assert engine.pool.size() == 3
+
+
+def test_pool_stats_default_max_overflow(pooled_engine):
+    assert pool_stats(pooled_engine)["max_overflow"] == 10
+
+
+def test_flask_engine_uses_engine_options(tmp_path):
+    class PooledConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            "poolclass": InstrumentedQueuePool, "pool_size": 2}
+
+    app = create_app(PooledConfig)
+    with app.app_context():
+        assert isinstance(db.engine.pool, InstrumentedQueuePool)
+    response = app.test_client().get("/metrics/pool")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["size"] == 2
+    assert data["max_overflow"] == 10
+    assert {"checkedout", "overflow", "wait_time_total"} <= set(data)
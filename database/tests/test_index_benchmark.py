@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine, func, inspect, select
+
+from database.index_benchmark import (
+    LOOKUPS,
+    check_scratch_database,
+    parse_args,
+    run_benchmark,
+    top_up,
+)
+from database.db_seed import create_tables
+from database.models.orders import Order
+
+
+def test_top_up_only_inserts_missing_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    create_tables(engine)
+    assert top_up(engine, users=20, orders=90, months=3) == (20, 90)
+    assert top_up(engine, users=25, orders=90, months=3) == (5, 0)
+    with engine.connect() as connection:
+        months = connection.scalar(
+            select(func.count(func.distinct(func.strftime('%m', Order.order_date)))))
+    assert months == 3
+
+
+def test_run_benchmark_times_lookups_and_restores_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    report = run_benchmark(engine, users=30, orders=300, lookups=5, months=2)
+    assert report['rows'] == {'users': 30, 'orders': 300}
+    assert set(report['before']) == set(report['after']) == set(LOOKUPS)
+    assert "ix_orders_customer_id_order_date" not in report['before'][
+        'latest_orders']['plan']
+    assert "ix_orders_customer_id_order_date" in report['after'][
+        'latest_orders']['plan']
+    indexes = {index['name'] for index in inspect(engine).get_indexes('orders')}
+    assert "ix_orders_customer_id_order_date" in indexes
+
+
+def test_parse_args_defaults_to_ten_million_orders():
+    args = parse_args(['--database-url', 'sqlite:///bench.db'])
+    assert args.orders == 10_000_000
+    assert args.report is None
+
+
+def test_parse_args_requires_database_url():
+    with pytest.raises(SystemExit):
+        parse_args([])
+
+
+def test_check_scratch_database_refuses_app_database():
+    app_urls = ["postgresql://app:secret@db:5432/mydb", "sqlite:///:memory:"]
+    with pytest.raises(ValueError, match="scratch database"):
+        check_scratch_database("postgresql+psycopg2://other@db/mydb", app_urls)
+    check_scratch_database("postgresql://app:secret@db:5432/bench", app_urls)
+    check_scratch_database("postgresql://app:secret@db:5433/mydb", app_urls)
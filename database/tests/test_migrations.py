@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from database.migrations import (
+    _concurrently,
+    ensure_indexes,
+    missing_indexes,
+    retired_indexes,
+)
+from database.models.base import Base
+from database.models.orders import Order
+
+NEW_INDEXES = {
+    "ix_orders_customer_id_order_date", "ix_orders_order_date", "ix_users_city"}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    # simulate a database created before the indexes were declared
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+    yield engine
+    engine.dispose()
+
+
+def _index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_missing_indexes_lists_undeclared_indexes(engine):
+    assert {index.name for index in missing_indexes(engine)} == NEW_INDEXES
+
+
+def test_ensure_indexes_creates_missing_indexes(engine):
+    assert set(ensure_indexes(engine)) == NEW_INDEXES
+    assert {"ix_orders_customer_id_order_date",
+            "ix_orders_order_date"} <= _index_names(engine, "orders")
+    assert "ix_users_city" in _index_names(engine, "users")
+
+
+def test_ensure_indexes_is_idempotent(engine):
+    ensure_indexes(engine)
+    assert ensure_indexes(engine) == []
+
+
+def test_missing_indexes_skips_absent_tables():
+    engine = create_engine("sqlite://")
+    assert missing_indexes(engine) == []
+
+
+def test_ensure_indexes_drops_retired_indexes(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX ix_orders_customer_id ON orders (customer_id)"))
+    assert retired_indexes(engine) == ["ix_orders_customer_id"]
+    ensure_indexes(engine)
+    assert "ix_orders_customer_id" not in _index_names(engine, "orders")
+    assert retired_indexes(engine) == []
+
+
+def test_ensure_indexes_concurrently_is_ignored_outside_postgres(engine):
+    assert set(ensure_indexes(engine, concurrently=True)) == NEW_INDEXES
+
+
+def test_concurrently_only_affects_the_build_in_scope():
+    index = next(index for index in Order.__table__.indexes
+                 if index.name == "ix_orders_customer_id_order_date")
+    dialect = postgresql.dialect()
+    with _concurrently(index):
+        ddl = str(CreateIndex(index).compile(dialect=dialect))
+    assert ddl.startswith("CREATE INDEX CONCURRENTLY")
+    assert "CONCURRENTLY" not in str(CreateIndex(index).compile(dialect=dialect))
@@ -0,0 +1,129 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+
+from database.db_seed import create_tables
+from database.models.order_stats import OrderDailyStats
+from database.models.orders import Order
+from database.models.users import User
+from database.order_stats import (
+    DIMENSIONS,
+    order_stats,
+    parse_args,
+    refresh_order_stats,
+    stats_statement,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    create_tables(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"name": "Ann", "email": "ann@a.com", "city": "Warsaw"},
+            {"name": "Bob", "email": "bob@a.com", "city": "Cracow"},
+        ])
+        add_orders(connection, [
+            (1, "Book", 1, 10.0, date(2025, 1, 1)),
+            (1, "Pen", 2, 4.5, date(2025, 1, 1)),
+            (2, "Book", 3, 30.0, date(2025, 1, 2)),
+            (2, "Book", 1, 10.0, date(2025, 2, 1)),
+        ])
+    yield engine
+    engine.dispose()
+
+
+def add_orders(connection, orders):
+    connection.execute(insert(Order), [
+        {"customer_id": customer_id, "product": product, "quantity": quantity,
+         "total_price": total_price, "order_date": order_date}
+        for customer_id, product, quantity, total_price, order_date in orders
+    ])
+
+
+def test_order_stats_by_product(engine):
+    with engine.connect() as connection:
+        assert order_stats(connection, "product") == [
+            {"product": "Book", "orders": 3, "quantity": 5, "revenue": 50.0},
+            {"product": "Pen", "orders": 1, "quantity": 2, "revenue": 4.5},
+        ]
+
+
+def test_order_stats_by_day_month_and_city(engine):
+    with engine.connect() as connection:
+        assert [row["day"] for row in order_stats(connection, "day")] == [
+            "2025-01-01", "2025-01-02", "2025-02-01"]
+        assert [(row["month"], row["orders"])
+                for row in order_stats(connection, "month")] == [
+            ("2025-01", 3), ("2025-02", 1)]
+        assert [(row["city"], row["revenue"])
+                for row in order_stats(connection, "city")] == [
+            ("Cracow", 40.0), ("Warsaw", 14.5)]
+
+
+def test_order_stats_filters(engine):
+    with engine.connect() as connection:
+        rows = order_stats(connection, "product", city="Cracow",
+                           order_date_to=date(2025, 1, 31))
+    assert rows == [
+        {"product": "Book", "orders": 1, "quantity": 3, "revenue": 30.0}]
+
+
+def test_stats_statement_rejects_unknown_dimension():
+    with pytest.raises(ValueError):
+        stats_statement("weekday", "sqlite")
+
+
+def assert_summary_matches_orders(connection):
+    for dimension in DIMENSIONS:
+        assert order_stats(connection, dimension, summary=True) == order_stats(
+            connection, dimension)
+
+
+def test_full_refresh_matches_live_stats(engine):
+    with engine.begin() as connection:
+        result = refresh_order_stats(connection, full=True)
+        assert result.last_order_id == 4
+        assert result.summary_rows == 4
+        assert_summary_matches_orders(connection)
+
+
+def test_incremental_refresh_only_recomputes_days_with_new_orders(engine):
+    with engine.begin() as connection:
+        refresh_order_stats(connection)
+        add_orders(connection, [
+            (1, "Book", 1, 10.0, date(2025, 1, 2)),
+            (2, "Mug", 1, 8.0, date(2025, 3, 1)),
+            (2, "Mug", 1, 8.0, None),
+        ])
+        untouched = connection.scalar(
+            select(OrderDailyStats.id)
+            .where(OrderDailyStats.order_date == date(2025, 2, 1)))
+
+        result = refresh_order_stats(connection)
+
+        assert result.last_order_id == 7
+        # 2025-01-02 (Book, Warsaw and Cracow), 2025-03-01 and the undated order
+        assert result.summary_rows == 4
+        assert connection.scalar(
+            select(OrderDailyStats.id)
+            .where(OrderDailyStats.order_date == date(2025, 2, 1))) == untouched
+        assert_summary_matches_orders(connection)
+
+
+def test_refresh_without_new_orders_is_a_no_op(engine):
+    with engine.begin() as connection:
+        refresh_order_stats(connection)
+        rows = connection.scalar(
+            select(func.count()).select_from(OrderDailyStats))
+        result = refresh_order_stats(connection)
+        assert (result.last_order_id, result.summary_rows) == (4, 0)
+        assert connection.scalar(
+            select(func.count()).select_from(OrderDailyStats)) == rows
+
+
+def test_parse_args():
+    assert not parse_args([]).full
+    assert parse_args(["--full"]).full
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from database.db_seed import seed_data_from_csvs
+from database.models.base import Base
+from database.models.orders import Order
+from database.models.users import User
+from database.synthetic_data import (
+    CITIES,
+    PRODUCTS,
+    generate_orders,
+    generate_users,
+    write_dataset,
+)
+
+
+def _read(paths):
+    return pd.concat([pd.read_csv(path, sep=';') for path in paths],
+                     ignore_index=True)
+
+
+def test_generate_users_emails_unique_across_chunks():
+    rng = np.random.default_rng(0)
+    first = generate_users(1000, rng, start_index=0)
+    second = generate_users(1000, rng, start_index=1000)
+    emails = pd.concat([first['email'], second['email']])
+    assert emails.is_unique
+    assert set(first['city']) <= set(CITIES)
+    assert first['email'].str.fullmatch(r'[a-z]+[0-9a-f]{8}@[a-z]+\.com').all()
+
+
+def test_generate_orders_stay_in_month():
+    month = pd.Period('2024-02', freq='M')
+    orders = generate_orders(5000, np.random.default_rng(0), month)
+    dates = pd.to_datetime(orders['order_date'])
+    assert (dates.dt.to_period('M') == month).all()
+    assert orders['quantity'].between(1, 10).all()
+    assert (orders['total_price'] > 0).all()
+    # the most popular product clearly dominates the least popular one
+    counts = orders['product'].value_counts()
+    assert set(counts.index) <= set(PRODUCTS)
+    assert counts[next(iter(PRODUCTS))] > 3 * counts.get('Action Camera', 0)
+
+
+def test_write_dataset_layout_and_determinism(tmp_path):
+    files = write_dataset(tmp_path / 'a', users=500, orders=1000,
+                          start_month='2025-11', months=3, seed=7,
+                          chunk_rows=300)
+    again = write_dataset(tmp_path / 'b', users=500, orders=1000,
+                          start_month='2025-11', months=3, seed=7,
+                          chunk_rows=300)
+    orders_files = [path.name for path in files if path.parent.name == 'orders']
+    assert orders_files == [
+        'orders_202511.csv', 'orders_202512.csv', 'orders_202601.csv']
+    assert [path.read_bytes() for path in files] == [
+        path.read_bytes() for path in again]
+
+    users = _read(p for p in files if p.parent.name == 'users')
+    orders = _read(p for p in files if p.parent.name == 'orders')
+    assert list(users.columns) == ['name', 'email', 'city']
+    assert list(orders.columns) == [
+        'product', 'quantity', 'total_price', 'order_date']
+    assert len(users) == 500 and users['email'].is_unique
+    assert len(orders) == 1000
+
+
+def test_db_seed_consumes_generated_dataset(tmp_path):
+    write_dataset(tmp_path, users=300, orders=900, months=2, seed=1)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed_data_from_csvs(session, data_path=tmp_path)
+        assert session.scalar(select(func.count()).select_from(User)) == 300
+        assert session.scalar(select(func.count()).select_from(Order)) == 900
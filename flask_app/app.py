@@ -2,19 +2,27 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 
+from flask_app.cache import ResponseCache
+from flask_app.instrumentation import SQLInstrumentation
+from flask_app.json_provider import create_json_provider
+from flask_app.request_metrics import RequestMetrics
 from flask_app.routes.errors import register_error_handlers
 
 
 db = SQLAlchemy()
 ma = Marshmallow()
+cache = ResponseCache()
+sql_instrumentation = SQLInstrumentation()
+request_metrics = RequestMetrics()
 
 
 def create_app(config_name):
     """
     Create and configure the Flask application.
 
-    This function initializes the Flask app, sets up the database and
-    Marshmallow, and registers the API routes.
+    This function initializes the Flask app, sets up the database,
+    Marshmallow, the response cache, request metrics and the optional SQL
+    instrumentation, and registers the API routes.
 
     Parameters
     ----------
@@ -27,19 +35,26 @@ def create_app(config_name):
         The configured Flask application instance.
     """
     # import routes
-    from flask_app.routes.orders import orders_bp
+    from flask_app.routes.orders import orders_bp, order_stats_source
     from flask_app.routes.users import users_bp
+    from flask_app.routes.metrics import metrics_bp
     # import error handlers
     # from flask_app.routes.errors import register_error_handlers
     app = Flask(__name__)
     app.config.from_object(config_name)
+    app.json = create_json_provider(app)
+    order_stats_source(app.config)
 
     db.init_app(app)
     ma.init_app(app)
+    cache.init_app(app)
+    sql_instrumentation.init_app(app)
+    request_metrics.init_app(app)
 
     # register the routes
     app.register_blueprint(orders_bp)
     app.register_blueprint(users_bp)
+    app.register_blueprint(metrics_bp)
     # register the error handlers
     register_error_handlers(app=app)
 
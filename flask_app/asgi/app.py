@@ -0,0 +1,224 @@
+"""
+ASGI serving mode of the API.
+
+``create_asgi_app`` builds a Starlette application exposing the users and
+orders routes of the Flask app with the same URLs, payloads, JSON bytes
+and error shapes, but with ``async`` handlers on SQLAlchemy's asyncio
+engine (asyncpg for PostgreSQL, aiosqlite for SQLite). A request waiting
+on the database no longer holds a worker thread, so one process keeps as
+many requests in flight as the event loop can schedule; the database work
+itself is bounded by ``DB_POOL_SIZE + DB_MAX_OVERFLOW`` connections, and
+requests beyond that wait on the pool without blocking anything.
+
+The schemas, filters, pagination arguments and compiled serializers are
+shared with the Flask routes. The response cache, ``/metrics`` and the SQL
+instrumentation remain Flask-only.
+
+Run it with ``uvicorn asgi:app --workers N``.
+"""
+import json
+from contextlib import asynccontextmanager
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.exc import IntegrityError, OperationalError
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.routing import Route
+
+from database.engine import make_async_engine
+from flask_app.routes.errors import APIError
+
+JSON_MIMETYPE = "application/json"
+
+
+def _config_dict(config):
+    # the same view of a config object as Flask's config.from_object
+    return {key: getattr(config, key) for key in dir(config) if key.isupper()}
+
+
+def make_json_encoder(config, compact=True):
+    """
+    Build the function encoding response bodies, following ``JSON_PROVIDER``.
+
+    The output matches the Flask JSON providers: sorted keys and a trailing
+    newline, with ``,``/``:`` separators for ``compact`` response bodies.
+    ``compact=False`` mirrors ``app.json.dumps``, which the NDJSON stream
+    uses for its lines (only the stdlib provider tells the two apart).
+
+    Raises
+    ------
+    ValueError
+        If the provider name is unknown.
+    RuntimeError
+        If ``orjson`` is selected but not installed.
+    """
+    provider = config.get("JSON_PROVIDER", "default")
+    if provider == "default":
+        default = DefaultJSONProvider.default
+        separators = (",", ":") if compact else None
+
+        def encode(obj):
+            return (json.dumps(obj, default=default, sort_keys=True,
+                               separators=separators) + "\n").encode()
+        return encode
+    if provider == "orjson":
+        try:
+            import orjson
+        except ImportError as err:
+            raise RuntimeError(
+                "JSON_PROVIDER is 'orjson' but the orjson package is not "
+                "installed."
+            ) from err
+        option = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+                  | orjson.OPT_SORT_KEYS)
+
+        def encode(obj):
+            return orjson.dumps(
+                obj, default=DefaultJSONProvider.default, option=option) + b"\n"
+        return encode
+    raise ValueError(
+        f"Invalid JSON_PROVIDER value: {provider}. "
+        "Please use one of ('default', 'orjson')."
+    )
+
+
+def json_response(request, content, status_code=200, headers=None):
+    """
+    Encode ``content`` with the app's JSON encoder into a response.
+    """
+    return Response(request.app.state.json_encode(content), status_code,
+                    headers=headers, media_type=JSON_MIMETYPE)
+
+
+async def json_body(request):
+    """
+    The decoded JSON body of a request.
+
+    Raises
+    ------
+    APIError
+        400 if the body is not valid JSON.
+    """
+    try:
+        return await request.json()
+    except ValueError:
+        raise APIError("Request body must be valid JSON.", 400)
+
+
+@asynccontextmanager
+async def transaction(request, on_conflict_message=None):
+    """
+    A session in a transaction committed when the block exits cleanly.
+
+    The async counterpart of the ``transactional`` decorator: an
+    ``IntegrityError`` rolls back and becomes ``APIError(409)``.
+    """
+    async with request.app.state.sessionmaker() as session:
+        try:
+            async with session.begin():
+                yield session
+        except IntegrityError:
+            msg = on_conflict_message or "Database constraint violated."
+            raise APIError(msg, 409)
+
+
+def register_error_handlers():
+    """
+    Exception handlers returning the error bodies of the Flask app.
+
+    Returns
+    -------
+    dict
+        Starlette ``exception_handlers`` keyed by exception class or status.
+    """
+    async def handle_api_error(request, err):
+        return json_response(request, {"error": err.message}, err.code)
+
+    async def handle_db_error(request, err):
+        return json_response(request, {
+            "error": (
+                "Database connection failed. "
+                "Please ensure the database exists and is accessible."
+            ),
+            "path": request.url.path
+        }, 500)
+
+    async def handle_integrity_error(request, err):
+        return json_response(request, {
+            "error": "Integrity error occurred. Please check your data.",
+            "details": str(err.orig)
+        }, 409)
+
+    async def handle_http_error(request, err):
+        if err.status_code == 404:
+            error = f"Resource not found at '{request.url.path}'"
+        elif err.status_code == 405:
+            error = (f"Method '{request.method}' not allowed "
+                     f"on endpoint '{request.url.path}'")
+        else:
+            error = err.detail
+        return json_response(request, {"error": error}, err.status_code,
+                             headers=getattr(err, "headers", None))
+
+    async def handle_500(request, err):
+        return json_response(request, {
+            "error": "Internal server error.",
+            "path": request.url.path
+        }, 500)
+
+    return {
+        APIError: handle_api_error,
+        OperationalError: handle_db_error,
+        IntegrityError: handle_integrity_error,
+        HTTPException: handle_http_error,
+        Exception: handle_500,
+    }
+
+
+async def hello_world(request):
+    return Response("hello to the pokemon world!", media_type="text/plain")
+
+
+def create_asgi_app(config_name):
+    """
+    Create and configure the ASGI application.
+
+    Parameters
+    ----------
+    config_name : str
+        The configuration object to use, as for ``create_app``.
+
+    Returns
+    -------
+    Starlette
+        The configured application. Its engine is disposed on shutdown.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from flask_app.asgi.routes import routes
+    from flask_app.routes.orders import order_stats_source
+
+    config = _config_dict(config_name)
+    order_stats_source(config)
+    engine = make_async_engine(
+        config["SQLALCHEMY_DATABASE_URI"],
+        **config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    app = Starlette(
+        routes=[Route("/", hello_world), *routes],
+        exception_handlers=register_error_handlers(),
+        lifespan=lifespan,
+    )
+    app.state.config = config
+    app.state.engine = engine
+    # expire_on_commit=False: rows are dumped after the transaction closed
+    app.state.sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    app.state.json_encode = make_json_encoder(config)
+    app.state.ndjson_encode = make_json_encoder(config, compact=False)
+    return app
@@ -0,0 +1,280 @@
+"""
+Async handlers of the users and orders routes.
+
+Each handler mirrors its Flask view in ``flask_app.routes``. Writes go
+through single ``INSERT/UPDATE/DELETE ... RETURNING`` statements, so a
+create, update or delete is one database round trip.
+"""
+from urllib.parse import urlencode
+
+from sqlalchemy import delete, insert, select, update
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from database.models.orders import Order
+from database.models.users import User
+from database.order_stats import DIMENSIONS, order_stats
+from flask_app.asgi.app import json_body, json_response, transaction
+from flask_app.routes.errors import APIError
+from flask_app.routes.orders import (
+    ORDER_FILTERS,
+    ORDER_STATS_FILTERS,
+    multiple_orders_schema,
+    signle_order_schema,
+)
+from flask_app.routes.users import (
+    USER_FILTERS,
+    multiple_users_schema,
+    single_user_schema,
+)
+from flask_app.routes.utils.filters import (
+    filter_clauses,
+    filter_values,
+    get_fields_arg,
+)
+from flask_app.routes.utils.pagination import (
+    NDJSON_MIMETYPE,
+    get_keyset_args,
+    project_columns,
+)
+from flask_app.routes.utils.payloads import load_many, load_one
+from flask_app.schemas.compiled import serializer_for
+from flask_app.schemas.orders import OrderSchema
+from flask_app.schemas.users import UserSchema
+
+# rows are written with Core-style INSERT/UPDATE statements, so payloads
+# are loaded as dicts instead of model instances
+user_payload_schema = UserSchema(load_instance=False)
+bulk_users_schema = UserSchema(many=True, load_instance=False)
+order_payload_schema = OrderSchema(load_instance=False)
+bulk_orders_schema = OrderSchema(many=True, load_instance=False)
+
+
+def wants_ndjson(request):
+    # same rules as the Flask helper: ?format=ndjson or a preferred Accept
+    if request.query_params.get("format") == "ndjson":
+        return True
+    accept = parse_accept_header(request.headers.get("accept"), MIMEAccept)
+    return accept.best == NDJSON_MIMETYPE
+
+
+async def keyset_response(request, statement, pk_column, schema):
+    """
+    Async counterpart of ``flask_app.routes.utils.pagination.keyset_response``.
+    """
+    config = request.app.state.config
+    args = request.query_params
+    streaming = wants_ndjson(request)
+    default_limit = None if streaming else config["PAGE_SIZE_DEFAULT"]
+    after_id, limit = get_keyset_args(
+        default_limit, args, config["PAGE_SIZE_MAX"])
+
+    statement = statement.where(pk_column > after_id).order_by(pk_column)
+    statement, schema, projected = project_columns(
+        statement, pk_column, schema, get_fields_arg(schema, args))
+    serializer = serializer_for(schema)
+    if streaming:
+        if limit is not None:
+            statement = statement.limit(limit)
+        return ndjson_response(request, statement, serializer, projected)
+
+    async with request.app.state.sessionmaker() as session:
+        result = await session.execute(statement.limit(limit + 1))
+        rows = (result if projected else result.scalars()).all()
+    has_next_page = len(rows) > limit
+    rows = rows[:limit]
+    headers = {}
+    if has_next_page:
+        next_after_id = getattr(rows[-1], pk_column.key)
+        query_args = dict(args)
+        query_args.update(after_id=next_after_id, limit=limit)
+        # werkzeug's safe characters, so the link matches Flask's url_for
+        query = urlencode(query_args, safe="!$'()*,/:;?@")
+        next_url = f"{request.url.path}?{query}"
+        headers["X-Next-After-Id"] = str(next_after_id)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return json_response(request, serializer.dump(rows), headers=headers)
+
+
+def ndjson_response(request, statement, serializer, projected):
+    """
+    Stream rows as NDJSON through a server-side cursor, one chunk of
+    ``STREAM_CHUNK_SIZE`` rows per round trip.
+    """
+    chunk_size = request.app.state.config["STREAM_CHUNK_SIZE"]
+    encode = request.app.state.ndjson_encode
+
+    async def generate():
+        async with request.app.state.sessionmaker() as session:
+            result = await session.stream(
+                statement.execution_options(yield_per=chunk_size))
+            rows = result if projected else result.scalars()
+            async for chunk in rows.partitions():
+                yield b"".join(encode(item) for item in serializer.dump(chunk))
+
+    return StreamingResponse(generate(), media_type=NDJSON_MIMETYPE)
+
+
+async def create_rows(request, model, schema, rows, on_conflict_message):
+    async with transaction(request, on_conflict_message) as session:
+        created = (await session.scalars(
+            insert(model).returning(model, sort_by_parameter_order=True),
+            rows,
+            execution_options={"render_nulls": True},
+        )).all()
+    return schema.dump(created)
+
+
+async def get_row(request, model, row_id, schema, not_found_message):
+    async with request.app.state.sessionmaker() as session:
+        row = await session.get(model, row_id)
+    if row is None:
+        raise APIError(not_found_message, 404)
+    return json_response(request, serializer_for(schema).dump(row))
+
+
+async def update_row(request, model, row_id, schema, payload_schema,
+                     not_found_message, on_conflict_message):
+    data = load_one(payload_schema, await json_body(request), partial=True)
+    async with transaction(request, on_conflict_message) as session:
+        if data:
+            statement = (update(model)
+                         .where(model.id == row_id)
+                         .values(**data)
+                         .returning(model))
+            row = (await session.scalars(statement)).one_or_none()
+        else:
+            row = await session.get(model, row_id)
+        if row is None:
+            raise APIError(not_found_message, 404)
+    return json_response(request, schema.dump(row))
+
+
+async def delete_row(request, model, row_id, not_found_message,
+                     on_conflict_message, deleted_message):
+    async with transaction(request, on_conflict_message) as session:
+        deleted_id = await session.scalar(
+            delete(model).where(model.id == row_id).returning(model.id))
+        if deleted_id is None:
+            raise APIError(not_found_message, 404)
+    return json_response(request, {"message": deleted_message})
+
+
+async def create_user(request):
+    data = load_one(user_payload_schema, await json_body(request))
+    created = await create_rows(
+        request, User, multiple_users_schema, [data],
+        "User already exists or violates a constraint.")
+    return json_response(request, created[0], 201)
+
+
+async def create_users_bulk(request):
+    rows = load_many(bulk_users_schema, await json_body(request),
+                     request.app.state.config["BULK_MAX_ROWS"])
+    created = await create_rows(
+        request, User, multiple_users_schema, rows,
+        "One or more users already exist or violate a constraint.")
+    return json_response(request, created, 201)
+
+
+async def get_users(request):
+    statement = select(User).where(
+        *filter_clauses(USER_FILTERS, request.query_params))
+    return await keyset_response(request, statement, User.id,
+                                 multiple_users_schema)
+
+
+async def get_user(request):
+    return await get_row(request, User, request.path_params["user_id"],
+                         single_user_schema, "User not found")
+
+
+async def update_user(request):
+    return await update_row(
+        request, User, request.path_params["user_id"], single_user_schema,
+        user_payload_schema, "User not found",
+        "User update violates a constraint.")
+
+
+async def delete_user(request):
+    return await delete_row(
+        request, User, request.path_params["user_id"], "User not found",
+        "User delete violates a constraint.", "User deleted")
+
+
+async def create_order(request):
+    data = load_one(order_payload_schema, await json_body(request))
+    created = await create_rows(
+        request, Order, multiple_orders_schema, [data],
+        "Order already exists or violates a constraint.")
+    return json_response(request, created[0], 201)
+
+
+async def create_orders_bulk(request):
+    rows = load_many(bulk_orders_schema, await json_body(request),
+                     request.app.state.config["BULK_MAX_ROWS"])
+    created = await create_rows(
+        request, Order, multiple_orders_schema, rows,
+        "One or more orders violate a constraint.")
+    return json_response(request, created, 201)
+
+
+async def get_orders(request):
+    statement = select(Order).where(
+        *filter_clauses(ORDER_FILTERS, request.query_params))
+    return await keyset_response(request, statement, Order.id,
+                                 multiple_orders_schema)
+
+
+async def get_order_stats(request):
+    dimension = request.path_params["dimension"]
+    if dimension not in DIMENSIONS:
+        raise APIError(
+            f"Unknown statistics dimension; use one of: {', '.join(DIMENSIONS)}.",
+            404)
+    # validated by create_asgi_app
+    source = request.app.state.config.get("ORDER_STATS_SOURCE", "orders")
+    filters = filter_values(ORDER_STATS_FILTERS, request.query_params)
+    async with request.app.state.sessionmaker() as session:
+        stats = await session.run_sync(
+            lambda sync_session: order_stats(
+                sync_session.connection(), dimension,
+                summary=source == "summary", **filters))
+    return json_response(request, stats, headers={"X-Stats-Source": source})
+
+
+async def get_order(request):
+    return await get_row(request, Order, request.path_params["order_id"],
+                         signle_order_schema, "Order not found")
+
+
+async def update_order(request):
+    return await update_row(
+        request, Order, request.path_params["order_id"], signle_order_schema,
+        order_payload_schema, "Order not found",
+        "Order update violates a constraint.")
+
+
+async def delete_order(request):
+    return await delete_row(
+        request, Order, request.path_params["order_id"], "Order not found",
+        "Order delete violates a constraint.", "Order deleted")
+
+
+routes = [
+    Route("/users", create_user, methods=["POST"]),
+    Route("/users", get_users, methods=["GET"]),
+    Route("/users/bulk", create_users_bulk, methods=["POST"]),
+    Route("/users/{user_id:int}", get_user, methods=["GET"]),
+    Route("/users/{user_id:int}", update_user, methods=["PUT"]),
+    Route("/users/{user_id:int}", delete_user, methods=["DELETE"]),
+    Route("/orders/", create_order, methods=["POST"]),
+    Route("/orders/", get_orders, methods=["GET"]),
+    Route("/orders/bulk", create_orders_bulk, methods=["POST"]),
+    Route("/orders/stats/{dimension}", get_order_stats, methods=["GET"]),
+    Route("/orders/{order_id:int}", get_order, methods=["GET"]),
+    Route("/orders/{order_id:int}", update_order, methods=["PUT"]),
+    Route("/orders/{order_id:int}", delete_order, methods=["DELETE"]),
+]
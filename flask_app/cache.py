@@ -0,0 +1,245 @@
+"""
+Response cache backends and the Flask extension using them.
+
+Entries are versioned: every key has a generation, bumped when the entity
+is written, and a response is stored under its key and the generation read
+before the view ran. A fill that raced with a write stores its (stale) body
+under the old generation, which is never read again, instead of
+overwriting the invalidation.
+
+A bump draws a value never handed out before (a counter shared by all
+keys), and a generation expires ``GENERATION_TTL_FACTOR`` entry TTLs after
+its last bump. By then every entry stored under an older value of the key
+has expired, so a key falling back to generation 0 cannot serve a stale
+entry, and the generations kept are bounded by the keys written within
+that window instead of growing with every entity ever written.
+"""
+import itertools
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from flask import current_app
+
+GENERATION_TTL_FACTOR = 2
+
+
+class LRUCache:
+    """
+    In-process LRU cache with a per-entry time to live.
+
+    Parameters
+    ----------
+    max_entries : int
+        Number of entries kept before the least recently used one is evicted.
+    ttl : float
+        Seconds an entry stays valid after it was stored.
+    clock : callable, optional
+        Returns the current time in seconds, ``time.monotonic`` by default.
+
+    Notes
+    -----
+    Every process has its own store and an invalidation only reaches the
+    process serving the write, so this backend is correct only with a
+    single worker process.
+    """
+
+    def __init__(self, max_entries=10000, ttl=60, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        # key -> (expires_at, generation) in bump order, kept apart from the
+        # entries so that LRU eviction never resets a generation
+        self._generations = OrderedDict()
+        self._counter = itertools.count(1)
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def generation(self, key):
+        with self._lock:
+            entry = self._generations.get(key)
+            if entry is None or entry[0] <= self._clock():
+                return 0
+            return entry[1]
+
+    def bump(self, *keys):
+        with self._lock:
+            now = self._clock()
+            expires_at = now + self.ttl * GENERATION_TTL_FACTOR
+            for key in keys:
+                self._generations[key] = (expires_at, next(self._counter))
+                self._generations.move_to_end(key)
+            # bump order is expiry order: drop the expired ones from the front
+            while self._generations:
+                key, (oldest, _) = next(iter(self._generations.items()))
+                if oldest > now:
+                    break
+                del self._generations[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Cache backed by a Redis-compatible client.
+
+    Any client exposing ``get``, ``set(key, value, ex=...)``, ``incr`` and
+    ``delete`` works, so a local stand-in (e.g. fakeredis) can be used in
+    place of a real server.
+
+    Parameters
+    ----------
+    client : object
+        The Redis-compatible client.
+    ttl : int
+        Seconds an entry stays valid after it was stored.
+    prefix : str
+        Prefix added to every key to share the server with other apps.
+    """
+
+    def __init__(self, client, ttl=60, prefix="flask_app:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def generation(self, key):
+        return int(self.client.get(f"{self.prefix}generation:{key}") or 0)
+
+    def bump(self, *keys):
+        for key in keys:
+            generation = self.client.incr(f"{self.prefix}generation")
+            self.client.set(f"{self.prefix}generation:{key}", generation,
+                            ex=self.ttl * GENERATION_TTL_FACTOR)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache_backend(config):
+    """
+    Build the cache backend described by the application config.
+
+    Parameters
+    ----------
+    config : Mapping
+        The Flask config. ``RESPONSE_CACHE_BACKEND`` selects ``"none"``
+        (default), ``"redis"`` or ``"memory"`` (single process only).
+
+    Returns
+    -------
+    LRUCache or RedisCache or None
+        The backend, or ``None`` when caching is disabled.
+
+    Raises
+    ------
+    ValueError
+        If the backend name is unknown.
+    RuntimeError
+        If the Redis backend is selected without a client and the ``redis``
+        package is not installed.
+    """
+    backend = config.get("RESPONSE_CACHE_BACKEND", "none")
+    ttl = config.get("RESPONSE_CACHE_TTL", 60)
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return LRUCache(
+            max_entries=config.get("RESPONSE_CACHE_MAX_ENTRIES", 10000), ttl=ttl)
+    if backend == "redis":
+        client = config.get("RESPONSE_CACHE_REDIS_CLIENT")
+        if client is None:
+            try:
+                import redis
+            except ImportError as err:
+                raise RuntimeError(
+                    "RESPONSE_CACHE_BACKEND is 'redis' but the redis package "
+                    "is not installed."
+                ) from err
+            client = redis.Redis.from_url(config["RESPONSE_CACHE_REDIS_URL"])
+        return RedisCache(client, ttl=ttl)
+    raise ValueError(
+        f"Invalid RESPONSE_CACHE_BACKEND value: {backend}. "
+        "Please set it to 'memory', 'redis' or 'none'."
+    )
+
+
+class ResponseCache:
+    """
+    Flask extension holding serialized JSON responses keyed by entity.
+
+    The backend lives in ``app.extensions`` so every application instance
+    gets its own store. All operations are no-ops when caching is disabled.
+    Readers look a key up at its current ``generation``; ``delete``
+    invalidates a key by bumping its generation.
+    """
+
+    def init_app(self, app):
+        app.extensions["response_cache"] = create_cache_backend(app.config)
+
+    @property
+    def backend(self):
+        return current_app.extensions.get("response_cache")
+
+    def generation(self, key):
+        backend = self.backend
+        return 0 if backend is None else backend.generation(key)
+
+    def get(self, key, generation=0):
+        backend = self.backend
+        return None if backend is None else backend.get(f"{key}@{generation}")
+
+    def set(self, key, value, generation=0):
+        backend = self.backend
+        if backend is not None:
+            backend.set(f"{key}@{generation}", value)
+
+    def delete(self, *keys):
+        backend = self.backend
+        if backend is not None:
+            backend.bump(*keys)
+
+    def clear(self):
+        backend = self.backend
+        if backend is not None:
+            backend.clear()
@@ -4,6 +4,8 @@ from enum import StrEnum
 
 from dotenv import load_dotenv
 
+from database.engine import pool_options_from_env
+
 load_dotenv()
 basedir = Path(__file__).resolve().parent
 
@@ -20,10 +22,66 @@ class BaseConfig:
         Whether to track modifications of objects in SQLAlchemy.
     JSON_SORT_KEYS : bool
         Whether to sort keys in JSON responses.
+    PAGE_SIZE_DEFAULT : int
+        Number of rows returned by list endpoints when no ``limit`` is given.
+    PAGE_SIZE_MAX : int
+        Upper bound for the ``limit`` query parameter on list endpoints.
+    STREAM_CHUNK_SIZE : int
+        Number of rows fetched per server-side cursor round trip when a list
+        endpoint streams NDJSON.
+    BULK_MAX_ROWS : int
+        Maximum number of records accepted by a single bulk insert request.
+    RESPONSE_CACHE_BACKEND : str
+        Cache for single-entity GET responses: 'none' (default), 'redis', or
+        'memory' - per process, so only for a single worker process.
+    RESPONSE_CACHE_TTL : int
+        Seconds a cached response stays valid.
+    RESPONSE_CACHE_MAX_ENTRIES : int
+        Capacity of the in-process LRU cache.
+    RESPONSE_CACHE_REDIS_URL : str
+        Connection URL used by the 'redis' cache backend.
+    SQL_INSTRUMENTATION : bool
+        Attribute SQL statements to requests (``Server-Timing`` header, logs).
+    SQL_STATEMENT_BUDGET : int
+        Statements per request above which the request is flagged.
+    SQL_REPEAT_THRESHOLD : int
+        Executions of one statement in a request flagged as a likely N+1.
+    METRICS_ENABLED : bool
+        Count and time requests for the Prometheus ``/metrics`` endpoint.
+    METRICS_MULTIPROC_DIR : str or None
+        Directory where each worker process dumps its metrics, so a scrape
+        of any worker covers all of them. Unset for a single process.
+    METRICS_FLUSH_INTERVAL : float
+        Minimum seconds between two dumps of a worker's metrics.
+    JSON_PROVIDER : str
+        JSON encoder for responses: 'default' (stdlib) or 'orjson'.
+    ORDER_STATS_SOURCE : str
+        Table answering ``/orders/stats``: 'orders' (live ``GROUP BY``) or
+        'summary' (``order_daily_stats``, as fresh as its last refresh).
     """
     SECRET_KEY = os.getenv('SECRET_KEY', 'change-me')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JSON_SORT_KEYS = False
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 100))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 1000))
+    STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 1000))
+    BULK_MAX_ROWS = int(os.getenv('BULK_MAX_ROWS', 10000))
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'none')
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_MAX_ENTRIES = int(
+        os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 10000))
+    RESPONSE_CACHE_REDIS_URL = os.getenv(
+        'RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    SQL_INSTRUMENTATION = os.getenv(
+        'SQL_INSTRUMENTATION', 'false').lower() in ('1', 'true', 'yes')
+    SQL_STATEMENT_BUDGET = int(os.getenv('SQL_STATEMENT_BUDGET', 10))
+    SQL_REPEAT_THRESHOLD = int(os.getenv('SQL_REPEAT_THRESHOLD', 5))
+    METRICS_ENABLED = os.getenv(
+        'METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR')
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'default')
+    ORDER_STATS_SOURCE = os.getenv('ORDER_STATS_SOURCE', 'orders')
     host = os.getenv('FLASK_HOST', '0.0.0.0')
     port = int(os.getenv('FLASK_PORT', 5000))
 
@@ -65,6 +123,13 @@ class TestingConfig(BaseConfig):
 class ProductionConfig(BaseConfig):
     """
     Configuration for production using a POSTGRES database.
+
+    Attributes
+    ----------
+    SQLALCHEMY_ENGINE_OPTIONS : dict
+        Connection pool settings read from ``DB_POOL_SIZE``,
+        ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT``, ``DB_POOL_RECYCLE`` and
+        ``DB_POOL_PRE_PING``.
     """
     debug = False
     user = os.getenv('DB_USER', 'postgres')
@@ -78,6 +143,7 @@ class ProductionConfig(BaseConfig):
             "Please set DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, and DB_NAME."
         )
     SQLALCHEMY_DATABASE_URI = f'postgresql://{user}:{password}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options_from_env()
 
 
 class ConfigType(StrEnum):
@@ -0,0 +1,209 @@
+import time
+from collections import Counter, defaultdict
+from logging import getLogger
+from threading import Lock
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+logger = getLogger(__name__)
+
+
+class QueryStats:
+    """
+    SQL statements issued while serving one request.
+
+    Attributes
+    ----------
+    count : int
+        Number of statements sent to the database.
+    total_time : float
+        Seconds spent in the database driver, summed over all statements.
+    slowest_time : float
+        Duration of the slowest statement in seconds.
+    slowest_statement : str or None
+        SQL text of the slowest statement.
+    repeats : Counter
+        Executions per distinct SQL text. Statements are parameterized, so
+        a text repeated many times in one request is the N+1 signature.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.repeats = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_time += seconds
+        self.repeats[statement] += 1
+        if seconds >= self.slowest_time:
+            self.slowest_time = seconds
+            self.slowest_statement = statement
+
+    def most_repeated(self):
+        if not self.repeats:
+            return None, 0
+        return self.repeats.most_common(1)[0]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    if has_app_context():
+        stats = g.get("sql_stats")
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for a failed statement
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def _start_request():
+    g.sql_stats = QueryStats()
+
+
+class EndpointTotals:
+    """
+    Per-endpoint SQL totals of one application in this process.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._endpoints = defaultdict(lambda: {
+            "requests": 0, "statements": 0, "max_statements": 0,
+            "db_time": 0.0, "over_budget": 0, "repeated_statements": 0,
+        })
+
+    def add(self, endpoint, stats, over_budget, repeated):
+        with self._lock:
+            totals = self._endpoints[endpoint]
+            totals["requests"] += 1
+            totals["statements"] += stats.count
+            totals["max_statements"] = max(totals["max_statements"], stats.count)
+            totals["db_time"] += stats.total_time
+            totals["over_budget"] += over_budget
+            totals["repeated_statements"] += repeated
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(totals)
+                    for endpoint, totals in self._endpoints.items()}
+
+
+def _finish_request(response):
+    if response.is_streamed:
+        stats = g.get("sql_stats")
+        if stats is not None:
+            # the body, and the statements producing it, follow the headers:
+            # account for them once the server has closed the response
+            app = current_app._get_current_object()
+            endpoint, method = request.endpoint or "unknown", request.method
+            response.call_on_close(lambda: record(
+                app, endpoint, method, response.status_code, stats))
+        return response
+    stats = g.pop("sql_stats", None)
+    if stats is not None:
+        report(stats, response)
+    return response
+
+
+def report(stats, response):
+    """
+    Attach ``Server-Timing`` to the response, then log and aggregate
+    ``stats`` under the current endpoint.
+    """
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} statements"',
+    )
+    if stats.count:
+        response.headers.add(
+            "Server-Timing", f"db-slowest;dur={stats.slowest_time * 1000:.2f}")
+    record(current_app, request.endpoint or "unknown", request.method,
+           response.status_code, stats)
+
+
+def record(app, endpoint, method, status, stats):
+    """
+    Log ``stats`` of one request and add them to the endpoint totals.
+
+    Takes the request details as arguments, since a streamed response is
+    recorded after its request context is gone.
+    """
+    budget = app.config["SQL_STATEMENT_BUDGET"]
+    repeated_statement, repeats = stats.most_repeated()
+    over_budget = stats.count > budget
+    repeated = repeats >= app.config["SQL_REPEAT_THRESHOLD"]
+
+    fields = {
+        "endpoint": endpoint,
+        "method": method,
+        "status": status,
+        "statements": stats.count,
+        "db_ms": round(stats.total_time * 1000, 3),
+        "slowest_ms": round(stats.slowest_time * 1000, 3),
+    }
+    message = " ".join(f"{key}={value}" for key, value in fields.items())
+    if over_budget or repeated:
+        logger.warning(
+            f"SQL budget exceeded: {message} budget={budget} "
+            f"max_repeats={repeats} repeated_statement={repeated_statement!r} "
+            f"slowest_statement={stats.slowest_statement!r}",
+            extra={"sql": fields},
+        )
+    else:
+        logger.info(f"SQL: {message}", extra={"sql": fields})
+    app.extensions["sql_instrumentation"].add(
+        endpoint, stats, over_budget, repeated)
+
+
+class SQLInstrumentation:
+    """
+    Opt-in per-request SQL statement accounting.
+
+    When ``SQL_INSTRUMENTATION`` is enabled, cursor events on the engines of
+    ``db`` are attributed to the current request. Every response then gets a
+    ``Server-Timing`` header with the statement count, total database time
+    and slowest statement, and one log record per request. Requests issuing
+    more than ``SQL_STATEMENT_BUDGET`` statements, or repeating one statement
+    ``SQL_REPEAT_THRESHOLD`` times (a likely N+1), are logged as warnings and
+    counted per endpoint.
+
+    Streamed responses (NDJSON) send their headers before the rows are
+    read, so they get no ``Server-Timing`` header; their statements are
+    logged and counted when the server closes the response.
+    """
+
+    def init_app(self, app):
+        if not app.config.get("SQL_INSTRUMENTATION"):
+            return
+        # engines are created by db.init_app, which must run first
+        from flask_app.app import db
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_error)
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
+        app.extensions["sql_instrumentation"] = EndpointTotals()
+
+    def endpoint_stats(self):
+        """
+        Per-endpoint totals of the current app, empty when disabled.
+        """
+        totals = current_app.extensions.get("sql_instrumentation")
+        return {} if totals is None else totals.snapshot()
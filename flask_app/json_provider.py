@@ -0,0 +1,87 @@
+from flask.json.provider import DefaultJSONProvider
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider encoding with ``orjson`` instead of the stdlib module.
+
+    Compact output keeps the default provider's format (sorted keys, ``,``
+    and ``:`` separators, trailing newline) and dates still go through
+    ``default``. The output is not byte-identical to the stdlib encoder:
+    non-ASCII text is written as UTF-8 instead of ``\\uXXXX`` escapes, and
+    floats in exponent notation drop the ``+`` and zero padding of the
+    exponent (``1e16``, ``1e-7`` instead of ``1e+16``, ``1e-07``); both
+    parse to the same values. Indented (debug) output
+    and calls with custom ``dumps`` arguments fall back to the stdlib.
+    """
+
+    def __init__(self, app):
+        import orjson
+        super().__init__(app)
+        self._orjson = orjson
+
+    def _options(self):
+        option = (self._orjson.OPT_PASSTHROUGH_DATETIME
+                  | self._orjson.OPT_NON_STR_KEYS)
+        if self.sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        return option
+
+    def _encode(self, obj):
+        return self._orjson.dumps(obj, default=self.default, option=self._options())
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self._orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self._encode(obj) + b"\n", mimetype=self.mimetype)
+
+
+def create_json_provider(app):
+    """
+    Build the JSON provider selected by ``JSON_PROVIDER``.
+
+    Parameters
+    ----------
+    app : Flask
+        The application the provider serves.
+
+    Returns
+    -------
+    DefaultJSONProvider
+        ``"default"`` keeps Flask's stdlib provider, ``"orjson"`` returns an
+        ``ORJSONProvider``.
+
+    Raises
+    ------
+    ValueError
+        If the provider name is unknown.
+    RuntimeError
+        If ``orjson`` is selected but not installed.
+    """
+    provider = app.config.get("JSON_PROVIDER", "default")
+    if provider == "default":
+        return DefaultJSONProvider(app)
+    if provider == "orjson":
+        try:
+            return ORJSONProvider(app)
+        except ImportError as err:
+            raise RuntimeError(
+                "JSON_PROVIDER is 'orjson' but the orjson package is not "
+                "installed."
+            ) from err
+    raise ValueError(
+        f"Invalid JSON_PROVIDER value: {provider}. "
+        "Please use one of ('default', 'orjson')."
+    )
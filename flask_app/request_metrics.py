@@ -0,0 +1,317 @@
+"""
+Request counters and latency histograms in the Prometheus text format.
+
+Recording a request touches only dictionaries owned by the current thread,
+so the hot path takes no lock; a scrape merges the per-thread shards, whose
+``copy()`` is atomic under the GIL. Under gunicorn every worker process
+keeps its own registry and, when ``METRICS_MULTIPROC_DIR`` is set, dumps a
+snapshot to ``<dir>/metrics_<pid>_<start time>.json`` at most every
+``METRICS_FLUSH_INTERVAL`` seconds and once more when it exits. The worker
+that serves ``/metrics`` merges all snapshots with its live data, so the
+scrape covers every worker.
+
+The file of a dead worker is kept, so its requests stay in the totals and
+the counters never go backwards; the start time in the name keeps a new
+worker that reuses the pid from overwriting it. Like prometheus_client's
+multi-process mode, the directory must be emptied when the server (the
+gunicorn master) starts, before any worker runs - ``gunicorn.conf.py`` does
+it with ``clear_multiprocess_dir``.
+"""
+import atexit
+import json
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from threading import Lock, local
+
+from flask import current_app, g, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75,
+                   1.0, 2.5, 5.0, 7.5, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_LABELS = ("blueprint", "endpoint", "method", "status")
+DURATION_LABELS = ("blueprint", "endpoint", "method")
+
+
+class _Shard:
+    __slots__ = ("requests", "durations")
+
+    def __init__(self):
+        self.requests = {}
+        # labels -> [count per bucket ..., count above the last bucket, sum]
+        self.durations = {}
+
+
+class MetricsRegistry:
+    """
+    Request counters and duration histograms of one process.
+
+    Parameters
+    ----------
+    buckets : tuple of float
+        Upper bounds of the histogram buckets in seconds.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = local()
+        self._shards = []
+        self._shards_lock = Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, blueprint, endpoint, method, status, seconds):
+        """
+        Count one request and record its duration.
+        """
+        shard = self._shard()
+        key = (blueprint, endpoint, method, str(status))
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        histogram = shard.durations.get(key[:3])
+        if histogram is None:
+            histogram = shard.durations[key[:3]] = [0] * (len(self.buckets) + 2)
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+    def snapshot(self):
+        """
+        Merge the thread shards into a JSON-serializable snapshot.
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+        snapshot = {"buckets": list(self.buckets), "requests": {}, "durations": {}}
+        for shard in shards:
+            _merge_counts(snapshot["requests"], {
+                _encode(key): value for key, value in shard.requests.copy().items()})
+            _merge_histograms(snapshot["durations"], {
+                _encode(key): list(value)
+                for key, value in shard.durations.copy().items()})
+        return snapshot
+
+
+def _encode(labels):
+    # JSON object keys must be strings
+    return "\x1f".join(labels)
+
+
+def _decode(key):
+    return tuple(key.split("\x1f"))
+
+
+def _merge_counts(target, counts):
+    for key, value in counts.items():
+        target[key] = target.get(key, 0) + value
+
+
+def _merge_histograms(target, histograms):
+    for key, values in histograms.items():
+        current = target.get(key)
+        if current is None:
+            target[key] = list(values)
+        else:
+            target[key] = [a + b for a, b in zip(current, values)]
+
+
+def merge_snapshots(snapshots):
+    """
+    Sum several process snapshots into one.
+    """
+    merged = {"buckets": None, "requests": {}, "durations": {}}
+    for snapshot in snapshots:
+        merged["buckets"] = merged["buckets"] or snapshot["buckets"]
+        _merge_counts(merged["requests"], snapshot["requests"])
+        _merge_histograms(merged["durations"], snapshot["durations"])
+    merged["buckets"] = merged["buckets"] or list(DEFAULT_BUCKETS)
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshot, gauges=()):
+    """
+    Render a snapshot in the Prometheus text exposition format.
+
+    Parameters
+    ----------
+    snapshot : dict
+        Output of ``MetricsRegistry.snapshot`` or ``merge_snapshots``.
+    gauges : iterable of (name, help, labels, value)
+        Extra gauge samples, ``labels`` being a dict.
+
+    Returns
+    -------
+    str
+        The exposition text.
+    """
+    lines = [
+        "# HELP flask_http_requests_total Total HTTP requests by endpoint and status.",
+        "# TYPE flask_http_requests_total counter",
+    ]
+    for key in sorted(snapshot["requests"]):
+        labels = _format_labels(REQUEST_LABELS, _decode(key))
+        lines.append(f"flask_http_requests_total{labels} {snapshot['requests'][key]}")
+
+    lines += [
+        "# HELP flask_http_request_duration_seconds HTTP request latency.",
+        "# TYPE flask_http_request_duration_seconds histogram",
+    ]
+    bounds = [_format_value(float(bound)) for bound in snapshot["buckets"]] + ["+Inf"]
+    for key in sorted(snapshot["durations"]):
+        values = _decode(key)
+        histogram = snapshot["durations"][key]
+        cumulative = 0
+        for bound, count in zip(bounds, histogram[:-1]):
+            cumulative += count
+            labels = _format_labels(DURATION_LABELS, values, [("le", bound)])
+            lines.append(f"flask_http_request_duration_seconds_bucket{labels} {cumulative}")
+        labels = _format_labels(DURATION_LABELS, values)
+        lines.append(f"flask_http_request_duration_seconds_sum{labels} "
+                     f"{_format_value(float(histogram[-1]))}")
+        lines.append(f"flask_http_request_duration_seconds_count{labels} {cumulative}")
+
+    described = set()
+    for name, help_text, labels, value in gauges:
+        if name not in described:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            described.add(name)
+        label_text = _format_labels(labels, labels.values()) if labels else ""
+        lines.append(f"{name}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _start_timer():
+    g.request_start_time = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.get("request_start_time")
+    if start is not None:
+        # unmatched URLs share one label value to bound the series count
+        endpoint = request.endpoint or "unmatched"
+        state = current_app.extensions["request_metrics"]
+        state.registry.observe(
+            request.blueprint or "", endpoint, request.method,
+            response.status_code, time.perf_counter() - start)
+        state.maybe_flush()
+    return response
+
+
+def clear_multiprocess_dir(directory):
+    """
+    Remove the snapshot files of a previous run from ``directory``.
+
+    Call it once when the server starts, before the workers are forked.
+    """
+    directory = Path(directory)
+    for pattern in ("metrics_*.json", "metrics_*.tmp"):
+        for path in directory.glob(pattern):
+            path.unlink(missing_ok=True)
+
+
+class _MetricsState:
+    """
+    Registry of one application plus its multi-process snapshot file.
+    """
+
+    def __init__(self, registry, directory, flush_interval):
+        self.registry = registry
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self._next_flush = 0.0
+        self._worker = None
+        if self.directory is not None:
+            atexit.register(self.flush_on_exit)
+
+    @property
+    def path(self):
+        # named on first use in each process, so workers forked from a
+        # preloaded app do not share the name of the master
+        pid = os.getpid()
+        if self._worker is None or self._worker[0] != pid:
+            self._worker = (pid, f"metrics_{pid}_{time.time_ns()}.json")
+        return self.directory / self._worker[1]
+
+    def maybe_flush(self):
+        if self.directory is None:
+            return
+        now = time.monotonic()
+        if now >= self._next_flush:
+            self._next_flush = now + self.flush_interval
+            self.flush()
+
+    def flush_on_exit(self):
+        # publish the counts recorded since the last periodic flush; a
+        # directory removed in the meantime is not recreated
+        if self.directory.exists():
+            self.flush()
+
+    def flush(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.registry.snapshot()))
+        os.replace(temporary, self.path)
+
+    def collect(self):
+        """
+        Live snapshot of this process merged with the other workers' files.
+        """
+        snapshots = [self.registry.snapshot()]
+        if self.directory is not None and self.directory.exists():
+            own = self.path.name
+            for path in sorted(self.directory.glob("metrics_*.json")):
+                if path.name == own:
+                    continue
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    # a worker is replacing its file right now
+                    continue
+        return merge_snapshots(snapshots)
+
+
+class RequestMetrics:
+    """
+    Flask extension counting requests and timing them per endpoint.
+
+    Requests answered by the error handlers are recorded with their final
+    status code, because ``after_request`` runs for those responses too.
+    """
+
+    def init_app(self, app):
+        if not app.config.get("METRICS_ENABLED", True):
+            return
+        app.extensions["request_metrics"] = _MetricsState(
+            MetricsRegistry(),
+            app.config.get("METRICS_MULTIPROC_DIR"),
+            app.config.get("METRICS_FLUSH_INTERVAL", 5.0),
+        )
+        app.before_request(_start_timer)
+        app.after_request(_record_request)
+
+    def exposition(self, gauges=()):
+        """
+        Prometheus text for the current app, covering all worker processes.
+        """
+        state = current_app.extensions.get("request_metrics")
+        if state is None:
+            return render(merge_snapshots([]), gauges)
+        return render(state.collect(), gauges)
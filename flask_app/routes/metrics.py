@@ -0,0 +1,51 @@
+import os
+
+from flask import Blueprint, current_app, jsonify
+
+from database.engine import pool_stats
+from flask_app.app import db, request_metrics, sql_instrumentation
+from flask_app.request_metrics import CONTENT_TYPE
+
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/metrics")
+
+POOL_GAUGES = {
+    "size": "Configured number of pooled connections.",
+    "checkedout": "Connections currently in use.",
+    "checkedin": "Idle connections in the pool.",
+    "overflow": "Connections opened above the pool size.",
+    "wait_time_total": "Seconds spent waiting for a pooled connection.",
+    "timeouts": "Checkouts that timed out waiting for a connection.",
+}
+
+
+def worker_pool_stats():
+    return pool_stats(
+        db.engine, current_app.config.get("SQLALCHEMY_ENGINE_OPTIONS"))
+
+
+@metrics_bp.get("")
+def get_metrics():
+    # Prometheus scrape target: request counters and latency histograms of
+    # all workers, plus the pool gauges of the worker answering the scrape
+    stats = worker_pool_stats()
+    labels = {"pid": str(os.getpid())}
+    gauges = [
+        (f"db_pool_{name}", help_text, labels, stats[name])
+        for name, help_text in POOL_GAUGES.items() if name in stats
+    ]
+    return current_app.response_class(
+        request_metrics.exposition(gauges), content_type=CONTENT_TYPE)
+
+
+@metrics_bp.get("/pool")
+def get_pool_metrics():
+    # Checked-out connections, overflow and checkout wait time of this
+    # worker's pool, used to size gunicorn workers against max_connections
+    return jsonify(worker_pool_stats()), 200
+
+
+@metrics_bp.get("/sql")
+def get_sql_metrics():
+    # Per-endpoint statement counts and database time of this worker;
+    # empty unless SQL_INSTRUMENTATION is enabled
+    return jsonify(sql_instrumentation.endpoint_stats()), 200
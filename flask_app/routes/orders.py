@@ -1,17 +1,74 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import select
+import operator
+from datetime import date
+
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import insert, select
 
 from database.models.orders import Order
+from database.order_stats import DIMENSIONS, order_stats
 
 from flask_app.app import db
 from flask_app.schemas.orders import OrderSchema
 from flask_app.routes.errors import APIError
-from flask_app.routes.utils.decorators import transactional
+from flask_app.routes.utils.decorators import transactional, cached_response
+from flask_app.routes.utils.filters import filter_clauses, filter_values
+from flask_app.routes.utils.pagination import keyset_response
+from flask_app.routes.utils.payloads import load_many, load_one
+from flask_app.schemas.compiled import serializer_for
+
+ORDER_CACHE_KEY = "orders:{order_id}"
+# query parameter -> (column, operator, parser) for GET /orders/
+ORDER_FILTERS = {
+    "customer_id": (Order.customer_id, operator.eq, int),
+    "product": (Order.product, operator.eq, str),
+    "order_date_from": (Order.order_date, operator.ge, date.fromisoformat),
+    "order_date_to": (Order.order_date, operator.le, date.fromisoformat),
+}
+# query parameter -> parser for GET /orders/stats/<dimension>
+ORDER_STATS_FILTERS = {
+    "order_date_from": date.fromisoformat,
+    "order_date_to": date.fromisoformat,
+    "product": str,
+    "city": str,
+}
+ORDER_STATS_SOURCES = ("orders", "summary")
 
 orders_bp = Blueprint("orders", __name__, url_prefix="/orders")
 
+
+def order_stats_source(config):
+    """
+    Read the ``ORDER_STATS_SOURCE`` of a configuration.
+
+    Called once when an app is created, so a misconfigured source stops
+    the app from starting instead of failing every statistics request.
+
+    Parameters
+    ----------
+    config : Mapping
+        The app configuration.
+
+    Returns
+    -------
+    str
+        ``"orders"`` (the default) or ``"summary"``.
+
+    Raises
+    ------
+    ValueError
+        If the source is not one of ``ORDER_STATS_SOURCES``.
+    """
+    source = config.get("ORDER_STATS_SOURCE", "orders")
+    if source not in ORDER_STATS_SOURCES:
+        raise ValueError(
+            f"Invalid ORDER_STATS_SOURCE value: {source}. "
+            f"Please use one of {ORDER_STATS_SOURCES}."
+        )
+    return source
+
 signle_order_schema = OrderSchema()
 multiple_orders_schema = OrderSchema(many=True)
+bulk_orders_schema = OrderSchema(many=True, load_instance=False)
 
 
 @orders_bp.post("/")
@@ -19,40 +76,73 @@ multiple_orders_schema = OrderSchema(many=True)
 def create_order():
     # Expect JSON body with order fields
     data = request.get_json()
-    errors = signle_order_schema.validate(data)
-    if errors:
-        raise APIError(errors, 400)
-
-    new_order = signle_order_schema.load(data)
+    new_order = load_one(signle_order_schema, data)
     db.session.add(new_order)
-    db.session.flush()  # Use flush to get ID before commit (commit is handled by decorator)
-    db.session.refresh(new_order)
+    # flush issues INSERT ... RETURNING, which populates the ID and defaults
+    # without a follow-up SELECT (commit is handled by decorator)
+    db.session.flush()
     return jsonify(signle_order_schema.dump(new_order)), 201
 
 
+@orders_bp.post("/bulk")
+@transactional("One or more orders violate a constraint.")
+def create_orders_bulk():
+    # Expect a JSON list of orders, validated in one pass and inserted with a
+    # single multi-row INSERT ... RETURNING, the rows returned in payload
+    # order (commit is handled by decorator)
+    data = request.get_json()
+    rows = load_many(bulk_orders_schema, data)
+    new_orders = db.session.scalars(
+        insert(Order).returning(Order, sort_by_parameter_order=True),
+        rows,
+        execution_options={"render_nulls": True},
+    ).all()
+    return jsonify(multiple_orders_schema.dump(new_orders)), 201
+
+
 @orders_bp.get("/")
 def get_orders():
-    orders_selection_statement = select(Order)
-    orders_list = (
-        db.session.execute(orders_selection_statement)
-        .scalars()
-        .all()
-    )
-    return jsonify(multiple_orders_schema.dump(orders_list)), 200
+    # Keyset pagination: ?after_id=&limit=, or ?format=ndjson to stream;
+    # ?fields= projects columns, ORDER_FILTERS narrow the rows
+    orders_selection_statement = select(Order).where(
+        *filter_clauses(ORDER_FILTERS))
+    response = keyset_response(
+        orders_selection_statement, Order.id, multiple_orders_schema)
+    return response, 200
+
+
+@orders_bp.get("/stats/<dimension>")
+def get_order_stats(dimension):
+    # Order count, quantity and revenue grouped in SQL by product, day,
+    # month or customer city; ORDER_STATS_SOURCE picks the live orders
+    # table or the order_daily_stats summary
+    if dimension not in DIMENSIONS:
+        raise APIError(
+            f"Unknown statistics dimension; use one of: {', '.join(DIMENSIONS)}.",
+            404)
+    # validated by create_app
+    source = current_app.config.get("ORDER_STATS_SOURCE", "orders")
+    stats = order_stats(
+        db.session.connection(), dimension, summary=source == "summary",
+        **filter_values(ORDER_STATS_FILTERS))
+    response = jsonify(stats)
+    response.headers["X-Stats-Source"] = source
+    return response, 200
 
 
 @orders_bp.get("/<int:order_id>")
+@cached_response(ORDER_CACHE_KEY)
 def get_order(order_id):
     order = db.session.execute(
         select(Order).where(Order.id == order_id)
     ).scalar_one_or_none()
     if order is None:
         raise APIError("Order not found", 404)
-    return jsonify(signle_order_schema.dump(order)), 200
+    return jsonify(serializer_for(signle_order_schema).dump(order)), 200
 
 
 @orders_bp.put("/<int:order_id>")
-@transactional("Order update violates a constraint.")
+@transactional("Order update violates a constraint.", invalidates=ORDER_CACHE_KEY)
 def update_order(order_id):
     order = db.session.execute(
         select(Order).where(Order.id == order_id)
@@ -60,17 +150,14 @@ def update_order(order_id):
     if order is None:
         raise APIError("Order not found", 404)
     data = request.get_json()
-    errors = signle_order_schema.validate(data, partial=True)
-    if errors:
-        raise APIError(errors, 400)
-    updated_order = signle_order_schema.load(
-        data, instance=order, partial=True)
+    updated_order = load_one(
+        signle_order_schema, data, instance=order, partial=True)
     # No need to call commit, handled by decorator
     return jsonify(signle_order_schema.dump(updated_order)), 200
 
 
 @orders_bp.delete("/<int:order_id>")
-@transactional("Order delete violates a constraint.")
+@transactional("Order delete violates a constraint.", invalidates=ORDER_CACHE_KEY)
 def delete_order(order_id):
     order = db.session.execute(
         select(Order).where(Order.id == order_id)
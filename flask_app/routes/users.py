@@ -1,51 +1,78 @@
+import operator
+
 from flask import Blueprint, request, jsonify
-from sqlalchemy import select
+from sqlalchemy import insert, select
 
 from database.models.users import User
 from flask_app.app import db
 from flask_app.schemas.users import UserSchema
 from flask_app.routes.errors import APIError
-from flask_app.routes.utils.decorators import transactional
+from flask_app.routes.utils.decorators import transactional, cached_response
+from flask_app.routes.utils.filters import filter_clauses
+from flask_app.routes.utils.pagination import keyset_response
+from flask_app.routes.utils.payloads import load_many, load_one
+from flask_app.schemas.compiled import serializer_for
+
+USER_CACHE_KEY = "users:{user_id}"
+# query parameter -> (column, operator, parser) for GET /users
+USER_FILTERS = {
+    "city": (User.city, operator.eq, str),
+}
 
 users_bp = Blueprint("users", __name__, url_prefix="/users")
 
 single_user_schema = UserSchema()
 multiple_users_schema = UserSchema(many=True)
+bulk_users_schema = UserSchema(many=True, load_instance=False)
 
 
 @users_bp.post("")
 @transactional("User already exists or violates a constraint.")
 def create_user():
     data = request.get_json()
-    errors = single_user_schema.validate(data)
-    if errors:
-        raise APIError(errors, 400)
-    new_user = single_user_schema.load(data)
+    new_user = load_one(single_user_schema, data)
     db.session.add(new_user)
     db.session.flush()
-    db.session.refresh(new_user)
     return jsonify(single_user_schema.dump(new_user)), 201
 
 
+@users_bp.post("/bulk")
+@transactional("One or more users already exist or violate a constraint.")
+def create_users_bulk():
+    data = request.get_json()
+    rows = load_many(bulk_users_schema, data)
+    new_users = db.session.scalars(
+        insert(User).returning(User, sort_by_parameter_order=True),
+        rows,
+        execution_options={"render_nulls": True},
+    ).all()
+    return jsonify(multiple_users_schema.dump(new_users)), 201
+
+
 @users_bp.get("")
 def get_users():
-    users_selection_statement = select(User)
-    users_list = db.session.execute(users_selection_statement).scalars().all()
-    return jsonify(multiple_users_schema.dump(users_list)), 200
+    # Keyset pagination: ?after_id=&limit=, or ?format=ndjson to stream;
+    # ?fields= projects columns, USER_FILTERS narrow the rows
+    users_selection_statement = select(User).where(
+        *filter_clauses(USER_FILTERS))
+    response = keyset_response(
+        users_selection_statement, User.id, multiple_users_schema)
+    return response, 200
 
 
 @users_bp.get("/<int:user_id>")
+@cached_response(USER_CACHE_KEY)
 def get_user(user_id):
     user = db.session.execute(
         select(User).where(User.id == user_id)
     ).scalar_one_or_none()
     if user is None:
         raise APIError("User not found", 404)
-    return jsonify(single_user_schema.dump(user)), 200
+    return jsonify(serializer_for(single_user_schema).dump(user)), 200
 
 
 @users_bp.put("/<int:user_id>")
-@transactional("User update violates a constraint.")
+@transactional("User update violates a constraint.", invalidates=USER_CACHE_KEY)
 def update_user(user_id):
     user = db.session.execute(
         select(User).where(User.id == user_id)
@@ -53,17 +80,14 @@ def update_user(user_id):
     if user is None:
         raise APIError("User not found", 404)
     data = request.get_json()
-    errors = single_user_schema.validate(data, partial=True)
-    if errors:
-        raise APIError(errors, 400)
-    updated_user = single_user_schema.load(
-        data, instance=user, partial=True
+    updated_user = load_one(
+        single_user_schema, data, instance=user, partial=True
     )
     return jsonify(single_user_schema.dump(updated_user)), 200
 
 
 @users_bp.delete("/<int:user_id>")
-@transactional("User delete violates a constraint.")
+@transactional("User delete violates a constraint.", invalidates=USER_CACHE_KEY)
 def delete_user(user_id):
     user = db.session.execute(
         select(User).where(User.id == user_id)
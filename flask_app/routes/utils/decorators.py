@@ -1,26 +1,67 @@
 from functools import wraps
+from flask import current_app, make_response
 from sqlalchemy.exc import IntegrityError
 from flask_app.routes.errors import APIError
-from flask_app.app import db
+from flask_app.app import db, cache
 
 
-def transactional(on_conflict_message=None):
+def transactional(on_conflict_message=None, invalidates=()):
     """
     1. Runs the view function.
     2. Commits if all went well.
-    3. On IntegrityError, rollbacks and raises APIError(409).
+    3. Invalidates the cache keys in ``invalidates`` once the commit succeeded.
+    4. On IntegrityError, rollbacks and raises APIError(409).
     Uses the db instance imported from flask_app.app.
+
+    ``invalidates`` holds key templates formatted with the view arguments,
+    e.g. ``"users:{user_id}"``.
     """
+    if isinstance(invalidates, str):
+        invalidates = (invalidates,)
+
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
             try:
                 response = fn(*args, **kwargs)
                 db.session.commit()
-                return response
             except IntegrityError:
                 db.session.rollback()
                 msg = on_conflict_message or "Database constraint violated."
                 raise APIError(msg, 409)
+            if invalidates:
+                cache.delete(*(key.format(**kwargs) for key in invalidates))
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_response(key_template):
+    """
+    Serve the view's JSON body from the response cache (read-through).
+
+    On a hit the cached bytes are returned as-is, without touching the
+    database or the schema. On a miss the view runs and successful (200)
+    responses are stored under the key built from ``key_template`` and the
+    view arguments. Writes invalidate the key through ``transactional`` by
+    bumping its generation; the body is stored under the generation read
+    before the view ran, so a fill that raced with a write is never served.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = key_template.format(**kwargs)
+            generation = cache.generation(key)
+            body = cache.get(key, generation)
+            if body is not None:
+                response = current_app.response_class(
+                    body, mimetype="application/json")
+                response.headers["X-Cache"] = "HIT"
+                return response
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200:
+                cache.set(key, response.get_data(), generation)
+            response.headers["X-Cache"] = "MISS"
+            return response
         return wrapper
     return decorator
@@ -0,0 +1,118 @@
+from functools import lru_cache
+
+from flask import request
+
+from flask_app.routes.errors import APIError
+
+
+def filter_values(parsers, args=None):
+    """
+    Parse the filter query parameters present in the request.
+
+    Parameters
+    ----------
+    parsers : dict
+        Maps a query parameter to the callable parsing its value, e.g.
+        ``{"order_date_from": date.fromisoformat}``. Absent parameters are
+        skipped.
+    args : Mapping, optional
+        The query parameters; defaults to the Flask ``request.args``.
+
+    Returns
+    -------
+    dict
+        Parsed value per parameter given in the request.
+
+    Raises
+    ------
+    APIError
+        400 if a parameter cannot be parsed.
+    """
+    if args is None:
+        args = request.args
+    values = {}
+    for name, parser in parsers.items():
+        raw_value = args.get(name)
+        if raw_value is None:
+            continue
+        try:
+            values[name] = parser(raw_value)
+        except ValueError:
+            raise APIError(f"Query parameter '{name}' is invalid.", 400)
+    return values
+
+
+def filter_clauses(filters, args=None):
+    """
+    Translate filter query parameters into WHERE clauses.
+
+    Parameters
+    ----------
+    filters : dict
+        Maps a query parameter to ``(column, operator, parser)``, e.g.
+        ``{"order_date_from": (Order.order_date, operator.ge,
+        date.fromisoformat)}``. Absent parameters are skipped.
+    args : Mapping, optional
+        The query parameters; defaults to the Flask ``request.args``.
+
+    Returns
+    -------
+    list of ColumnElement
+        The clauses to pass to ``select(...).where(*clauses)``.
+
+    Raises
+    ------
+    APIError
+        400 if a parameter cannot be parsed.
+    """
+    values = filter_values(
+        {name: parser for name, (_, _, parser) in filters.items()}, args)
+    return [operator(column, values[name])
+            for name, (column, operator, _) in filters.items()
+            if name in values]
+
+
+@lru_cache(maxsize=256)
+def projected_schema(schema_class, fields, many=True):
+    """
+    Return a cached schema instance restricted to ``fields``.
+    """
+    return schema_class(many=many, only=fields)
+
+
+def get_fields_arg(schema, args=None):
+    """
+    Parse the ``fields`` query parameter against a schema's dump fields.
+
+    Parameters
+    ----------
+    schema : Schema
+        The schema whose dumped keys may be requested.
+    args : Mapping, optional
+        The query parameters; defaults to the Flask ``request.args``.
+
+    Returns
+    -------
+    tuple of str or None
+        The requested field names in schema order, or ``None`` when the
+        parameter is absent.
+
+    Raises
+    ------
+    APIError
+        400 if a requested field is not dumped by the schema.
+    """
+    if args is None:
+        args = request.args
+    raw_value = args.get("fields")
+    if raw_value is None:
+        return None
+    requested = {name.strip() for name in raw_value.split(",") if name.strip()}
+    dump_keys = {field.data_key or name: name
+                 for name, field in schema.dump_fields.items()}
+    unknown = requested - dump_keys.keys()
+    if unknown or not requested:
+        raise APIError(
+            f"Query parameter 'fields' must list some of: "
+            f"{', '.join(dump_keys)}.", 400)
+    return tuple(name for key, name in dump_keys.items() if key in requested)
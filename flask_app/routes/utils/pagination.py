@@ -0,0 +1,175 @@
+from flask import Response, current_app, jsonify, request, stream_with_context, url_for
+
+from flask_app.app import db
+from flask_app.routes.errors import APIError
+from flask_app.routes.utils.filters import get_fields_arg, projected_schema
+from flask_app.schemas.compiled import serializer_for
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def _get_int_arg(args, name, default, minimum):
+    """
+    Read an integer query parameter, raising APIError(400) when it is invalid.
+    """
+    raw_value = args.get(name)
+    if raw_value is None:
+        return default
+    try:
+        value = int(raw_value)
+    except ValueError:
+        raise APIError(f"Query parameter '{name}' must be an integer.", 400)
+    if value < minimum:
+        raise APIError(
+            f"Query parameter '{name}' must be greater than or equal to {minimum}.", 400)
+    return value
+
+
+def wants_ndjson():
+    """
+    Check whether the client opted into the NDJSON streaming mode.
+
+    Streaming is selected with ``?format=ndjson`` or an ``Accept`` header that
+    prefers ``application/x-ndjson``.
+    """
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def get_keyset_args(default_limit, args=None, page_size_max=None):
+    """
+    Parse the ``after_id`` and ``limit`` query parameters.
+
+    Parameters
+    ----------
+    default_limit : int or None
+        The limit used when the client did not provide one. ``None`` means
+        no limit at all.
+    args : Mapping, optional
+        The query parameters; defaults to the Flask ``request.args``.
+    page_size_max : int, optional
+        Upper bound of ``limit``; defaults to the app's ``PAGE_SIZE_MAX``.
+
+    Returns
+    -------
+    tuple of (int, int or None)
+        The primary key to start after and the number of rows to return,
+        capped at ``PAGE_SIZE_MAX``.
+    """
+    if args is None:
+        args = request.args
+    if page_size_max is None:
+        page_size_max = current_app.config["PAGE_SIZE_MAX"]
+    after_id = _get_int_arg(args, "after_id", 0, 0)
+    limit = _get_int_arg(args, "limit", default_limit, 1)
+    if limit is not None:
+        limit = min(limit, page_size_max)
+    return after_id, limit
+
+
+def keyset_response(statement, pk_column, schema):
+    """
+    Run a list query with keyset pagination on the primary key.
+
+    The default mode returns a JSON list of at most ``limit`` rows with
+    ``id > after_id``. ``?fields=a,b`` narrows both the SELECT column list
+    and the dumped keys to the requested fields (the primary key is always
+    selected, as the cursor needs it). When more rows are available the response carries an
+    ``X-Next-After-Id`` header and a ``Link: <...>; rel="next"`` header
+    pointing at the next page. In NDJSON mode the rows are streamed one per
+    line, fetched in ``STREAM_CHUNK_SIZE`` chunks through a server-side
+    cursor, so memory stays flat regardless of table size.
+
+    Parameters
+    ----------
+    statement : Select
+        The base ``select(Model)`` statement.
+    pk_column : Column
+        The integer primary key column used as the cursor.
+    schema : Schema
+        A ``many=True`` schema used to serialize the rows, through its
+        compiled serializer when it has one.
+
+    Returns
+    -------
+    Response
+        The paginated JSON or streamed NDJSON response.
+    """
+    streaming = wants_ndjson()
+    default_limit = None if streaming else current_app.config["PAGE_SIZE_DEFAULT"]
+    after_id, limit = get_keyset_args(default_limit)
+
+    statement = statement.where(pk_column > after_id).order_by(pk_column)
+    statement, schema, projected = project_columns(
+        statement, pk_column, schema, get_fields_arg(schema))
+    if streaming:
+        if limit is not None:
+            statement = statement.limit(limit)
+        return ndjson_response(statement, schema, projected)
+
+    result = db.session.execute(statement.limit(limit + 1))
+    rows = (result if projected else result.scalars()).all()
+    has_next_page = len(rows) > limit
+    rows = rows[:limit]
+    response = jsonify(serializer_for(schema).dump(rows))
+    if has_next_page:
+        next_after_id = getattr(rows[-1], pk_column.key)
+        query_args = request.args.to_dict()
+        query_args.update(after_id=next_after_id, limit=limit)
+        next_url = url_for(request.endpoint, **query_args)
+        response.headers["X-Next-After-Id"] = str(next_after_id)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
+
+def project_columns(statement, pk_column, schema, fields):
+    """
+    Narrow a ``select(Model)`` statement to the requested dump fields.
+
+    ``fields`` is the output of ``get_fields_arg``; ``None`` leaves the
+    statement unchanged. Returns the statement, the schema to dump with and
+    whether the statement now selects columns (rows) instead of entities.
+    """
+    if fields is None:
+        return statement, schema, False
+    model = pk_column.class_
+    attributes = [schema.dump_fields[name].attribute or name for name in fields]
+    if pk_column.key not in attributes:
+        attributes.append(pk_column.key)
+    statement = statement.with_only_columns(
+        *(getattr(model, attribute) for attribute in attributes))
+    return statement, projected_schema(type(schema), fields), True
+
+
+def ndjson_response(statement, schema, projected=False):
+    """
+    Stream the rows of a statement as newline-delimited JSON.
+
+    Parameters
+    ----------
+    statement : Select
+        The ordered statement to stream.
+    schema : Schema
+        A ``many=True`` schema used to serialize each chunk.
+    projected : bool
+        Whether the statement selects columns rather than entities.
+
+    Returns
+    -------
+    Response
+        A streaming response with the ``application/x-ndjson`` mimetype.
+    """
+    chunk_size = current_app.config["STREAM_CHUNK_SIZE"]
+    dumps = current_app.json.dumps
+    serializer = serializer_for(schema)
+
+    def generate():
+        result = db.session.execute(
+            statement.execution_options(yield_per=chunk_size)
+        )
+        rows = result if projected else result.scalars()
+        for chunk in rows.partitions():
+            yield "".join(f"{dumps(item)}\n" for item in serializer.dump(chunk))
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
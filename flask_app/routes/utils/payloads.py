@@ -0,0 +1,92 @@
+from flask import current_app
+from marshmallow import ValidationError
+
+from flask_app.routes.errors import APIError
+
+
+def load_one(schema, data, **kwargs):
+    """
+    Validate and deserialize a single payload in one schema pass.
+
+    ``schema.load`` already runs every validator, so calling ``validate``
+    first would do the work twice. Errors are mapped to the same
+    ``APIError`` 400 shape the routes returned before.
+
+    Parameters
+    ----------
+    schema : Schema
+        The schema used to load the payload.
+    data : dict
+        The decoded JSON body of the request.
+    **kwargs
+        Passed through to ``schema.load`` (e.g. ``instance``, ``partial``).
+
+    Returns
+    -------
+    object
+        The loaded model instance.
+
+    Raises
+    ------
+    APIError
+        400 with the validation messages when the payload is invalid.
+    """
+    try:
+        return schema.load(data, **kwargs)
+    except ValidationError as err:
+        raise APIError(err.messages, 400)
+
+
+def load_many(schema, data, max_rows=None):
+    """
+    Validate and deserialize a bulk payload in a single schema pass.
+
+    Parameters
+    ----------
+    schema : Schema
+        A ``many=True`` schema built with ``load_instance=False`` so rows are
+        returned as plain dicts ready for a multi-row INSERT.
+    data : list
+        The decoded JSON body of the request.
+    max_rows : int, optional
+        Maximum number of records; defaults to the app's ``BULK_MAX_ROWS``.
+
+    Returns
+    -------
+    list of dict
+        The deserialized rows, all sharing the same keys so they are sent as
+        one multi-row INSERT instead of one batch per distinct key set.
+
+    Raises
+    ------
+    APIError
+        400 when the body is not a non-empty list, and 413 when it holds more
+        than ``BULK_MAX_ROWS`` records. Validation failures are reported per
+        row, keyed by the index of the record in the payload.
+    """
+    if not isinstance(data, list) or not data:
+        raise APIError("Expected a non-empty JSON list of records.", 400)
+    if max_rows is None:
+        max_rows = current_app.config["BULK_MAX_ROWS"]
+    if len(data) > max_rows:
+        raise APIError(
+            f"Bulk payload too large: {len(data)} records, limit is {max_rows}.", 413)
+    try:
+        rows = schema.load(data)
+    except ValidationError as err:
+        raise APIError(err.messages, 400)
+    return _fill_missing_columns(schema.opts.model, rows)
+
+
+def _fill_missing_columns(model, rows):
+    """
+    Give every row the same keys, using scalar column defaults where present.
+    """
+    keys = set().union(*rows)
+    defaults = {}
+    for column in model.__table__.columns:
+        if column.key in keys:
+            default = column.default
+            is_scalar = default is not None and default.is_scalar
+            defaults[column.key] = default.arg if is_scalar else None
+    return [{**defaults, **row} for row in rows]
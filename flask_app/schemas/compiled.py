@@ -0,0 +1,125 @@
+from weakref import WeakKeyDictionary
+
+from marshmallow import fields, utils
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+
+def _number_formatter(field):
+    if field.as_string:
+        return None
+    return field.num_type
+
+
+def _string_formatter(field):
+    return utils.ensure_text_type
+
+
+def _temporal_formatter(field):
+    data_format = field.format or field.DEFAULT_FORMAT
+    format_func = field.SERIALIZATION_FUNCS.get(data_format)
+    if format_func is not None:
+        return format_func
+    return lambda value: value.strftime(data_format)
+
+
+# exact field classes whose serialization only depends on the value;
+# subclasses (Url, UUID, ...) may override _serialize and are not compiled
+_FORMATTER_FACTORIES = {
+    fields.Integer: _number_formatter,
+    fields.Float: _number_formatter,
+    fields.String: _string_formatter,
+    fields.Email: _string_formatter,
+    fields.Date: _temporal_formatter,
+    fields.DateTime: _temporal_formatter,
+}
+
+_DUMP_HOOKS = (PRE_DUMP, POST_DUMP)
+
+
+def _has_dump_hooks(schema_class):
+    # the hook decorators tag the methods with __marshmallow_hook__, a
+    # mapping of hook name -> registrations; inherited hooks are in dir()
+    for name in dir(schema_class):
+        hooks = getattr(getattr(schema_class, name, None),
+                        "__marshmallow_hook__", None)
+        if hooks and any(hooks.get(hook) for hook in _DUMP_HOOKS):
+            return True
+    return False
+
+
+class CompiledSerializer:
+    """
+    Serializer equivalent to ``schema.dump`` for flat, read-only dumps.
+
+    The field → key mapping and each field's value formatter are resolved
+    once from the schema's ``dump_fields``, so dumping a row is a single
+    pass over precomputed ``(key, attribute, formatter)`` entries instead of
+    marshmallow's per-field ``serialize`` machinery. The output is equal to
+    ``schema.dump`` and serializes to the same JSON bytes.
+
+    Parameters
+    ----------
+    schema : Schema
+        The schema to mirror.
+    plan : list of tuple
+        ``(key, attribute, formatter)`` per dumped field.
+    """
+
+    def __init__(self, schema, plan):
+        self.many = schema.many
+        self._plan = tuple(plan)
+
+    def _dump_one(self, obj):
+        row = {}
+        for key, attribute, formatter in self._plan:
+            value = getattr(obj, attribute)
+            row[key] = None if value is None else formatter(value)
+        return row
+
+    def dump(self, obj, *, many=None):
+        many = self.many if many is None else many
+        if many:
+            dump_one = self._dump_one
+            return [dump_one(item) for item in obj]
+        return self._dump_one(obj)
+
+
+def compile_schema(schema):
+    """
+    Build a ``CompiledSerializer`` for ``schema``.
+
+    Returns
+    -------
+    CompiledSerializer or None
+        ``None`` when the schema has dump hooks or a field whose output is
+        not a pure function of the attribute value (nested, method,
+        subclassed or custom fields); those schemas keep using marshmallow.
+    """
+    if _has_dump_hooks(type(schema)):
+        return None
+    plan = []
+    for name, field in schema.dump_fields.items():
+        factory = _FORMATTER_FACTORIES.get(type(field))
+        formatter = None if factory is None else factory(field)
+        if formatter is None:
+            return None
+        plan.append((field.data_key or name, field.attribute or name, formatter))
+    return CompiledSerializer(schema, plan)
+
+
+_serializers = WeakKeyDictionary()
+
+
+def serializer_for(schema):
+    """
+    Return the fastest equivalent serializer for read-only dumps.
+
+    The compiled serializer is cached per schema instance; schemas that
+    cannot be compiled are returned unchanged, as both expose ``dump``.
+    """
+    try:
+        return _serializers[schema]
+    except KeyError:
+        serializer = compile_schema(schema) or schema
+        _serializers[schema] = serializer
+        return serializer
@@ -0,0 +1,191 @@
+"""
+In-process benchmarks of the API hot paths at several data sizes.
+
+Each benchmark seeds ``size`` orders (and a tenth as many users) into the
+in-memory test database, then times a request through the test client, or a
+schema dump, and counts the SQL statements it issues. Results are checked
+against ``benchmark_baseline.json``:
+
+* the statement count must not exceed the baseline, which catches N+1
+  queries and extra round trips deterministically;
+* with ``RUN_BENCHMARKS=1``, the median time must also not exceed the
+  baseline by more than ``BENCHMARK_MAX_SLOWDOWN`` (a factor, default 3.0,
+  generous because the baseline comes from a different machine). Wall-clock
+  time depends on the machine and its load, so it is not checked by default.
+
+Environment variables:
+
+``BENCHMARK_SIZES``
+    Comma-separated data sizes, default ``100,1000,10000``.
+``BENCHMARK_ROUNDS``
+    Timed repetitions per benchmark, default 20.
+``RUN_BENCHMARKS=1``
+    Check the median times against the baseline too.
+``BENCHMARK_UPDATE_BASELINE=1``
+    Rewrite the baseline file with the measured values instead of checking.
+"""
+import json
+import os
+import statistics
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, select
+
+from database.db_seed import create_tables
+from database.models.orders import Order
+from database.models.users import User
+from flask_app.app import create_app, db
+from flask_app.config import TestingConfig
+from flask_app.routes.orders import multiple_orders_schema, signle_order_schema
+from flask_app.schemas.compiled import serializer_for
+from flask_app.tests.utils import capture_statements
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+SIZES = tuple(
+    int(size) for size in os.getenv("BENCHMARK_SIZES", "100,1000,10000").split(","))
+ROUNDS = int(os.getenv("BENCHMARK_ROUNDS", 20))
+MAX_SLOWDOWN = float(os.getenv("BENCHMARK_MAX_SLOWDOWN", 3.0))
+UPDATE_BASELINE = os.getenv("BENCHMARK_UPDATE_BASELINE") == "1"
+CHECK_TIMINGS = os.getenv("RUN_BENCHMARKS") == "1"
+DUMP_PAGE_SIZE = 100
+
+
+class BenchmarkConfig(TestingConfig):
+    # time the database and schema path, not the response cache
+    RESPONSE_CACHE_BACKEND = "none"
+
+
+def seed(size):
+    users = max(size // 10, 1)
+    db.session.execute(insert(User), [
+        {"name": f"User {i}", "email": f"user{i}@example.com", "city": "Warsaw"}
+        for i in range(users)
+    ])
+    db.session.execute(insert(Order), [
+        {"customer_id": i % users + 1, "product": "Widget", "quantity": i % 10 + 1,
+         "total_price": 9.99 * (i % 10 + 1), "order_date": date(2025, 1, i % 28 + 1)}
+        for i in range(size)
+    ])
+    db.session.commit()
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"n={size}")
+def bench_app(request):
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        create_tables(bind=db.session.get_bind())
+        seed(request.param)
+    app.benchmark_size = request.param
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    recorded = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    yield recorded
+    if UPDATE_BASELINE:
+        BASELINE_PATH.write_text(json.dumps(recorded, indent=2, sort_keys=True) + "\n")
+
+
+def measure(engine, fn):
+    """
+    Run ``fn`` once as warm-up, once to count statements, then ``ROUNDS``
+    times to take the median wall time.
+    """
+    fn()
+    with capture_statements(engine) as statements:
+        fn()
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "statements": len(statements),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def check(baseline, name, size, result):
+    key = f"{name}[{size}]"
+    if UPDATE_BASELINE:
+        baseline[key] = result
+        return
+    expected = baseline.get(key)
+    if expected is None:
+        pytest.skip(f"No baseline for {key}; run with BENCHMARK_UPDATE_BASELINE=1.")
+    assert result["statements"] <= expected["statements"], (
+        f"{key} issued {result['statements']} statements, "
+        f"baseline {expected['statements']}")
+    if not CHECK_TIMINGS:
+        return
+    limit = expected["median_ms"] * MAX_SLOWDOWN
+    assert result["median_ms"] <= limit, (
+        f"{key} took {result['median_ms']}ms, baseline {expected['median_ms']}ms "
+        f"(limit {limit:.3f}ms)")
+
+
+def run_request(bench_app, baseline, name, send, expected_status):
+    client = bench_app.test_client()
+
+    def request():
+        response = send(client)
+        assert response.status_code == expected_status
+
+    with bench_app.app_context():
+        engine = db.engine
+    check(baseline, name, bench_app.benchmark_size, measure(engine, request))
+
+
+def test_get_orders(bench_app, baseline):
+    run_request(bench_app, baseline, "get_orders",
+                lambda client: client.get("/orders/?limit=100"), 200)
+
+
+def test_get_order(bench_app, baseline):
+    order_id = bench_app.benchmark_size // 2
+    run_request(bench_app, baseline, "get_order",
+                lambda client: client.get(f"/orders/{order_id}"), 200)
+
+
+def test_create_order(bench_app, baseline):
+    payload = {"customer_id": 1, "product": "Widget", "quantity": 2,
+               "total_price": 19.98, "order_date": "2025-01-15"}
+    run_request(bench_app, baseline, "create_order",
+                lambda client: client.post("/orders/", json=payload), 201)
+
+
+def test_update_user(bench_app, baseline):
+    cities = iter(["Warsaw", "Cracow"] * (ROUNDS + 2))
+    run_request(bench_app, baseline, "update_user",
+                lambda client: client.put("/users/1", json={"city": next(cities)}),
+                200)
+
+
+def test_dump_orders(bench_app, baseline):
+    with bench_app.app_context():
+        orders = db.session.scalars(
+            select(Order).order_by(Order.id).limit(DUMP_PAGE_SIZE)).all()
+        result = measure(db.engine, lambda: multiple_orders_schema.dump(orders))
+    check(baseline, "dump_orders", bench_app.benchmark_size, result)
+
+
+def test_dump_orders_compiled(bench_app, baseline):
+    serializer = serializer_for(multiple_orders_schema)
+    with bench_app.app_context():
+        orders = db.session.scalars(
+            select(Order).order_by(Order.id).limit(DUMP_PAGE_SIZE)).all()
+        result = measure(db.engine, lambda: serializer.dump(orders))
+    check(baseline, "dump_orders_compiled", bench_app.benchmark_size, result)
+
+
+def test_dump_order(bench_app, baseline):
+    with bench_app.app_context():
+        order = db.session.get(Order, 1)
+        result = measure(db.engine, lambda: signle_order_schema.dump(order))
+    check(baseline, "dump_order", bench_app.benchmark_size, result)
@@ -0,0 +1,185 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from starlette.testclient import TestClient
+
+from database.db_seed import create_tables, seed_data
+from flask_app.app import create_app
+from flask_app.asgi.app import create_asgi_app, make_json_encoder
+from flask_app.config import TestingConfig
+
+
+@pytest.fixture(scope="module")
+def config(tmp_path_factory):
+    # a file database, so the sync seeding, the aiosqlite engine and the
+    # Flask app of the parity test all see the same rows
+    path = tmp_path_factory.mktemp("asgi") / "api.db"
+    engine = create_engine(f"sqlite:///{path}")
+    create_tables(engine)
+    with Session(engine) as session:
+        seed_data(session)
+    engine.dispose()
+
+    class AsgiTestingConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        PAGE_SIZE_DEFAULT = 2
+        BULK_MAX_ROWS = 3
+    return AsgiTestingConfig
+
+
+@pytest.fixture(scope="module")
+def client(config):
+    with TestClient(create_asgi_app(config)) as client:
+        yield client
+
+
+@pytest.fixture
+def user_data():
+    return {"name": "Alice", "email": f"alice_{uuid.uuid4().hex}@example.com",
+            "city": "Wonderland"}
+
+
+def test_hello_world(client):
+    assert client.get("/").text == "hello to the pokemon world!"
+
+
+def test_user_lifecycle(client, user_data):
+    response = client.post("/users", json=user_data)
+    assert response.status_code == 201
+    user = response.json()
+    assert {key: user[key] for key in user_data} == user_data
+
+    assert client.get(f"/users/{user['id']}").json() == user
+
+    response = client.put(f"/users/{user['id']}", json={"city": "Oz"})
+    assert response.status_code == 200
+    assert response.json() == {**user, "city": "Oz"}
+
+    response = client.delete(f"/users/{user['id']}")
+    assert response.json() == {"message": "User deleted"}
+    response = client.get(f"/users/{user['id']}")
+    assert response.status_code == 404
+    assert response.json() == {"error": "User not found"}
+
+
+def test_create_user_duplicate_email(client, user_data):
+    client.post("/users", json=user_data)
+    response = client.post("/users", json=user_data)
+    assert response.status_code == 409
+    assert response.json() == {
+        "error": "User already exists or violates a constraint."}
+
+
+def test_create_user_invalid_payload(client):
+    response = client.post("/users", json={"name": "Bob"})
+    assert response.status_code == 400
+    assert "email" in response.json()["error"]
+    response = client.post("/users", content=b"{not json",
+                           headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+
+
+def test_update_missing_user(client):
+    response = client.put("/users/999999", json={"city": "Oz"})
+    assert response.status_code == 404
+
+
+def test_get_users_keyset_pagination(client):
+    first_page = client.get("/users")
+    assert len(first_page.json()) == 2
+    next_url = first_page.headers["Link"].split(">")[0].lstrip("<")
+    assert f"after_id={first_page.headers['X-Next-After-Id']}" in next_url
+    second_page = client.get(next_url).json()
+    assert second_page[0]["id"] > first_page.json()[-1]["id"]
+
+
+def test_get_users_filters_and_fields(client, user_data):
+    client.post("/users", json=user_data)
+    response = client.get("/users?city=Wonderland&fields=city,email&limit=100")
+    users = response.json()
+    assert users and all(set(user) == {"city", "email"} for user in users)
+    assert all(user["city"] == "Wonderland" for user in users)
+    assert client.get("/users?fields=secret").status_code == 400
+    assert client.get("/users?limit=0").status_code == 400
+
+
+def test_get_users_ndjson_stream(client):
+    response = client.get("/users", headers={"Accept": "application/x-ndjson"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert streamed == client.get("/users?limit=1000").json()
+
+
+def test_order_lifecycle(client):
+    payload = {"customer_id": 1, "product": "Async", "quantity": 2,
+               "total_price": 19.98, "order_date": "2024-06-01"}
+    order = client.post("/orders/", json=payload).json()
+    assert {key: order[key] for key in payload} == payload
+    assert client.get(f"/orders/{order['id']}").json() == order
+    assert client.put(f"/orders/{order['id']}",
+                      json={"quantity": 3}).json()["quantity"] == 3
+    assert client.delete(f"/orders/{order['id']}").json() == {
+        "message": "Order deleted"}
+
+
+def test_create_orders_bulk(client):
+    orders = [{"customer_id": 1, "product": "Bulk"} for _ in range(3)]
+    response = client.post("/orders/bulk", json=orders)
+    assert response.status_code == 201
+    assert [order["quantity"] for order in response.json()] == [1, 1, 1]
+    response = client.post("/orders/bulk", json=orders + orders[:1])
+    assert response.status_code == 413
+
+
+def test_get_order_stats(client):
+    client.post("/orders/bulk", json=[
+        {"customer_id": 1, "product": "Stat", "quantity": 2, "total_price": 3.0}])
+    response = client.get("/orders/stats/product?product=Stat")
+    assert response.headers["X-Stats-Source"] == "orders"
+    assert response.json() == [
+        {"product": "Stat", "orders": 1, "quantity": 2, "revenue": 3.0}]
+    assert client.get("/orders/stats/weekday").status_code == 404
+
+
+def test_unknown_route_and_method(client):
+    response = client.get("/nope")
+    assert response.status_code == 404
+    assert response.json() == {"error": "Resource not found at '/nope'"}
+    response = client.patch("/users/1")
+    assert response.status_code == 405
+    assert response.json() == {
+        "error": "Method 'PATCH' not allowed on endpoint '/users/1'"}
+
+
+@pytest.mark.parametrize("path", [
+    "/users/1",
+    "/users?limit=3",
+    "/orders/1",
+    "/orders/?limit=5&fields=product,quantity",
+    "/orders/?format=ndjson",
+    "/orders/stats/city",
+])
+def test_responses_match_the_flask_app(client, config, path):
+    flask_client = create_app(config).test_client()
+    flask_response = flask_client.get(path)
+    response = client.get(path)
+    assert response.status_code == flask_response.status_code
+    assert response.content == flask_response.get_data()
+    for header in ("X-Next-After-Id", "Link"):
+        assert response.headers.get(header) == flask_response.headers.get(header)
+
+
+def test_make_json_encoder_rejects_unknown_provider():
+    with pytest.raises(ValueError):
+        make_json_encoder({"JSON_PROVIDER": "simplejson"})
+
+
+def test_unknown_order_stats_source_stops_the_app():
+    class BadConfig(TestingConfig):
+        ORDER_STATS_SOURCE = "cube"
+
+    with pytest.raises(ValueError, match="ORDER_STATS_SOURCE"):
+        create_asgi_app(BadConfig)
@@ -0,0 +1,159 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from marshmallow import Schema, fields, post_dump, post_load, pre_dump
+
+from database.db_seed import seed_data, create_tables
+from database.models.orders import Order
+from database.models.users import User
+from flask_app.app import create_app, db
+from flask_app.config import TestingConfig
+from flask_app.json_provider import ORJSONProvider
+from flask_app.routes.orders import multiple_orders_schema, signle_order_schema
+from flask_app.routes.users import multiple_users_schema
+from flask_app.schemas.compiled import CompiledSerializer, serializer_for
+
+
+class OrjsonConfig(TestingConfig):
+    JSON_PROVIDER = "orjson"
+
+
+def make_app(config):
+    app = create_app(config)
+    with app.app_context():
+        create_tables(bind=db.session.get_bind())
+        seed_data(session=db.session)
+    return app
+
+
+@pytest.fixture
+def test_app():
+    app = make_app(TestingConfig)
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(test_app):
+    return test_app.test_client()
+
+
+def sample_orders():
+    return [
+        Order(id=1, customer_id=1, product="Widget", quantity=2,
+              total_price=20, order_date=date(2025, 1, 31)),
+        Order(id=2, customer_id=1, product="Łódź", quantity=None,
+              total_price=19.99, order_date=None),
+    ]
+
+
+def test_compiled_dump_matches_marshmallow():
+    orders = sample_orders()
+    serializer = serializer_for(multiple_orders_schema)
+    assert isinstance(serializer, CompiledSerializer)
+    assert serializer.dump(orders) == multiple_orders_schema.dump(orders)
+    # int stored in a Float column is dumped as a float, like marshmallow
+    assert serializer.dump(orders)[0]["total_price"] == 20.0
+    assert isinstance(serializer.dump(orders)[0]["total_price"], float)
+    assert (serializer_for(signle_order_schema).dump(orders[0])
+            == signle_order_schema.dump(orders[0]))
+
+    users = [User(id=1, name="Ann", email="ann@a.com", city=None)]
+    assert (serializer_for(multiple_users_schema).dump(users)
+            == multiple_users_schema.dump(users))
+
+
+def test_data_key_and_attribute_are_honoured():
+    class RenamingSchema(Schema):
+        order_id = fields.Integer(attribute="id", data_key="orderId")
+        placed = fields.Date(attribute="order_date", format="%d.%m.%Y")
+
+    schema = RenamingSchema()
+    order = sample_orders()[0]
+    assert serializer_for(schema).dump(order) == schema.dump(order) == {
+        "orderId": 1, "placed": "31.01.2025"}
+
+
+def test_uncompilable_schemas_fall_back_to_marshmallow():
+    class MethodSchema(Schema):
+        label = fields.Method("get_label")
+
+        def get_label(self, obj):
+            return obj.product
+
+    class HookSchema(Schema):
+        id = fields.Integer()
+
+        @post_dump
+        def wrap(self, data, **kwargs):
+            return {"data": data}
+
+    class InheritedHookSchema(HookSchema):
+        name = fields.String()
+
+    class ManyHookSchema(Schema):
+        id = fields.Integer()
+
+        @pre_dump(pass_collection=True)
+        def sort(self, items, many, **kwargs):
+            return sorted(items, key=lambda item: item.id) if many else items
+
+    class AsStringSchema(Schema):
+        id = fields.Integer(as_string=True)
+
+    for schema in (MethodSchema(), HookSchema(), InheritedHookSchema(),
+                   ManyHookSchema(many=True), AsStringSchema()):
+        assert serializer_for(schema) is schema
+
+
+def test_load_hooks_do_not_prevent_compiling():
+    class LoadHookSchema(Schema):
+        id = fields.Integer()
+
+        @post_load
+        def to_dict(self, data, **kwargs):
+            return dict(data)
+
+    schema = LoadHookSchema()
+    assert serializer_for(schema) is not schema
+    assert serializer_for(schema).dump(SimpleNamespace(id=3)) == {"id": 3}
+
+
+def test_list_response_bytes_are_unchanged(test_app, client):
+    response = client.get("/orders/")
+    with test_app.test_request_context():
+        orders = db.session.query(Order).order_by(Order.id).limit(100).all()
+        expected = test_app.json.response(multiple_orders_schema.dump(orders))
+    assert response.get_data() == expected.get_data()
+
+
+def test_orjson_provider_matches_default_for_ascii():
+    # the API payloads hold ASCII text and plain floats; exponent notation
+    # is formatted differently (1e16 vs 1e+16), see ORJSONProvider
+    pytest.importorskip("orjson")
+    default_app = make_app(TestingConfig)
+    orjson_app = make_app(OrjsonConfig)
+    assert isinstance(orjson_app.json, ORJSONProvider)
+    for url in ("/orders/", "/users", "/orders/1", "/users/2"):
+        default_body = default_app.test_client().get(url).get_data()
+        assert orjson_app.test_client().get(url).get_data() == default_body
+
+    payload = {"b": 1, "a": [1.5, None, True], "when": date(2025, 1, 31)}
+    with default_app.app_context():
+        default_bytes = default_app.json.response(payload).get_data()
+    with orjson_app.app_context():
+        assert orjson_app.json.response(payload).get_data() == default_bytes
+        assert orjson_app.json.loads(b'{"a": 1}') == {"a": 1}
+    for app in (default_app, orjson_app):
+        with app.app_context():
+            db.drop_all()
+
+
+def test_unknown_json_provider():
+    class BadConfig(TestingConfig):
+        JSON_PROVIDER = "ujson"
+
+    with pytest.raises(ValueError):
+        create_app(BadConfig)
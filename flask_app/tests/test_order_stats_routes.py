@@ -0,0 +1,78 @@
+import pytest
+
+from database.db_seed import create_tables, seed_data
+from database.order_stats import refresh_order_stats
+from flask_app.app import create_app, db
+from flask_app.config import TestingConfig
+
+
+class SummaryStatsConfig(TestingConfig):
+    ORDER_STATS_SOURCE = "summary"
+
+
+def make_app(config):
+    app = create_app(config)
+    with app.app_context():
+        create_tables(bind=db.session.get_bind())
+        seed_data(db.session)
+    return app
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = make_app(TestingConfig)
+    yield app.test_client()
+    with app.app_context():
+        db.drop_all()
+
+
+def test_get_order_stats_by_product(client):
+    client.post("/orders/bulk", json=[
+        {"customer_id": 1, "product": "Stats", "quantity": 2,
+         "total_price": 5.0, "order_date": "2030-01-01"},
+        {"customer_id": 2, "product": "Stats", "quantity": 1,
+         "total_price": 2.5, "order_date": "2030-01-02"},
+    ])
+    response = client.get("/orders/stats/product?product=Stats")
+    assert response.status_code == 200
+    assert response.headers["X-Stats-Source"] == "orders"
+    assert response.get_json() == [
+        {"product": "Stats", "orders": 2, "quantity": 3, "revenue": 7.5}]
+
+
+def test_get_order_stats_by_day_with_date_range(client):
+    response = client.get(
+        "/orders/stats/day?order_date_from=2030-01-02&order_date_to=2030-12-31")
+    assert [row["day"] for row in response.get_json()] == ["2030-01-02"]
+
+
+def test_get_order_stats_unknown_dimension(client):
+    assert client.get("/orders/stats/weekday").status_code == 404
+
+
+def test_get_order_stats_invalid_filter(client):
+    response = client.get("/orders/stats/product?order_date_from=yesterday")
+    assert response.status_code == 400
+
+
+def test_get_order_stats_from_summary():
+    app = make_app(SummaryStatsConfig)
+    client = app.test_client()
+    with app.app_context():
+        # the summary only reflects orders once it has been refreshed
+        assert client.get("/orders/stats/city").get_json() == []
+        with db.engine.begin() as connection:
+            refresh_order_stats(connection)
+        response = client.get("/orders/stats/city")
+        assert response.headers["X-Stats-Source"] == "summary"
+        assert response.get_json() and sum(
+            row["orders"] for row in response.get_json()) > 0
+        db.drop_all()
+
+
+def test_unknown_order_stats_source_stops_the_app():
+    class BadConfig(TestingConfig):
+        ORDER_STATS_SOURCE = "cube"
+
+    with pytest.raises(ValueError, match="ORDER_STATS_SOURCE"):
+        create_app(BadConfig)
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from flask_app.app import create_app, db
@@ -250,3 +252,166 @@ def test_get_order_after_update(client, order_data):
     get_resp = client.get(f"/orders/{order_id}")
     assert get_resp.status_code == 200
     assert get_resp.get_json()["product"] == "Updated"
+
+
+def test_get_orders_keyset_pagination(client, order_data):
+    for _ in range(3):
+        client.post("/orders/", json=order_data)
+    first_page = client.get("/orders/?limit=2")
+    assert first_page.status_code == 200
+    first_ids = [item["id"] for item in first_page.get_json()]
+    assert len(first_ids) == 2
+    assert first_ids == sorted(first_ids)
+    next_after_id = int(first_page.headers["X-Next-After-Id"])
+    assert next_after_id == first_ids[-1]
+    assert 'rel="next"' in first_page.headers["Link"]
+
+    second_page = client.get(f"/orders/?after_id={next_after_id}&limit=2")
+    second_ids = [item["id"] for item in second_page.get_json()]
+    assert second_ids
+    assert min(second_ids) > max(first_ids)
+
+
+def test_get_orders_last_page_has_no_next_link(client):
+    all_ids = [item["id"] for item in client.get("/orders/?limit=1000").get_json()]
+    response = client.get(f"/orders/?after_id={all_ids[-1]}")
+    assert response.status_code == 200
+    assert response.get_json() == []
+    assert "Link" not in response.headers
+
+
+def test_get_orders_invalid_pagination_params(client):
+    assert client.get("/orders/?limit=abc").status_code == 400
+    assert client.get("/orders/?limit=0").status_code == 400
+    assert client.get("/orders/?after_id=-1").status_code == 400
+
+
+def test_get_orders_ndjson_stream(client, order_data):
+    client.post("/orders/", json=order_data)
+    paged = client.get("/orders/?limit=1000").get_json()
+    response = client.get("/orders/?format=ndjson")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    streamed = [json.loads(line) for line in lines]
+    assert streamed == paged
+
+
+def test_get_orders_ndjson_stream_respects_cursor(client):
+    first_id = client.get("/orders/?limit=1").get_json()[0]["id"]
+    response = client.get(
+        f"/orders/?after_id={first_id}&limit=2",
+        headers={"Accept": "application/x-ndjson"})
+    assert response.mimetype == "application/x-ndjson"
+    streamed = [json.loads(line)
+                for line in response.get_data(as_text=True).splitlines()]
+    assert len(streamed) == 2
+    assert all(item["id"] > first_id for item in streamed)
+
+
+def test_create_orders_bulk(client, order_data):
+    payload = [dict(order_data, quantity=i + 1) for i in range(5)]
+    response = client.post("/orders/bulk", json=payload)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert [item["quantity"] for item in data] == [1, 2, 3, 4, 5]
+    assert all("id" in item for item in data)
+    assert client.get(f"/orders/{data[-1]['id']}").status_code == 200
+
+
+def test_create_orders_bulk_reports_row_errors(client, order_data):
+    total_before = len(client.get("/orders/?limit=1000").get_json())
+    payload = [order_data, {"product": "No customer"},
+               dict(order_data, quantity="two")]
+    response = client.post("/orders/bulk", json=payload)
+    assert response.status_code == 400
+    errors = response.get_json()["error"]
+    assert set(errors) == {"1", "2"}
+    assert "customer_id" in errors["1"]
+    assert "quantity" in errors["2"]
+    # nothing from the rejected batch is written
+    assert len(client.get("/orders/?limit=1000").get_json()) == total_before
+
+
+def test_create_orders_bulk_invalid_payload(client, order_data):
+    assert client.post("/orders/bulk", json=[]).status_code == 400
+    assert client.post("/orders/bulk", json=order_data).status_code == 400
+
+
+def test_create_orders_bulk_too_large(client, test_app, order_data):
+    test_app.config["BULK_MAX_ROWS"] = 2
+    try:
+        response = client.post("/orders/bulk", json=[order_data] * 3)
+    finally:
+        test_app.config["BULK_MAX_ROWS"] = TestingConfig.BULK_MAX_ROWS
+    assert response.status_code == 413
+
+
+def test_get_orders_filters(client):
+    orders = [
+        {"customer_id": 2, "product": "Filtered", "order_date": "2025-01-15"},
+        {"customer_id": 2, "product": "Filtered", "order_date": "2025-02-01"},
+        {"customer_id": 3, "product": "Filtered", "order_date": "2025-02-10"},
+        {"customer_id": 2, "product": "Other", "order_date": "2025-02-20"},
+    ]
+    client.post("/orders/bulk", json=orders)
+
+    response = client.get(
+        "/orders/?product=Filtered&customer_id=2&order_date_from=2025-02-01")
+    assert response.status_code == 200
+    assert [(item["customer_id"], item["order_date"])
+            for item in response.get_json()] == [(2, "2025-02-01")]
+
+    response = client.get(
+        "/orders/?product=Filtered&order_date_from=2025-01-15"
+        "&order_date_to=2025-02-01")
+    assert [item["order_date"] for item in response.get_json()] == [
+        "2025-01-15", "2025-02-01"]
+
+
+def test_get_orders_filters_carry_over_to_next_page(client):
+    client.post("/orders/bulk", json=[
+        {"customer_id": 1, "product": "Paged"} for _ in range(3)])
+    first_page = client.get("/orders/?product=Paged&limit=2")
+    assert "product=Paged" in first_page.headers["Link"]
+    next_url = first_page.headers["Link"].split(">")[0].lstrip("<")
+    second_page = client.get(next_url).get_json()
+    assert [item["product"] for item in second_page] == ["Paged"]
+
+
+def test_get_orders_invalid_filters(client):
+    assert client.get("/orders/?customer_id=abc").status_code == 400
+    assert client.get("/orders/?order_date_from=2025-13-01").status_code == 400
+
+
+def test_get_orders_fields_projection(client, order_data):
+    client.post("/orders/", json=order_data)
+    response = client.get("/orders/?fields=product,quantity&limit=1")
+    assert response.status_code == 200
+    assert set(response.get_json()[0]) == {"product", "quantity"}
+    # the cursor still works without "id" in the projection
+    assert "X-Next-After-Id" in response.headers
+
+    response = client.get("/orders/?fields=id,order_date&format=ndjson")
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines and all(set(line) == {"id", "order_date"} for line in lines)
+
+
+def test_get_orders_fields_projection_selects_only_requested_columns(
+        test_app, client):
+    from flask_app.app import db
+    from flask_app.tests.utils import capture_statements
+
+    with test_app.app_context():
+        engine = db.engine
+    with capture_statements(engine) as statements:
+        client.get("/orders/?fields=product&limit=5")
+    select_list = statements[0].split("FROM")[0]
+    assert "orders.product" in select_list and "orders.id" in select_list
+    assert "orders.total_price" not in select_list
+
+
+def test_get_orders_unknown_field(client):
+    response = client.get("/orders/?fields=product,secret")
+    assert response.status_code == 400
+    assert "fields" in response.get_json()["error"]
@@ -0,0 +1,165 @@
+import json
+import threading
+
+import pytest
+
+from database.db_seed import seed_data, create_tables
+from flask_app.app import create_app, db
+from flask_app.config import TestingConfig
+from flask_app.request_metrics import (
+    MetricsRegistry,
+    _MetricsState,
+    clear_multiprocess_dir,
+    merge_snapshots,
+    render,
+)
+
+
+def make_app(config):
+    app = create_app(config)
+    with app.app_context():
+        create_tables(bind=db.session.get_bind())
+        seed_data(session=db.session)
+    return app
+
+
+@pytest.fixture
+def test_app():
+    app = make_app(TestingConfig)
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(test_app):
+    return test_app.test_client()
+
+
+def samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines()
+                if not line.startswith("#"))
+
+
+def test_metrics_count_requests_per_endpoint_and_status(client):
+    client.get("/orders/1")
+    client.get("/orders/1")
+    client.get("/orders/999999")
+    client.get("/no-such-page")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+
+    values = samples(response.get_data(as_text=True))
+    ok = ('flask_http_requests_total{blueprint="orders",'
+          'endpoint="orders.get_order",method="GET",status="200"}')
+    missing = ok.replace('"200"', '"404"')
+    unmatched = ('flask_http_requests_total{blueprint="",'
+                 'endpoint="unmatched",method="GET",status="404"}')
+    assert values[ok] == "2"
+    assert values[missing] == "1"
+    assert values[unmatched] == "1"
+    labels = '{blueprint="orders",endpoint="orders.get_order",method="GET"'
+    assert values[f'flask_http_request_duration_seconds_bucket{labels},le="+Inf"}}'] == "3"
+    assert values[f"flask_http_request_duration_seconds_count{labels}}}"] == "3"
+
+
+def test_error_handler_responses_are_counted(client):
+    client.post("/users", json={})
+    values = samples(client.get("/metrics").get_data(as_text=True))
+    assert values['flask_http_requests_total{blueprint="users",'
+                  'endpoint="users.create_user",method="POST",status="400"}'] == "1"
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 2.0):
+        registry.observe("orders", "orders.get_order", "GET", 200, seconds)
+    values = samples(render(registry.snapshot()))
+    labels = '{blueprint="orders",endpoint="orders.get_order",method="GET"'
+    assert values[f'flask_http_request_duration_seconds_bucket{labels},le="0.1"}}'] == "2"
+    assert values[f'flask_http_request_duration_seconds_bucket{labels},le="1.0"}}'] == "3"
+    assert values[f'flask_http_request_duration_seconds_bucket{labels},le="+Inf"}}'] == "4"
+    assert values[f"flask_http_request_duration_seconds_sum{labels}}}"] == "2.65"
+
+
+def test_render_gauges():
+    gauges = [("db_pool_checkedout", "Connections in use.", {"pid": "7"}, 3)]
+    text = render(merge_snapshots([]), gauges)
+    assert "# TYPE db_pool_checkedout gauge" in text
+    assert samples(text)['db_pool_checkedout{pid="7"}'] == "3"
+
+
+def test_registry_merges_thread_shards():
+    registry = MetricsRegistry()
+
+    def work():
+        for _ in range(1000):
+            registry.observe("users", "users.get_user", "GET", 200, 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = registry.snapshot()
+    assert list(snapshot["requests"].values()) == [4000]
+
+
+def test_multiprocess_snapshots_are_merged(tmp_path):
+    class MultiProcessConfig(TestingConfig):
+        METRICS_MULTIPROC_DIR = str(tmp_path)
+        METRICS_FLUSH_INTERVAL = 0
+
+    other_worker = MetricsRegistry()
+    other_worker.observe("users", "users.get_user", "GET", 200, 0.01)
+    other_worker.observe("users", "users.get_user", "GET", 200, 0.01)
+    (tmp_path / "metrics_1.json").write_text(
+        json.dumps(other_worker.snapshot()))
+
+    app = make_app(MultiProcessConfig)
+    client = app.test_client()
+    client.get("/users/1")
+    assert len(list(tmp_path.glob("metrics_*.json"))) == 2
+    values = samples(client.get("/metrics").get_data(as_text=True))
+    assert values['flask_http_requests_total{blueprint="users",'
+                  'endpoint="users.get_user",method="GET",status="200"}'] == "3"
+    with app.app_context():
+        db.drop_all()
+
+
+def test_workers_sharing_a_pid_keep_separate_files(tmp_path):
+    # a worker that reuses the pid of a dead one must not overwrite its file
+    dead = _MetricsState(MetricsRegistry(), tmp_path, 0)
+    dead.registry.observe("users", "users.get_user", "GET", 200, 0.01)
+    dead.flush()
+    reused = _MetricsState(MetricsRegistry(), tmp_path, 0)
+    reused.registry.observe("users", "users.get_user", "GET", 200, 0.01)
+    reused.flush()
+    assert dead.path != reused.path
+    assert len(list(tmp_path.glob("metrics_*.json"))) == 2
+    reader = _MetricsState(MetricsRegistry(), tmp_path, 0)
+    assert list(reader.collect()["requests"].values()) == [2]
+
+
+def test_exiting_worker_publishes_unflushed_counts(tmp_path):
+    state = _MetricsState(MetricsRegistry(), tmp_path, 60)
+    state.registry.observe("users", "users.get_user", "GET", 200, 0.01)
+    state.maybe_flush()
+    state.registry.observe("users", "users.get_user", "GET", 200, 0.01)
+    state.flush_on_exit()
+    snapshot = json.loads(state.path.read_text())
+    assert list(snapshot["requests"].values()) == [2]
+
+
+def test_clear_multiprocess_dir_removes_snapshots_only(tmp_path):
+    (tmp_path / "metrics_1_1.json").write_text("{}")
+    (tmp_path / "metrics_2_1.tmp").write_text("{}")
+    (tmp_path / "other.json").write_text("{}")
+    clear_multiprocess_dir(tmp_path)
+    assert [path.name for path in tmp_path.iterdir()] == ["other.json"]
+
+
+def test_merge_snapshots_of_nothing_renders_headers_only():
+    text = render(merge_snapshots([]))
+    assert all(line.startswith("#") for line in text.splitlines())
@@ -0,0 +1,216 @@
+import uuid
+
+import pytest
+
+from flask_app.app import cache, create_app, db
+from flask_app.cache import LRUCache, RedisCache, create_cache_backend
+from flask_app.config import TestingConfig
+from database.db_seed import seed_data, create_tables
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Minimal Redis-compatible stand-in (no expiry)."""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def incr(self, key):
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
+    def scan_iter(self, pattern):
+        prefix = pattern.rstrip("*")
+        return [key for key in self.store if key.startswith(prefix)]
+
+
+class CacheConfig(TestingConfig):
+    RESPONSE_CACHE_BACKEND = "memory"
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    app = create_app(CacheConfig)
+    with app.app_context():
+        create_tables(bind=db.session.get_bind())
+        seed_data(session=db.session)
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(test_app):
+    return test_app.test_client()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_lru_cache_expires_entries():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=10, ttl=5, clock=clock)
+    cache.set("a", b"1")
+    clock.now = 4.9
+    assert cache.get("a") == b"1"
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_redis_cache_uses_prefix_and_ttl():
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=30, prefix="test:")
+    cache.set("users:1", b"{}")
+    assert client.store == {"test:users:1": b"{}"}
+    assert client.expiry["test:users:1"] == 30
+    assert cache.get("users:1") == b"{}"
+    cache.delete("users:1")
+    assert cache.get("users:1") is None
+    assert cache.generation("users:1") == 0
+    cache.bump("users:1")
+    cache.bump("users:1")
+    assert client.store["test:generation:users:1"] == 2
+    assert client.expiry["test:generation:users:1"] == 60
+    assert cache.generation("users:1") == 2
+
+
+def test_lru_cache_generations_survive_eviction():
+    cache = LRUCache(max_entries=1, ttl=60)
+    cache.bump("a")
+    cache.set("a@1", b"1")
+    cache.set("b@0", b"2")
+    assert cache.get("a@1") is None
+    assert cache.generation("a") == 1
+
+
+def test_lru_cache_generations_stay_bounded():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=10, ttl=5, clock=clock)
+    for i in range(1000):
+        cache.bump(f"users:{i}")
+    assert len(cache._generations) == 1000
+    clock.now = 10.0
+    assert cache.generation("users:0") == 0
+    cache.bump("users:0")
+    assert len(cache._generations) == 1
+    # a bump never reuses a value, even after its key expired
+    assert cache.generation("users:0") == 1001
+
+
+def test_create_cache_backend_from_config():
+    assert create_cache_backend({}) is None
+    assert create_cache_backend({"RESPONSE_CACHE_BACKEND": "none"}) is None
+    assert isinstance(
+        create_cache_backend({"RESPONSE_CACHE_BACKEND": "memory"}), LRUCache)
+    client = FakeRedis()
+    backend = create_cache_backend({
+        "RESPONSE_CACHE_BACKEND": "redis",
+        "RESPONSE_CACHE_REDIS_CLIENT": client,
+    })
+    assert isinstance(backend, RedisCache) and backend.client is client
+    with pytest.raises(ValueError):
+        create_cache_backend({"RESPONSE_CACHE_BACKEND": "memcached"})
+
+
+def test_get_user_served_from_cache(client):
+    first = client.get("/users/1")
+    second = client.get("/users/1")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_data() == first.get_data()
+    assert second.mimetype == "application/json"
+
+
+def test_get_user_not_found_is_not_cached(client):
+    assert client.get("/users/99999").status_code == 404
+    response = client.get("/users/99999")
+    assert response.status_code == 404
+    assert "X-Cache" not in response.headers
+
+
+def test_update_user_evicts_cache(client):
+    client.get("/users/1")
+    client.put("/users/1", json={"city": "Gdansk"})
+    response = client.get("/users/1")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.get_json()["city"] == "Gdansk"
+
+
+def test_fill_racing_an_update_is_not_served(test_app, client):
+    with test_app.app_context():
+        generation = cache.generation("users:1")
+        stale = client.get("/users/1").get_data()
+        client.put("/users/1", json={"city": "Gdansk"})
+        # the slow reader stores what it read before the update
+        cache.set("users:1", stale, generation)
+    response = client.get("/users/1")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.get_json()["city"] == "Gdansk"
+
+
+def test_default_config_disables_cache():
+    app = create_app(TestingConfig)
+    assert app.extensions["response_cache"] is None
+
+
+def test_failed_update_keeps_cache(client):
+    email = f"other_{uuid.uuid4().hex}@example.com"
+    client.post("/users", json={"name": "Other", "email": email})
+    client.get("/users/1")
+    assert client.put("/users/1", json={"email": email}).status_code == 409
+    assert client.get("/users/1").headers["X-Cache"] == "HIT"
+
+
+def test_delete_order_evicts_cache(client):
+    assert client.get("/orders/1").status_code == 200
+    assert client.get("/orders/1").headers["X-Cache"] == "HIT"
+    client.delete("/orders/1")
+    assert client.get("/orders/1").status_code == 404
+
+
+def test_cache_disabled(test_app, client):
+    test_app.extensions["response_cache"] = None
+    client.get("/orders/1")
+    assert client.get("/orders/1").headers["X-Cache"] == "MISS"
+
+
+def test_redis_backend_serves_routes(test_app, client):
+    fake_redis = FakeRedis()
+    test_app.extensions["response_cache"] = RedisCache(fake_redis)
+    first = client.get("/orders/2")
+    assert "flask_app:orders:2@0" in fake_redis.store
+    assert client.get("/orders/2").get_data() == first.get_data()
+    client.put("/orders/2", json={"quantity": 7})
+    assert fake_redis.store["flask_app:generation:orders:2"] == 1
+    assert fake_redis.expiry["flask_app:generation:orders:2"] == 120
+    response = client.get("/orders/2")
+    assert response.headers["X-Cache"] == "MISS"
+    assert "flask_app:orders:2@1" in fake_redis.store
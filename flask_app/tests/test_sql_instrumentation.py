@@ -0,0 +1,116 @@
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from database.db_seed import seed_data, create_tables
+from database.models.users import User
+from flask_app.app import create_app, db
+from flask_app.config import TestingConfig
+
+
+class InstrumentedConfig(TestingConfig):
+    SQL_INSTRUMENTATION = True
+    SQL_STATEMENT_BUDGET = 3
+    SQL_REPEAT_THRESHOLD = 3
+    RESPONSE_CACHE_BACKEND = "none"
+
+
+def make_app(config):
+    app = create_app(config)
+
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        # one SELECT per user, the pattern the instrumentation should flag
+        user_ids = db.session.scalars(select(User.id).limit(3)).all()
+        names = [db.session.get(User, user_id).name for user_id in user_ids]
+        return {"names": names}
+
+    with app.app_context():
+        create_tables(bind=db.session.get_bind())
+        seed_data(session=db.session)
+    return app
+
+
+@pytest.fixture
+def test_app():
+    app = make_app(InstrumentedConfig)
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(test_app):
+    return test_app.test_client()
+
+
+def test_server_timing_reports_statements(client):
+    response = client.get("/users/1")
+    assert response.status_code == 200
+    timings = response.headers.getlist("Server-Timing")
+    assert timings[0].startswith("db;dur=")
+    assert timings[0].endswith('desc="1 statements"')
+    assert timings[1].startswith("db-slowest;dur=")
+
+
+def test_request_without_queries_reports_zero(client):
+    response = client.get("/")
+    assert response.headers.getlist("Server-Timing") == [
+        'db;dur=0.00;desc="0 statements"']
+
+
+def test_n_plus_one_is_flagged(client, caplog):
+    with caplog.at_level(logging.INFO, logger="flask_app.instrumentation"):
+        client.get("/users/1")
+        client.get("/n-plus-one")
+    info, warning = caplog.records
+    assert info.levelno == logging.INFO
+    assert info.sql == {"endpoint": "users.get_user", "method": "GET",
+                        "status": 200, "statements": 1,
+                        "db_ms": info.sql["db_ms"],
+                        "slowest_ms": info.sql["slowest_ms"]}
+    assert warning.levelno == logging.WARNING
+    assert warning.sql["statements"] == 4
+    assert "max_repeats=3" in warning.getMessage()
+
+    stats = client.get("/metrics/sql").get_json()
+    assert stats["n_plus_one"]["over_budget"] == 1
+    assert stats["n_plus_one"]["repeated_statements"] == 1
+    assert stats["n_plus_one"]["max_statements"] == 4
+    assert stats["users.get_user"]["over_budget"] == 0
+
+
+def test_failed_statement_does_not_break_accounting(client):
+    response = client.post("/users", json={"name": "Dup", "email": "dup@x.com"})
+    assert response.status_code == 201
+    conflict = client.post("/users", json={"name": "Dup", "email": "dup@x.com"})
+    assert conflict.status_code == 409
+    assert client.get("/users/1").headers.getlist("Server-Timing")[0].endswith(
+        'desc="1 statements"')
+
+
+def test_disabled_by_default():
+    app = make_app(TestingConfig)
+    client = app.test_client()
+    assert "Server-Timing" not in client.get("/users/1").headers
+    assert client.get("/metrics/sql").get_json() == {}
+    with app.app_context():
+        db.drop_all()
+
+
+def test_streamed_response_is_recorded_when_closed(client, caplog):
+    with caplog.at_level(logging.INFO, logger="flask_app.instrumentation"):
+        response = client.get("/users?format=ndjson")
+        assert response.status_code == 200
+        assert "Server-Timing" not in response.headers
+        assert response.get_data()
+        assert not caplog.records
+        response.close()
+    [record] = caplog.records
+    assert record.sql["endpoint"] == "users.get_users"
+    assert record.sql["statements"] >= 1
+
+    stats = client.get("/metrics/sql").get_json()
+    assert stats["users.get_users"]["requests"] == 1
+    assert stats["users.get_users"]["statements"] == record.sql["statements"]
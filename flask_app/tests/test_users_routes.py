@@ -1,3 +1,4 @@
+import json
 import pytest
 import uuid
 
@@ -370,6 +371,64 @@ def test_delete_user_invalid_id(client):
 def test_get_users_with_query_params(client, user_data):
     client.post("/users", json=user_data)
     response = client.get("/users?city=Wonderland")
-    # Should ignore query params and return all users
     assert response.status_code == 200
-    assert isinstance(response.get_json(), list)
+    users = response.get_json()
+    assert users and all(user["city"] == "Wonderland" for user in users)
+    assert client.get("/users?city=Atlantis").get_json() == []
+
+
+def test_get_users_fields_projection(client):
+    response = client.get("/users?fields=email,id&limit=2")
+    assert response.status_code == 200
+    assert [set(user) for user in response.get_json()] == [{"id", "email"}] * 2
+    assert client.get("/users?fields=").status_code == 400
+
+
+def test_get_users_keyset_pagination(client):
+    first_page = client.get("/users?limit=2")
+    assert first_page.status_code == 200
+    first_ids = [u["id"] for u in first_page.get_json()]
+    assert len(first_ids) == 2
+    next_after_id = first_page.headers["X-Next-After-Id"]
+    second_page = client.get(f"/users?after_id={next_after_id}&limit=2")
+    second_ids = [u["id"] for u in second_page.get_json()]
+    assert second_ids and min(second_ids) > max(first_ids)
+    assert "X-Next-After-Id" not in second_page.headers
+
+
+def test_get_users_ndjson_stream(client, user_data):
+    client.post("/users", json=user_data)
+    response = client.get("/users?format=ndjson")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    streamed = [json.loads(line)
+                for line in response.get_data(as_text=True).splitlines()]
+    assert streamed == client.get("/users").get_json()
+
+
+def test_create_users_bulk(client):
+    payload = [
+        {"name": f"User {i}", "email": f"bulk_{i}_{uuid.uuid4().hex}@example.com",
+         "city": "Warsaw"}
+        for i in range(10)
+    ]
+    response = client.post("/users/bulk", json=payload)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert [u["email"] for u in data] == [u["email"] for u in payload]
+    assert len({u["id"] for u in data}) == 10
+
+
+def test_create_users_bulk_reports_row_errors(client, user_data):
+    payload = [user_data, {"name": "No email"}, dict(user_data, email="bad")]
+    response = client.post("/users/bulk", json=payload)
+    assert response.status_code == 400
+    errors = response.get_json()["error"]
+    assert set(errors) == {"1", "2"}
+    assert "email" in errors["1"] and "email" in errors["2"]
+
+
+def test_create_users_bulk_duplicate_email(client, user_data):
+    response = client.post("/users/bulk", json=[user_data, user_data])
+    assert response.status_code == 409
+    assert client.get("/users?limit=1000").get_json()[-1]["email"] != user_data["email"]
@@ -0,0 +1,96 @@
+"""
+Micro-benchmarks for the create/update write paths.
+
+The legacy path ran ``schema.validate`` before ``schema.load`` and issued
+``session.refresh`` after the flush. These tests pin the statement count of
+the current single-pass path: one INSERT and no SELECT after the flush.
+"""
+import uuid
+
+import pytest
+
+from flask_app.app import create_app, db
+from flask_app.config import TestingConfig
+from flask_app.routes.users import single_user_schema
+from flask_app.tests.utils import capture_statements
+from database.db_seed import seed_data, create_tables
+
+@pytest.fixture(scope='module')
+def test_app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        create_tables(bind=db.session.get_bind())
+        seed_data(session=db.session)
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(test_app):
+    return test_app.test_client()
+
+
+def new_user_payload():
+    return {"name": "Bench", "email": f"bench_{uuid.uuid4().hex}@example.com",
+            "city": "Warsaw"}
+
+
+def legacy_create_user(data):
+    errors = single_user_schema.validate(data)
+    assert not errors
+    user = single_user_schema.load(data)
+    db.session.add(user)
+    db.session.flush()
+    db.session.refresh(user)
+    return single_user_schema.dump(user)
+
+
+def single_pass_create_user(data):
+    user = single_user_schema.load(data)
+    db.session.add(user)
+    db.session.flush()
+    return single_user_schema.dump(user)
+
+
+def test_create_user_issues_single_insert(test_app, client):
+    with test_app.app_context():
+        engine = db.engine
+    with capture_statements(engine) as statements:
+        response = client.post("/users", json=new_user_payload())
+    assert response.status_code == 201
+    assert response.get_json()["id"] is not None
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO users")
+
+
+def test_create_order_populates_defaults_without_select(test_app, client):
+    with test_app.app_context():
+        engine = db.engine
+    with capture_statements(engine) as statements:
+        response = client.post(
+            "/orders/", json={"customer_id": 1, "product": "Widget"})
+    assert response.status_code == 201
+    assert response.get_json()["quantity"] == 1
+    assert [s.split()[0] for s in statements] == ["INSERT"]
+
+
+def test_update_user_issues_select_and_update_only(test_app, client):
+    user_id = client.post("/users", json=new_user_payload()).get_json()["id"]
+    with test_app.app_context():
+        engine = db.engine
+    with capture_statements(engine) as statements:
+        response = client.put(f"/users/{user_id}", json={"city": "Cracow"})
+    assert response.status_code == 200
+    assert [s.split()[0] for s in statements] == ["SELECT", "UPDATE"]
+
+
+def test_single_pass_create_skips_the_refresh_select(test_app):
+    with test_app.app_context():
+        with capture_statements(db.engine) as legacy_statements:
+            legacy_create_user(new_user_payload())
+        with capture_statements(db.engine) as single_pass_statements:
+            single_pass_create_user(new_user_payload())
+        db.session.rollback()
+    assert [s.split()[0] for s in legacy_statements] == ["INSERT", "SELECT"]
+    assert [s.split()[0] for s in single_pass_statements] == ["INSERT"]
@@ -0,0 +1,23 @@
+"""
+Helpers shared by the API test modules.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+@contextmanager
+def capture_statements(engine):
+    """
+    Collect the SQL statements sent to the database inside the block.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,15 @@
+"""
+Gunicorn settings of the Flask app (``gunicorn main:app`` reads this file
+from the working directory).
+"""
+import os
+
+from flask_app.request_metrics import clear_multiprocess_dir
+
+
+def on_starting(server):
+    # snapshots of the previous run's workers must not be merged into the
+    # scrapes of this one
+    directory = os.getenv('METRICS_MULTIPROC_DIR')
+    if directory:
+        clear_multiprocess_dir(directory)
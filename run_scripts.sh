@@ -1,6 +1,6 @@
 #!/usr/bin/env bash
 #
-# run_all.sh — Orchestrator: build/start containers, health checks, simulate business
+# run_all.sh — Orchestrator: build/start containers, health checks, load test
 #
 set -euo pipefail
 
@@ -15,8 +15,9 @@ echo " Szybki test PostgreSQL..."
 bash scripts/postgres_check.sh
 
 echo
-echo " Uruchamiam symulację biznesową (Flask API)..."
-./scripts/simulate_business.sh
+echo " Uruchamiam test obciążeniowy (Flask API)..."
+python3 scripts/load_test.py --url "$API_URL" --rps 50 --duration 10 \
+  --report load_test_report.json
 
 echo
 echo "Wszystko gotowe! Zweryfikuj endpointy:"
@@ -0,0 +1,434 @@
+"""
+HTTP load generator for the Flask API.
+
+Replays a weighted mix of create/read/update/delete operations against the
+``/users`` and ``/orders`` blueprints at a fixed target rate (open loop: a
+request is started every ``1 / rps`` seconds whether or not earlier ones
+finished) over one pooled ``httpx.AsyncClient``. Latency is measured from
+the moment a request was *scheduled*, so server stalls show up in the tail
+instead of silently lowering the offered load.
+
+Per endpoint a log-bucketed histogram is kept and summarised as p50/p95/p99
+in a JSON report that can be compared between builds::
+
+    python scripts/load_test.py --rps 200 --duration 60 --report new.json
+    python scripts/load_test.py --compare old.json new.json
+
+Requires ``httpx``.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+DEFAULT_MIX = {
+    'users.create': 5,
+    'users.read': 20,
+    'users.update': 5,
+    'users.delete': 2,
+    'users.list': 3,
+    'orders.create': 15,
+    'orders.read': 35,
+    'orders.update': 8,
+    'orders.delete': 2,
+    'orders.list': 5,
+}
+# the API's default BULK_MAX_ROWS; larger bulk requests are rejected with 413
+BULK_BATCH_SIZE = 10000
+PRODUCTS = ('Smartwatch', 'Wireless Earbuds', 'VR Headset', 'Power Bank')
+CITIES = ('Warsaw', 'Cracow', 'Wroclaw', 'Gdansk')
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with logarithmic buckets.
+
+    Bucket ``i`` holds latencies up to ``min_ms * growth ** i``; with the
+    default 5% growth every reported percentile is within 5% of the exact
+    value, however many samples are recorded.
+    """
+
+    def __init__(self, min_ms=0.05, growth=1.05):
+        self.min_ms = min_ms
+        self.growth = growth
+        self.buckets = Counter()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms):
+        index = 0
+        if latency_ms > self.min_ms:
+            index = math.ceil(
+                math.log(latency_ms / self.min_ms, self.growth) - 1e-9)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def upper_bound(self, index):
+        return self.min_ms * self.growth ** index
+
+    def percentile(self, q):
+        """
+        Upper bound of the bucket holding the ``q``-th percentile.
+        """
+        if not self.count:
+            return None
+        rank = math.ceil(q / 100 * self.count)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.upper_bound(index), self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'p50_ms': _round(self.percentile(50)),
+            'p95_ms': _round(self.percentile(95)),
+            'p99_ms': _round(self.percentile(99)),
+            'max_ms': round(self.max_ms, 3),
+            'histogram': [
+                [round(self.upper_bound(index), 3), self.buckets[index]]
+                for index in sorted(self.buckets)
+            ],
+        }
+
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+
+class EndpointStats:
+    """
+    Latency histogram and status code counts of one endpoint.
+    """
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = 0
+
+    def record(self, latency_ms, status):
+        self.histogram.record(latency_ms)
+        self.statuses[str(status)] += 1
+        if status == 'error' or int(status) >= 400:
+            self.errors += 1
+
+    def summary(self):
+        return {
+            **self.histogram.summary(),
+            'errors': self.errors,
+            'statuses': dict(sorted(self.statuses.items())),
+        }
+
+
+class LoadTest:
+    """
+    One load test run: the id pools, the operation mix and the statistics.
+
+    Operations that need an existing row pick a random id from the pool of
+    rows known to exist; ``users.delete`` only removes users created during
+    the run, which never own orders, so deletes do not hit the foreign key.
+    """
+
+    def __init__(self, client, mix, rng):
+        self.client = client
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.rng = rng
+        self.user_ids = []
+        self.fresh_user_ids = []
+        self.order_ids = []
+        self.stats = defaultdict(EndpointStats)
+        # emails must not repeat across runs against the same database
+        self._email_prefix = f'load{time.time_ns():x}'
+        self._email_counter = itertools.count()
+
+    async def bootstrap(self, users, orders):
+        """
+        Create the initial rows through the bulk endpoints.
+
+        Rows are posted in batches of at most ``BULK_BATCH_SIZE``. Orders
+        need a customer, so none are created when there are no users.
+        """
+        self.user_ids = await self._post_bulk(
+            '/users/bulk', self._user_payload, users)
+        if self.user_ids:
+            self.order_ids = await self._post_bulk(
+                '/orders/bulk', self._order_payload, orders)
+
+    async def _post_bulk(self, url, payload, count):
+        ids = []
+        for start in range(0, count, BULK_BATCH_SIZE):
+            size = min(BULK_BATCH_SIZE, count - start)
+            response = await self.client.post(url, json=[
+                payload() for _ in range(size)])
+            response.raise_for_status()
+            ids.extend(row['id'] for row in response.json())
+        return ids
+
+    def _user_payload(self):
+        number = next(self._email_counter)
+        return {'name': f'Load User {number}',
+                'email': f'{self._email_prefix}n{number}@example.com',
+                'city': self.rng.choice(CITIES)}
+
+    def _order_payload(self):
+        quantity = self.rng.randint(1, 10)
+        return {'customer_id': self.rng.choice(self.user_ids),
+                'product': self.rng.choice(PRODUCTS), 'quantity': quantity,
+                'total_price': round(quantity * self.rng.uniform(50, 500), 2)}
+
+    def _pick(self, ids):
+        return self.rng.choice(ids) if ids else None
+
+    def _take(self, ids):
+        if not ids:
+            return None
+        return ids.pop(self.rng.randrange(len(ids)))
+
+    def build_request(self, operation):
+        """
+        Map an operation name to ``(label, method, url, json, on_success)``.
+
+        Returns ``None`` when the operation has no row to act on yet.
+        """
+        resource, action = operation.split('.')
+        ids = self.user_ids if resource == 'users' else self.order_ids
+        base = '/users' if resource == 'users' else '/orders'
+        # the orders blueprint registers its collection routes on "/"
+        collection = base if resource == 'users' else f'{base}/'
+        payload = self._user_payload if resource == 'users' else self._order_payload
+        if action == 'create':
+            if resource == 'orders' and not self.user_ids:
+                return None
+            created = self.fresh_user_ids if resource == 'users' else self.order_ids
+            return (f'POST {collection}', 'POST', collection, payload(),
+                    lambda body: created.append(body['id']))
+        if action == 'list':
+            return (f'GET {collection}', 'GET', f'{collection}?limit=100',
+                    None, None)
+        if action == 'delete':
+            pool = self.fresh_user_ids if resource == 'users' else self.order_ids
+            row_id = self._take(pool)
+        else:
+            row_id = self._pick(ids)
+        if row_id is None:
+            return None
+        label = f'{base}/<id>'
+        url = f'{base}/{row_id}'
+        if action == 'read':
+            return (f'GET {label}', 'GET', url, None, None)
+        if action == 'update':
+            body = ({'city': self.rng.choice(CITIES)} if resource == 'users'
+                    else {'quantity': self.rng.randint(1, 10)})
+            return (f'PUT {label}', 'PUT', url, body, None)
+        return (f'DELETE {label}', 'DELETE', url, None, None)
+
+    async def execute(self, operation, scheduled_at):
+        request = self.build_request(operation)
+        if request is None:
+            return
+        label, method, url, body, on_success = request
+        try:
+            response = await self.client.request(method, url, json=body)
+            status = response.status_code
+            if on_success is not None and status < 300:
+                on_success(response.json())
+        except httpx.HTTPError:
+            status = 'error'
+        latency_ms = (time.perf_counter() - scheduled_at) * 1000
+        self.stats[label].record(latency_ms, status)
+
+    async def run(self, rps, duration, concurrency):
+        """
+        Start requests at ``rps`` for ``duration`` seconds.
+
+        At most ``concurrency`` requests are in flight; when the limit is
+        reached new requests wait for a slot, and that wait counts towards
+        their latency.
+        """
+        slots = asyncio.Semaphore(concurrency)
+        tasks = set()
+        interval = 1.0 / rps
+        start = time.perf_counter()
+        total = int(rps * duration)
+
+        async def limited(operation, scheduled_at):
+            async with slots:
+                await self.execute(operation, scheduled_at)
+
+        for index in range(total):
+            scheduled_at = start + index * interval
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            task = asyncio.create_task(limited(operation, scheduled_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+
+def parse_mix(text):
+    """
+    Parse ``"users.read=20,orders.create=5"`` into a weight mapping.
+    """
+    mix = {}
+    for item in text.split(','):
+        operation, _, weight = item.partition('=')
+        operation = operation.strip()
+        if operation not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(
+                f"Unknown operation: {operation}. "
+                f"Please use one of {sorted(DEFAULT_MIX)}.")
+        try:
+            mix[operation] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"Invalid weight of {operation}: {weight}.") from None
+        if mix[operation] < 0:
+            raise argparse.ArgumentTypeError(
+                f"Invalid weight of {operation}: {weight}. "
+                f"Please use a non-negative number.")
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError(
+            "At least one operation needs a positive weight.")
+    return mix
+
+
+def compare_reports(old, new):
+    """
+    Per-endpoint percentile changes between two reports, in percent.
+    """
+    changes = {}
+    for label, current in new['endpoints'].items():
+        previous = old['endpoints'].get(label)
+        if previous is None:
+            continue
+        changes[label] = {
+            key: round((current[key] - previous[key]) / previous[key] * 100, 1)
+            for key in ('p50_ms', 'p95_ms', 'p99_ms')
+            if current[key] is not None and previous[key]
+        }
+    return changes
+
+
+async def run_load_test(args):
+    limits = httpx.Limits(max_connections=args.concurrency,
+                          max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits,
+                                 timeout=args.timeout) as client:
+        load_test = LoadTest(client, args.mix, random.Random(args.seed))
+        await load_test.bootstrap(args.bootstrap_users, args.bootstrap_orders)
+        elapsed = await load_test.run(args.rps, args.duration, args.concurrency)
+
+    endpoints = {label: stats.summary()
+                 for label, stats in sorted(load_test.stats.items())}
+    requests = sum(endpoint['count'] for endpoint in endpoints.values())
+    return {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'config': {
+            'url': args.url, 'rps': args.rps, 'duration': args.duration,
+            'concurrency': args.concurrency, 'seed': args.seed, 'mix': args.mix,
+        },
+        'elapsed_s': round(elapsed, 3),
+        'requests': requests,
+        'achieved_rps': round(requests / elapsed, 1),
+        'errors': sum(endpoint['errors'] for endpoint in endpoints.values()),
+        'endpoints': endpoints,
+    }
+
+
+def print_summary(report):
+    print(f"{report['requests']} requests in {report['elapsed_s']}s "
+          f"({report['achieved_rps']} req/s, {report['errors']} errors)")
+    print(f"{'endpoint':<24}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}"
+          f"{'errors':>8}")
+    for label, endpoint in report['endpoints'].items():
+        print(f"{label:<24}{endpoint['count']:>8}{endpoint['p50_ms']:>10}"
+              f"{endpoint['p95_ms']:>10}{endpoint['p99_ms']:>10}"
+              f"{endpoint['errors']:>8}")
+
+
+def _positive(text):
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(
+            f"{text} is not valid, please use a positive number.")
+    return value
+
+
+def _at_least(minimum):
+    """
+    Build an argparse type accepting integers from ``minimum`` up.
+    """
+    def convert(text):
+        value = int(text)
+        if value < minimum:
+            raise argparse.ArgumentTypeError(
+                f"{text} is not valid, please use at least {minimum}.")
+        return value
+    return convert
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://localhost:5000',
+                        help="base URL of the API")
+    parser.add_argument('--rps', type=_positive, default=50,
+                        help="target requests per second")
+    parser.add_argument('--duration', type=_positive, default=30,
+                        help="test duration in seconds")
+    parser.add_argument('--concurrency', type=_at_least(1), default=64,
+                        help="maximum in-flight requests / pooled connections")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="operation weights, e.g. "
+                             "'orders.read=80,orders.create=20'")
+    parser.add_argument('--bootstrap-users', type=_at_least(0), default=100,
+                        help="users created before the run")
+    parser.add_argument('--bootstrap-orders', type=_at_least(0), default=500,
+                        help="orders created before the run "
+                             "(none when there are no users)")
+    parser.add_argument('--timeout', type=_positive, default=10,
+                        help="per-request timeout in seconds")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the operation sequence")
+    parser.add_argument('--report', type=Path,
+                        help="write the JSON report to this file")
+    parser.add_argument('--compare', type=Path, nargs=2,
+                        metavar=('OLD', 'NEW'),
+                        help="print percentile changes between two reports "
+                             "and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        old, new = (json.loads(path.read_text()) for path in args.compare)
+        json.dump(compare_reports(old, new), sys.stdout, indent=2)
+        print()
+        return
+    report = asyncio.run(run_load_test(args))
+    print_summary(report)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark the sync and async serving modes at equal worker counts.
+
+Starts the Flask app under gunicorn (sync workers, one thread each) and the
+ASGI app under uvicorn with the same number of worker processes, one after
+the other, against the database selected by ``FLASK_ENV``. Each server gets
+the same open-loop load from ``load_test.py``, and the script prints both
+summaries and the percentile change from sync to async::
+
+    python scripts/serving_benchmark.py --workers 4 --out bench/ -- \\
+        --rps 400 --duration 60 --concurrency 512
+
+Arguments after ``--`` go to ``load_test.py`` unchanged; ``--url`` and
+``--report`` are set by this script. Use an offered rate above what the sync
+workers can serve to see the difference: a sync worker holds one request at
+a time, while an async worker interleaves requests waiting on the database.
+
+Requires ``gunicorn``, ``uvicorn`` and ``httpx``.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from load_test import (
+    compare_reports,
+    parse_args as parse_load_test_args,
+    print_summary,
+    run_load_test,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+SERVERS = {
+    'sync': ['gunicorn', '--workers', '{workers}', '--threads', '1',
+             '--bind', '{host}:{port}', 'main:app'],
+    'async': ['uvicorn', 'asgi:app', '--workers', '{workers}',
+              '--host', '{host}', '--port', '{port}', '--no-access-log'],
+}
+
+
+def wait_until_ready(url, process, timeout):
+    """
+    Poll ``url`` until the server answers or ``timeout`` seconds pass.
+
+    Raises
+    ------
+    RuntimeError
+        If the server exits or does not answer in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"Server exited with code {process.returncode} before "
+                f"answering {url}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not answer {url} within {timeout}s")
+
+
+def run_mode(mode, args, load_test_argv):
+    """
+    Start the server of ``mode``, load it and stop it.
+
+    Returns
+    -------
+    dict
+        The load test report.
+    """
+    command = [part.format(workers=args.workers, host=args.host, port=args.port)
+               for part in SERVERS[mode]]
+    url = f"http://{args.host}:{args.port}"
+    process = subprocess.Popen(command, cwd=REPO_ROOT)
+    try:
+        wait_until_ready(f"{url}/", process, args.startup_timeout)
+        load_args = parse_load_test_args(
+            load_test_argv + ['--url', url])
+        report = asyncio.run(run_load_test(load_args))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    report['server'] = {'mode': mode, 'workers': args.workers,
+                        'command': ' '.join(command)}
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n\n')[0],
+        epilog="Arguments after '--' are passed to load_test.py.")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="worker processes of both servers")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="address the servers bind to")
+    parser.add_argument('--port', type=int, default=8000,
+                        help="port the servers bind to")
+    parser.add_argument('--modes', nargs='+', choices=tuple(SERVERS),
+                        default=list(SERVERS),
+                        help="serving modes to run, in order")
+    parser.add_argument('--startup-timeout', type=float, default=30,
+                        help="seconds to wait for a server to answer")
+    parser.add_argument('--out', type=Path,
+                        help="directory for the <mode>.json reports")
+    if argv is None:
+        argv = sys.argv[1:]
+    if '--' in argv:
+        split = argv.index('--')
+        argv, load_test_argv = argv[:split], argv[split + 1:]
+    else:
+        load_test_argv = []
+    return parser.parse_args(argv), load_test_argv
+
+
+def main(argv=None):
+    args, load_test_argv = parse_args(argv)
+    reports = {}
+    for mode in args.modes:
+        print(f"== {mode} ==")
+        reports[mode] = run_mode(mode, args, load_test_argv)
+        print_summary(reports[mode])
+        if args.out:
+            args.out.mkdir(parents=True, exist_ok=True)
+            (args.out / f"{mode}.json").write_text(
+                json.dumps(reports[mode], indent=2))
+    if {'sync', 'async'} <= reports.keys():
+        print("== async vs sync ==")
+        json.dump(compare_reports(reports['sync'], reports['async']),
+                  sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import load_test  # noqa: E402
+from load_test import (  # noqa: E402
+    DEFAULT_MIX,
+    LatencyHistogram,
+    LoadTest,
+    compare_reports,
+    parse_args,
+    parse_mix,
+)
+
+
+def test_percentile_of_empty_histogram_is_none():
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_percentile_is_within_one_bucket_of_the_exact_value():
+    histogram = LatencyHistogram()
+    for latency in range(1, 101):
+        histogram.record(float(latency))
+
+    for q in (50, 95, 99):
+        assert q <= histogram.percentile(q) <= q * histogram.growth
+    assert histogram.percentile(100) == 100.0
+
+
+def test_percentile_never_exceeds_the_maximum():
+    histogram = LatencyHistogram()
+    histogram.record(0.01)
+    histogram.record(7.0)
+
+    assert histogram.percentile(50) == histogram.min_ms
+    assert histogram.percentile(99) == 7.0
+
+
+def test_compare_reports_in_percent():
+    old = {'endpoints': {
+        'GET /users/<id>': {'p50_ms': 10.0, 'p95_ms': 20.0, 'p99_ms': 40.0},
+        'GET /orders/': {'p50_ms': 5.0, 'p95_ms': 5.0, 'p99_ms': 5.0},
+    }}
+    new = {'endpoints': {
+        'GET /users/<id>': {'p50_ms': 5.0, 'p95_ms': 20.0, 'p99_ms': 50.0},
+        'POST /users': {'p50_ms': 1.0, 'p95_ms': 1.0, 'p99_ms': 1.0},
+    }}
+
+    assert compare_reports(old, new) == {
+        'GET /users/<id>': {'p50_ms': -50.0, 'p95_ms': 0.0, 'p99_ms': 25.0},
+    }
+
+
+def test_compare_reports_skips_missing_percentiles():
+    old = {'endpoints': {'GET /orders/': {
+        'p50_ms': 0.0, 'p95_ms': None, 'p99_ms': 4.0}}}
+    new = {'endpoints': {'GET /orders/': {
+        'p50_ms': 1.0, 'p95_ms': 2.0, 'p99_ms': None}}}
+
+    assert compare_reports(old, new) == {'GET /orders/': {}}
+
+
+def test_parse_mix():
+    assert parse_mix('users.read=20, orders.create=2.5,orders.list') == {
+        'users.read': 20.0, 'orders.create': 2.5, 'orders.list': 1.0}
+
+
+@pytest.mark.parametrize('text', [
+    'users.fetch=1',
+    'users.read=many',
+    'users.read=-1',
+    'users.read=0,orders.read=0',
+])
+def test_parse_mix_rejects_invalid_mixes(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix(text)
+
+
+def test_parse_args_defaults():
+    args = parse_args([])
+
+    assert args.mix == DEFAULT_MIX
+    assert args.bootstrap_users == 100
+
+
+@pytest.mark.parametrize('argv', [
+    ['--rps', '0'],
+    ['--duration', '-1'],
+    ['--concurrency', '0'],
+    ['--bootstrap-users', '-1'],
+    ['--bootstrap-orders', '-5'],
+    ['--timeout', '0'],
+])
+def test_parse_args_rejects_out_of_range_values(argv):
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+def bulk_client(posts):
+    ids = iter(range(1, 1000))
+
+    def handler(request):
+        rows = json.loads(request.content)
+        posts.append((request.url.path, len(rows)))
+        return httpx.Response(201, json=[{'id': next(ids)} for _ in rows])
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler),
+                             base_url='http://test')
+
+
+def bootstrap(users, orders):
+    posts = []
+
+    async def run():
+        async with bulk_client(posts) as client:
+            test = LoadTest(client, DEFAULT_MIX, random.Random(0))
+            await test.bootstrap(users, orders)
+            return test
+
+    return asyncio.run(run()), posts
+
+
+def test_bootstrap_posts_in_batches(monkeypatch):
+    monkeypatch.setattr(load_test, 'BULK_BATCH_SIZE', 3)
+
+    test, posts = bootstrap(users=7, orders=3)
+
+    assert posts == [('/users/bulk', 3), ('/users/bulk', 3),
+                     ('/users/bulk', 1), ('/orders/bulk', 3)]
+    assert test.user_ids == list(range(1, 8))
+    assert test.order_ids == [8, 9, 10]
+
+
+def test_bootstrap_without_users_creates_nothing():
+    test, posts = bootstrap(users=0, orders=5)
+
+    assert posts == []
+    assert test.order_ids == []
+    assert test.build_request('orders.create') is None
+    assert test.build_request('users.create')[0] == 'POST /users'
@@ -1,39 +1,78 @@
+"""
+Spark Structured Streaming job over the Debezium change topics.
+
+Starts one query per output, all on the sink chosen with ``SPARK_SINK``
+(see ``spark_app.sinks``):
+
+* ``users_current`` and ``orders_current`` – the current state of the
+  ``users`` and ``orders`` tables, with updates and deletes applied (see
+  ``spark_app.materialize``);
+* ``customer_revenue`` and ``product_revenue`` – running daily revenue (as
+  created) of ``<DB_TOPIC_PREFIX>.public.orders`` per customer and per
+  product (see ``spark_app.revenue``);
+* ``enriched_orders`` – created orders joined with the current state of
+  their customer (see ``spark_app.enrichment``).
+
+The micro-batch size is bounded by ``SPARK_MAX_OFFSETS_PER_TRIGGER`` and the
+batch cadence by ``SPARK_TRIGGER_INTERVAL``; see ``spark_app.config``. The
+stateful queries keep their state in RocksDB unless ``SPARK_STATE_STORE``
+says otherwise.
+
+Usage (from the repository root)::
+
+    PYTHONPATH=. spark-submit --packages <kafka,postgres> spark_app/app.py
+"""
+from logging import basicConfig, INFO
+
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import from_json, col
-from pyspark.sql.types import StructType, StringType, IntegerType, TimestampType
-
-# 1) Zdefiniuj schemat JSON (taki, jaki Debezium wypuszcza przy zmianach)
-schema = StructType() \
-    .add("before", StructType([...])) \
-    .add("after", StructType([
-        ("id", IntegerType()),
-        ("name", StringType()),
-        ("email", StringType()),
-        ("created_at", TimestampType()),
-        ("updated_at", TimestampType())
-    ])) \
-    .add("op", StringType()) \
-    .add("ts_ms", TimestampType())
-
-spark = SparkSession.builder \
-    .appName("DebeziumJSON") \
-    .getOrCreate()
-
-df = spark \
-    .readStream \
-    .format("kafka") \
-    .option("kafka.bootstrap.servers", "kafka:9092") \
-    .option("subscribe", "dbserver1.public.users") \
-    .option("startingOffsets", "earliest") \
-    .load()
-
-parsed = df.select(
-    from_json(col("value").cast("string"), schema).alias("data")
-).select("data.after.*")
-
-query = parsed.writeStream \
-    .format("console") \
-    .option("truncate", False) \
-    .start()
-
-query.awaitTermination()
+
+from database.models.orders import Order
+from database.models.users import User
+from spark_app.config import StreamingConfig, interval_ms
+from spark_app.enrichment import enriched_orders
+from spark_app.materialize import change_rows, start_materialization
+from spark_app.revenue import REVENUE_KEYS, start_revenue_query
+from spark_app.sinks import start_query
+from spark_app.streams import (
+    changes_stream,
+    created_orders_stream,
+    user_changes_stream,
+)
+
+# tables materialized as <table>_current
+MATERIALIZED_TABLES = (User.__table__, Order.__table__)
+
+
+def main():
+    basicConfig(level=INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    config = StreamingConfig.from_env()
+    spark = SparkSession.builder \
+        .appName("DebeziumJSON") \
+        .config("spark.sql.shuffle.partitions", config.shuffle_partitions) \
+        .config("spark.sql.streaming.stateStore.providerClass",
+                config.state_store_provider) \
+        .config("spark.sql.streaming.stateStore.rocksdb."
+                "changelogCheckpointing.enabled", True) \
+        .config("spark.sql.session.timeZone", "UTC") \
+        .getOrCreate()
+
+    for table in MATERIALIZED_TABLES:
+        start_materialization(
+            change_rows(changes_stream(spark, config, table), table),
+            table, config)
+
+    orders = created_orders_stream(spark, config)
+    for name, key in REVENUE_KEYS.items():
+        start_revenue_query(orders, name, key, config)
+
+    start_query(enriched_orders(user_changes_stream(spark, config), orders,
+                                config.join_watermark,
+                                interval_ms(config.join_watermark)),
+                "enriched_orders", config,
+                keys=["order_id"], order_columns=["event_time"],
+                partition_by=["order_date"])
+    spark.streams.awaitAnyTermination()
+
+
+if __name__ == "__main__":
+    main()
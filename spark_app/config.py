@@ -0,0 +1,202 @@
+"""
+Settings of the Spark streaming job, read from environment variables.
+
+Kept free of ``pyspark`` imports so the settings can be validated (and
+tested) without a Spark installation.
+"""
+import os
+from dataclasses import dataclass
+from typing import Final, Optional
+
+SINKS: Final[tuple] = ('console', 'parquet', 'jdbc')
+STARTING_OFFSETS: Final[tuple] = ('earliest', 'latest')
+# SPARK_STATE_STORE -> spark.sql.streaming.stateStore.providerClass
+STATE_STORE_PROVIDERS: Final[dict] = {
+    'rocksdb': 'org.apache.spark.sql.execution.streaming.state.'
+               'RocksDBStateStoreProvider',
+    'hdfs': 'org.apache.spark.sql.execution.streaming.state.'
+            'HDFSBackedStateStoreProvider',
+}
+INTERVAL_UNITS_MS: Final[dict] = {
+    'millisecond': 1, 'second': 1000, 'minute': 60_000,
+    'hour': 3_600_000, 'day': 86_400_000,
+}
+
+
+def interval_ms(interval):
+    """
+    Milliseconds of an interval written as Spark accepts it, e.g. '10 minutes'.
+
+    Raises
+    ------
+    ValueError
+        If the text is not ``<number> <unit>`` with a unit from
+        milliseconds to days.
+    """
+    try:
+        amount, unit = interval.split()
+        return int(float(amount) * INTERVAL_UNITS_MS[unit.lower().rstrip('s')])
+    except (KeyError, ValueError):
+        raise ValueError(
+            f"Invalid interval: {interval!r}. Use '<number> <unit>', e.g. "
+            f"'10 minutes', with one of the units {tuple(INTERVAL_UNITS_MS)}."
+        ) from None
+
+
+@dataclass(frozen=True)
+class StreamingConfig:
+    """
+    Sources, sink and micro-batch sizing of the streaming job.
+
+    Attributes
+    ----------
+    bootstrap_servers : str
+        Kafka brokers (``KAFKA_BOOTSTRAP_SERVERS``).
+    topic_prefix : str
+        Debezium topic prefix (``DB_TOPIC_PREFIX``); topics are
+        ``<prefix>.public.<table>``.
+    starting_offsets : str
+        Where a query without a checkpoint starts reading:
+        'earliest' or 'latest' (``SPARK_STARTING_OFFSETS``).
+    sink : str
+        'console', 'parquet' or 'jdbc' (``SPARK_SINK``).
+    output_path : str
+        Root directory of the Parquet sink (``SPARK_OUTPUT_PATH``).
+    checkpoint_path : str
+        Root directory of the query checkpoints (``SPARK_CHECKPOINT_PATH``);
+        each query checkpoints to ``<checkpoint_path>/<query name>``.
+    trigger_interval : str
+        Processing-time trigger of every query, e.g. '10 seconds'
+        (``SPARK_TRIGGER_INTERVAL``).
+    max_offsets_per_trigger : int or None
+        Upper bound on Kafka records read per micro-batch
+        (``SPARK_MAX_OFFSETS_PER_TRIGGER``); unset reads everything available.
+    jdbc_url : str
+        Reporting database of the JDBC sink, built from ``DB_HOST``,
+        ``DB_PORT`` and ``DB_NAME``.
+    jdbc_user, jdbc_password : str
+        Credentials of the JDBC sink (``DB_USER``, ``DB_PASSWORD``).
+    reporting_schema : str
+        Postgres schema the JDBC sink writes to (``SPARK_REPORTING_SCHEMA``).
+    order_watermark : str
+        How late an order may arrive, in Kafka time, and still count in the
+        revenue aggregates (``SPARK_ORDER_WATERMARK``).
+    revenue_window : str
+        Length of the arrival windows of the revenue aggregates
+        (``SPARK_REVENUE_WINDOW``); a window reaches the totals once the
+        watermark closes it. See ``spark_app.revenue``.
+    shuffle_partitions : int
+        Partitions of the aggregation state (``SPARK_SHUFFLE_PARTITIONS``).
+        Spark's default of 200 means 200 state store tasks per micro-batch;
+        a checkpointed query keeps the value it was started with.
+    join_watermark : str
+        How long, in Kafka time, an order waits for its customer in the
+        enrichment before it is emitted without one (``SPARK_JOIN_WATERMARK``).
+    state_store : str
+        State store of the stateful queries, 'rocksdb' or 'hdfs'
+        (``SPARK_STATE_STORE``). RocksDB keeps the state off the JVM heap,
+        so large states do not grow garbage collection pauses. A checkpoint
+        can only be restarted with the provider that wrote it.
+    compact_every : int
+        Batches between compactions of the current-state tables
+        (``SPARK_COMPACT_EVERY``): a new Parquet snapshot, or a ``VACUUM``
+        of the Postgres table.
+    """
+    bootstrap_servers: str = 'kafka:9092'
+    topic_prefix: str = 'dbserver1'
+    starting_offsets: str = 'earliest'
+    sink: str = 'console'
+    output_path: str = '/opt/spark-app/output'
+    checkpoint_path: str = '/opt/spark-app/checkpoints'
+    trigger_interval: str = '10 seconds'
+    max_offsets_per_trigger: Optional[int] = None
+    jdbc_url: str = 'jdbc:postgresql://postgres:5432/mydb'
+    jdbc_user: str = 'postgres'
+    jdbc_password: str = 'postgres'
+    reporting_schema: str = 'reporting'
+    order_watermark: str = '10 minutes'
+    revenue_window: str = '1 minute'
+    shuffle_partitions: int = 8
+    join_watermark: str = '10 minutes'
+    state_store: str = 'rocksdb'
+    compact_every: int = 10
+
+    def __post_init__(self):
+        if self.sink not in SINKS:
+            raise ValueError(
+                f"Invalid SPARK_SINK value: {self.sink}. "
+                f"Please use one of {SINKS}."
+            )
+        if self.starting_offsets not in STARTING_OFFSETS:
+            raise ValueError(
+                f"Invalid SPARK_STARTING_OFFSETS value: {self.starting_offsets}. "
+                f"Please use one of {STARTING_OFFSETS}."
+            )
+        if self.max_offsets_per_trigger is not None \
+                and self.max_offsets_per_trigger < 1:
+            raise ValueError("SPARK_MAX_OFFSETS_PER_TRIGGER must be positive.")
+        if self.shuffle_partitions < 1:
+            raise ValueError("SPARK_SHUFFLE_PARTITIONS must be positive.")
+        if self.state_store not in STATE_STORE_PROVIDERS:
+            raise ValueError(
+                f"Invalid SPARK_STATE_STORE value: {self.state_store}. "
+                f"Please use one of {tuple(STATE_STORE_PROVIDERS)}."
+            )
+        if self.compact_every < 1:
+            raise ValueError("SPARK_COMPACT_EVERY must be positive.")
+        interval_ms(self.order_watermark)
+        interval_ms(self.revenue_window)
+        interval_ms(self.join_watermark)
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """
+        Read the settings from ``environ`` (``os.environ`` by default).
+
+        Raises
+        ------
+        ValueError
+            If a setting has an invalid value.
+        """
+        env = os.environ if environ is None else environ
+        max_offsets = env.get('SPARK_MAX_OFFSETS_PER_TRIGGER')
+        db_host = env.get('DB_HOST', 'postgres')
+        db_port = env.get('DB_PORT', '5432')
+        db_name = env.get('DB_NAME', 'mydb')
+        return cls(
+            bootstrap_servers=env.get('KAFKA_BOOTSTRAP_SERVERS', 'kafka:9092'),
+            topic_prefix=env.get('DB_TOPIC_PREFIX', 'dbserver1'),
+            starting_offsets=env.get('SPARK_STARTING_OFFSETS', 'earliest'),
+            sink=env.get('SPARK_SINK', 'console'),
+            output_path=env.get('SPARK_OUTPUT_PATH', cls.output_path),
+            checkpoint_path=env.get('SPARK_CHECKPOINT_PATH',
+                                    cls.checkpoint_path),
+            trigger_interval=env.get('SPARK_TRIGGER_INTERVAL', '10 seconds'),
+            max_offsets_per_trigger=int(max_offsets) if max_offsets else None,
+            jdbc_url=f"jdbc:postgresql://{db_host}:{db_port}/{db_name}",
+            jdbc_user=env.get('DB_USER', 'postgres'),
+            jdbc_password=env.get('DB_PASSWORD', 'postgres'),
+            reporting_schema=env.get('SPARK_REPORTING_SCHEMA', 'reporting'),
+            order_watermark=env.get('SPARK_ORDER_WATERMARK', '10 minutes'),
+            revenue_window=env.get('SPARK_REVENUE_WINDOW', '1 minute'),
+            shuffle_partitions=int(env.get('SPARK_SHUFFLE_PARTITIONS', 8)),
+            join_watermark=env.get('SPARK_JOIN_WATERMARK', '10 minutes'),
+            state_store=env.get('SPARK_STATE_STORE', 'rocksdb'),
+            compact_every=int(env.get('SPARK_COMPACT_EVERY', 10)),
+        )
+
+    @property
+    def state_store_provider(self):
+        return STATE_STORE_PROVIDERS[self.state_store]
+
+    def topic(self, table):
+        """
+        The Debezium topic of a ``public`` table.
+        """
+        return f"{self.topic_prefix}.public.{table}"
+
+    def checkpoint_location(self, query_name):
+        return f"{self.checkpoint_path.rstrip('/')}/{query_name}"
+
+    def output_location(self, query_name):
+        return f"{self.output_path.rstrip('/')}/{query_name}"
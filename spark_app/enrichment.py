@@ -0,0 +1,211 @@
+"""
+Orders enriched with the current state of their customer.
+
+The users change stream and the created orders are unioned and grouped by
+customer id into ``applyInPandasWithState``. The state of a customer is its
+latest row image (name, email, city) - the users topic compacted to one
+row per key - so its size follows the number of live users, not the
+number of changes; a delete removes it. Each order is emitted with the
+customer state current at that point of the stream.
+
+An order can reach the job before its customer (the two topics are read
+independently). It is kept in the customer's state until the customer
+arrives or until the watermark on the Kafka timestamps has moved
+``SPARK_JOIN_WATERMARK`` past it, then emitted with ``customer_found``
+false. This bounds the buffered orders by the watermark delay.
+
+Only the functions building DataFrames need ``pyspark``; the state
+transitions are plain Python.
+"""
+import json
+from datetime import date
+
+import pandas as pd
+
+USER_FIELDS = ('name', 'email', 'city')
+ORDER_FIELDS = ('order_id', 'customer_id', 'product', 'quantity',
+                'total_price', 'order_date', 'event_time')
+
+STATE_SCHEMA = ("name STRING, email STRING, city STRING, known BOOLEAN, "
+                "pending STRING")
+OUTPUT_SCHEMA = ("order_id INT, customer_id INT, product STRING, quantity INT, "
+                 "total_price DOUBLE, order_date DATE, event_time TIMESTAMP, "
+                 "customer_found BOOLEAN, customer_name STRING, "
+                 "customer_email STRING, customer_city STRING")
+OUTPUT_COLUMNS = [definition.split()[0]
+                  for definition in OUTPUT_SCHEMA.split(', ')]
+
+
+def enrich(order, user):
+    """
+    An output row of ``order``; ``user`` is None if the customer is unknown.
+    """
+    user = user or {}
+    return {
+        **order,
+        'customer_found': bool(user),
+        'customer_name': user.get('name'),
+        'customer_email': user.get('email'),
+        'customer_city': user.get('city'),
+    }
+
+
+def apply_changes(user, pending, changes):
+    """
+    Fold the changes of one customer into its state.
+
+    Parameters
+    ----------
+    user : dict or None
+        The known row image of the customer.
+    pending : list of dict
+        Orders waiting for the customer.
+    changes : iterable of dict
+        Rows of the unioned stream in stream order; ``kind`` is 'user'
+        (with ``op`` and the user fields) or 'order' (with the order fields).
+
+    Returns
+    -------
+    tuple
+        ``(user, pending, emitted)``: the new state and the enriched orders.
+    """
+    pending = list(pending)
+    emitted = []
+    for change in changes:
+        if change['kind'] == 'user':
+            if change['op'] == 'd':
+                user = None
+                continue
+            user = {field: change[field] for field in USER_FIELDS}
+            emitted.extend(enrich(order, user) for order in pending)
+            pending = []
+        elif user is None:
+            pending.append({field: change[field] for field in ORDER_FIELDS})
+        else:
+            emitted.append(
+                enrich({field: change[field] for field in ORDER_FIELDS}, user))
+    return user, pending, emitted
+
+
+def encode_pending(pending):
+    return json.dumps([
+        {**order,
+         'order_date': order['order_date'] and order['order_date'].isoformat(),
+         'event_time': order['event_time'].isoformat()}
+        for order in pending
+    ])
+
+
+def decode_pending(text):
+    # order_date is nullable: the API creates orders without one
+    return [
+        {**order,
+         'order_date': order['order_date'] and date.fromisoformat(
+             order['order_date']),
+         'event_time': pd.Timestamp(order['event_time'])}
+        for order in json.loads(text or '[]')
+    ]
+
+
+def _records(frames):
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return []
+    changes = pd.concat(frames).sort_values(
+        ['event_time', 'kafka_offset'], kind='stable')
+    # pandas nulls (NaN/NaT) as None, numbers as Python scalars
+    changes = changes.astype(object).where(changes.notna(), None)
+    records = changes.to_dict('records')
+    for record in records:
+        for field in ('order_id', 'customer_id', 'quantity'):
+            if record.get(field) is not None:
+                record[field] = int(record[field])
+    return records
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=OUTPUT_COLUMNS).astype({
+        'order_id': 'Int32', 'customer_id': 'Int32', 'quantity': 'Int32',
+        'total_price': 'float64', 'customer_found': 'bool',
+    })
+
+
+def customer_state_function(timeout_ms):
+    """
+    Build the ``applyInPandasWithState`` function of the enrichment.
+
+    Parameters
+    ----------
+    timeout_ms : int
+        How long, in event time, an order waits for its customer.
+    """
+    def update(key, frames, state):
+        if state.exists:
+            name, email, city, known, pending = state.get
+            user = ({'name': name, 'email': email, 'city': city}
+                    if known else None)
+            pending = decode_pending(pending)
+        else:
+            user, pending = None, []
+
+        if state.hasTimedOut:
+            emitted = [enrich(order, None) for order in pending]
+            pending = []
+        else:
+            user, pending, emitted = apply_changes(
+                user, pending, _records(frames))
+
+        if user is None and not pending:
+            state.remove()
+        else:
+            user = user or {}
+            state.update((user.get('name'), user.get('email'),
+                          user.get('city'), bool(user),
+                          encode_pending(pending)))
+            if pending:
+                latest = max(order['event_time'] for order in pending)
+                state.setTimeoutTimestamp(max(
+                    state.getCurrentWatermarkMs() + 1,
+                    pd.Timestamp(latest).value // 1_000_000 + timeout_ms))
+        yield _frame(emitted)
+    return update
+
+
+def enriched_orders(users, orders, watermark, timeout_ms):
+    """
+    Join the created orders with the current state of their customers.
+
+    Parameters
+    ----------
+    users : DataFrame
+        User changes: ``customer_id``, ``op``, the user fields,
+        ``event_time`` and ``kafka_offset``.
+    orders : DataFrame
+        Created orders: the ``Order`` columns, ``event_time`` and
+        ``kafka_offset``.
+    watermark : str
+        Watermark delay on ``event_time``, e.g. '10 minutes'.
+    timeout_ms : int
+        ``watermark`` in milliseconds.
+
+    Returns
+    -------
+    DataFrame
+        One row per order with the ``customer_*`` columns of
+        ``OUTPUT_SCHEMA``.
+    """
+    from pyspark.sql.functions import lit
+
+    changes = users.withColumn('kind', lit('user')).unionByName(
+        orders.withColumnRenamed('id', 'order_id')
+              .withColumn('kind', lit('order')),
+        allowMissingColumns=True)
+    return changes \
+        .withWatermark('event_time', watermark) \
+        .groupBy('customer_id') \
+        .applyInPandasWithState(
+            customer_state_function(timeout_ms),
+            outputStructType=OUTPUT_SCHEMA,
+            stateStructType=STATE_SCHEMA,
+            outputMode='append',
+            timeoutConf='EventTimeTimeout')
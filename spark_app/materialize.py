@@ -0,0 +1,313 @@
+"""
+Current-state tables materialized from the change streams.
+
+Every change event is interpreted by its ``op``: creates (``c``), snapshot
+reads (``r``) and updates (``u``) carry the new row in ``after``; deletes
+(``d``) have a null ``after`` and identify the row through the primary key
+in ``before``. ``change_rows`` turns the events into rows of the table with
+a ``deleted`` flag, and each micro-batch is merged into a table holding one
+row per live key (the latest change of every key wins, by Kafka offset):
+
+* ``jdbc`` – ``<reporting_schema>.<table>_current`` in Postgres: the batch
+  goes to a staging table, then one transaction deletes the deleted keys
+  and upserts the others. Every ``SPARK_COMPACT_EVERY`` batches the table
+  is vacuumed, so the space of deleted and updated row versions is reused.
+* ``parquet`` – ``<output_path>/<table>_current``, a Delta-like layout on
+  plain Parquet: each batch appends its reduced changes under
+  ``changes/batch_id=<n>``, and once ``SPARK_COMPACT_EVERY`` change batches
+  have accumulated they are folded into a new ``snapshot-<n>`` of the live
+  rows, after which the folded changes and older snapshots are removed.
+  The files stay proportional to the live rows instead of the change
+  volume. ``read_current_state`` plans the files once and reads them
+  lazily, so it is not isolated from a concurrent compaction, which may
+  delete the files it planned: read between compactions, or retry a read
+  that fails on a missing file.
+
+A replayed batch rewrites the same changes directory or the same upserts,
+so both targets are idempotent under the checkpoint's retries.
+"""
+import re
+from logging import getLogger
+
+from spark_app.sinks import (
+    execute_jdbc,
+    latest_per_key,
+    qualified_table,
+    upsert_statements,
+    write_staging,
+)
+
+logger = getLogger(__name__)
+
+OPS = ('c', 'u', 'd', 'r')
+CHANGES_DIR = 'changes'
+SNAPSHOT_PREFIX = 'snapshot-'
+_SNAPSHOT_NAME = re.compile(rf'{SNAPSHOT_PREFIX}(\d+)$')
+_CHANGES_NAME = re.compile(r'batch_id=(\d+)$')
+
+
+def primary_key(table):
+    return [column.name for column in table.primary_key.columns]
+
+
+def change_rows(changes, table):
+    """
+    Rows of ``table`` with a ``deleted`` flag from parsed change events.
+
+    Parameters
+    ----------
+    changes : DataFrame
+        Parsed events: a ``data`` envelope column and ``kafka_offset``.
+    table : Table
+        The table of the events.
+
+    Returns
+    -------
+    DataFrame
+        The table columns (keys from ``before`` for deletes), ``deleted``
+        and ``kafka_offset``. Events with other ops (truncate, messages)
+        are dropped.
+    """
+    from pyspark.sql.functions import coalesce, col
+
+    from spark_app.schemas import row_columns
+
+    keys = primary_key(table)
+    columns = [
+        coalesce(col(f"data.after.{column.name}"),
+                 col(f"data.before.{column.name}")).alias(column.name)
+        if column.name in keys else value
+        for column, value in zip(table.columns,
+                                 row_columns(table, "data.after"))
+    ]
+    return changes \
+        .where(col("data.op").isin(*OPS)) \
+        .select(*columns,
+                (col("data.op") == "d").alias("deleted"),
+                "kafka_offset")
+
+
+def _latest_changes(batch_df, keys):
+    return latest_per_key(batch_df, keys, ['kafka_offset']).drop('kafka_offset')
+
+
+def jdbc_merge(config, table, keys, compact_every):
+    """
+    Build the ``foreachBatch`` function merging changes into Postgres.
+    """
+    def merge_batch(batch_df, batch_id):
+        if batch_df.isEmpty():
+            return
+        spark = batch_df.sparkSession
+        batch_df = _latest_changes(batch_df, keys)
+        write_staging(batch_df, config, table)
+        columns = [column for column in batch_df.columns if column != 'deleted']
+        execute_jdbc(spark, config, upsert_statements(
+            config.reporting_schema, table, columns, keys,
+            deleted_column='deleted'))
+        logger.info(f"Batch {batch_id} merged into "
+                    f"{config.reporting_schema}.{table}")
+        if batch_id % compact_every == 0:
+            target = qualified_table(config.reporting_schema, table)
+            execute_jdbc(spark, config, [f"VACUUM (ANALYZE) {target}"],
+                         autocommit=True)
+    return merge_batch
+
+
+def snapshot_id(name):
+    """
+    The batch id of a snapshot directory name, or None for other names.
+    """
+    match = _SNAPSHOT_NAME.match(name)
+    return int(match.group(1)) if match else None
+
+
+def changes_batch_id(name):
+    """
+    The batch id of a changes directory name, or None for other names.
+    """
+    match = _CHANGES_NAME.match(name)
+    return int(match.group(1)) if match else None
+
+
+def plan_state(snapshot_names, changes_names):
+    """
+    Decide which files make up the current state.
+
+    Parameters
+    ----------
+    snapshot_names : iterable of str
+        Completed snapshot directories (with a ``_SUCCESS`` marker).
+    changes_names : iterable of str
+        Directories under ``changes/``.
+
+    Returns
+    -------
+    tuple
+        ``(snapshot, pending, stale)``: the id of the latest snapshot (None
+        if there is none), the batch ids of the changes after it, and the
+        directory names (``snapshot-<n>`` or ``changes/batch_id=<n>``)
+        already folded into that snapshot.
+    """
+    snapshots = sorted(i for i in map(snapshot_id, snapshot_names)
+                       if i is not None)
+    batches = sorted(i for i in map(changes_batch_id, changes_names)
+                     if i is not None)
+    latest = snapshots[-1] if snapshots else None
+    if latest is None:
+        return None, batches, []
+    stale = [f"{SNAPSHOT_PREFIX}{i}" for i in snapshots[:-1]]
+    stale += [f"{CHANGES_DIR}/batch_id={i}" for i in batches if i <= latest]
+    return latest, [i for i in batches if i > latest], stale
+
+
+class ParquetState:
+    """
+    A current-state table in the snapshot + changes layout on Parquet.
+
+    Parameters
+    ----------
+    spark : SparkSession
+        The session used for reads, writes and file system access.
+    location : str
+        Root directory of the table.
+    keys : sequence of str
+        The primary key columns.
+    """
+
+    def __init__(self, spark, location, keys):
+        self.spark = spark
+        self.location = location.rstrip('/')
+        self.keys = list(keys)
+        jvm = spark.sparkContext._jvm
+        self._path = jvm.org.apache.hadoop.fs.Path
+        self._fs = self._path(self.location).getFileSystem(
+            spark.sparkContext._jsc.hadoopConfiguration())
+
+    def _list(self, path, marker=None):
+        path = self._path(path)
+        if not self._fs.exists(path):
+            return []
+        return [status.getPath().getName()
+                for status in self._fs.listStatus(path)
+                if status.isDirectory() and (
+                    marker is None
+                    or self._fs.exists(self._path(status.getPath(), marker)))]
+
+    def plan(self):
+        return plan_state(self._list(self.location, '_SUCCESS'),
+                          self._list(f"{self.location}/{CHANGES_DIR}"))
+
+    def write_changes(self, batch_df, batch_id):
+        batch_df.write.mode('overwrite').parquet(
+            f"{self.location}/{CHANGES_DIR}/batch_id={batch_id}")
+
+    def read(self):
+        """
+        The live rows: the latest snapshot with the later changes applied.
+
+        Returns
+        -------
+        DataFrame or None
+            None while nothing has been written.
+        """
+        from pyspark.sql.functions import col, lit
+
+        snapshot, pending, _ = self.plan()
+        parts = []
+        if snapshot is not None:
+            parts.append(
+                self.spark.read.parquet(
+                    f"{self.location}/{SNAPSHOT_PREFIX}{snapshot}")
+                .withColumn('deleted', lit(False))
+                .withColumn('batch_id', lit(snapshot)))
+        if pending:
+            parts.append(
+                self.spark.read
+                .option('basePath', f"{self.location}/{CHANGES_DIR}")
+                .parquet(*(f"{self.location}/{CHANGES_DIR}/batch_id={i}"
+                           for i in pending)))
+        if not parts:
+            return None
+        rows = parts[0]
+        for part in parts[1:]:
+            rows = rows.unionByName(part)
+        return latest_per_key(rows, self.keys, ['batch_id']) \
+            .where(~col('deleted')) \
+            .drop('deleted', 'batch_id')
+
+    def compact(self, batch_id):
+        """
+        Fold the changes up to ``batch_id`` into ``snapshot-<batch_id>`` and
+        remove the files it replaces.
+        """
+        target = f"{self.location}/{SNAPSHOT_PREFIX}{batch_id}"
+        # a retried batch may find its snapshot complete; only clean up then
+        if not self._fs.exists(self._path(target, '_SUCCESS')):
+            self.read().write.mode('overwrite').parquet(target)
+        _, _, stale = self.plan()
+        for name in stale:
+            self._fs.delete(self._path(f"{self.location}/{name}"), True)
+        logger.info(f"Compacted {self.location} into {target}, "
+                    f"removed {len(stale)} directories")
+
+
+def read_current_state(spark, location, keys):
+    """
+    The live rows of a Parquet current-state table, for downstream readers.
+
+    Not isolated from a running compaction: a read that fails because a
+    planned file was removed should be retried.
+    """
+    return ParquetState(spark, location, keys).read()
+
+
+def parquet_merge(location, keys, compact_every):
+    """
+    Build the ``foreachBatch`` function merging changes into Parquet.
+    """
+    def merge_batch(batch_df, batch_id):
+        if batch_df.isEmpty():
+            return
+        state = ParquetState(batch_df.sparkSession, location, keys)
+        state.write_changes(_latest_changes(batch_df, keys), batch_id)
+        _, pending, _ = state.plan()
+        if len(pending) >= compact_every:
+            state.compact(batch_id)
+    return merge_batch
+
+
+def start_materialization(changes, table, config):
+    """
+    Start the query maintaining the current state of ``table``.
+
+    Parameters
+    ----------
+    changes : DataFrame
+        The table's change rows, see ``change_rows``.
+    table : Table
+        The materialized table.
+    config : StreamingConfig
+        Sink, trigger, location and compaction settings.
+
+    Returns
+    -------
+    StreamingQuery
+        The started query, named ``<table>_current``.
+    """
+    name = f"{table.name}_current"
+    keys = primary_key(table)
+    writer = (changes.writeStream
+              .queryName(name)
+              .trigger(processingTime=config.trigger_interval)
+              .option('checkpointLocation', config.checkpoint_location(name)))
+    if config.sink == 'jdbc':
+        writer = writer.foreachBatch(
+            jdbc_merge(config, name, keys, config.compact_every))
+    elif config.sink == 'parquet':
+        writer = writer.foreachBatch(parquet_merge(
+            config.output_location(name), keys, config.compact_every))
+    else:
+        writer = writer.format('console').option('truncate', False)
+    logger.info(f"Starting query {name} on the {config.sink} sink")
+    return writer.start()
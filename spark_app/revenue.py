@@ -0,0 +1,213 @@
+"""
+Stateful running revenue of the orders stream.
+
+Revenue here means revenue as created: the stream holds the create (``c``)
+and snapshot (``r``) events only, so every order counts once with the
+values it was created with, and later updates or deletes of an order do
+not change the totals. Orders without an ``order_date`` are left out.
+
+The orders are first aggregated per key (customer or product),
+``order_date`` and arrival window: a tumbling window of
+``SPARK_REVENUE_WINDOW`` over the Kafka timestamp (``event_time``). The
+watermark is on the arrival time, not on ``order_date``: the Debezium
+snapshot replays the history in id order with dates spread over months, so
+a watermark on the business date would drop every order older than the
+newest date already seen. On arrival time the snapshot is simply a burst of
+recent events, and the state store holds only the arrival windows still
+open for late events instead of growing with the history.
+
+The aggregation runs in append mode, so each window's partial totals are
+emitted exactly once, when the watermark closes it (``SPARK_REVENUE_WINDOW``
+plus ``SPARK_ORDER_WATERMARK`` after it opened), and then reduced to
+running totals per key and day:
+
+* ``jdbc`` – each batch is added to ``<reporting_schema>.<query>``, one row
+  per key and ``order_date``. The batch id is recorded in the same
+  statement (``revenue_batches``), so a replayed batch is not added twice.
+  Resetting the checkpoint restarts the batch ids, so the table and its
+  ``revenue_batches`` rows must be emptied with it.
+* ``parquet`` – the partial rows are appended, partitioned by
+  ``order_date``; ``read_revenue_totals`` sums them into the totals.
+
+Only events arriving more than ``SPARK_ORDER_WATERMARK`` of Kafka time
+behind the newest one are dropped, which Kafka's near-monotonic timestamps
+make practically impossible.
+"""
+from logging import getLogger
+
+from spark_app.sinks import (
+    execute_jdbc,
+    qualified_table,
+    quote_identifier,
+    staging_table,
+    start_query,
+    write_staging,
+)
+
+logger = getLogger(__name__)
+
+# query name -> grouping column
+REVENUE_KEYS = {
+    'customer_revenue': 'customer_id',
+    'product_revenue': 'product',
+}
+MEASURES = ('orders', 'quantity', 'revenue')
+APPLIED_BATCHES = 'revenue_batches'
+
+
+def daily_revenue(orders, key, watermark, arrival_window):
+    """
+    Orders, quantity and revenue per ``key``, order date and arrival window.
+
+    Parameters
+    ----------
+    orders : DataFrame
+        Streaming orders with ``order_date`` and ``event_time`` columns.
+    key : str
+        The grouping column.
+    watermark : str
+        How late, in Kafka time, an order may arrive, e.g. '10 minutes'.
+    arrival_window : str
+        Length of the arrival windows, e.g. '1 minute'.
+
+    Returns
+    -------
+    DataFrame
+        ``key, order_date, arrival_window, orders, quantity, revenue``, where
+        ``arrival_window`` is the start of the window.
+    """
+    from pyspark.sql.functions import col, count, sum as sum_, window
+
+    # an order without a date has no day to count in
+    return orders \
+        .where(col("order_date").isNotNull()) \
+        .withWatermark("event_time", watermark) \
+        .groupBy(key, "order_date", window("event_time", arrival_window)) \
+        .agg(count("id").alias("orders"),
+             sum_("quantity").alias("quantity"),
+             sum_("total_price").alias("revenue")) \
+        .select(key, "order_date",
+                col("window.start").alias("arrival_window"),
+                *MEASURES)
+
+
+def totals(partials, key):
+    """
+    Sum partial rows of ``daily_revenue`` into one row per key and day.
+    """
+    from pyspark.sql.functions import sum as sum_
+
+    return partials \
+        .groupBy(key, "order_date") \
+        .agg(*(sum_(measure).alias(measure) for measure in MEASURES))
+
+
+def fold_statements(schema, table, key, batch_id):
+    """
+    SQL adding ``<table>_staging`` to the running totals in ``table`` once.
+
+    The batch id is inserted into ``revenue_batches`` in the same statement
+    as the totals, and the totals are added only if that insert happened,
+    so a batch replayed after a failure is skipped.
+
+    Parameters
+    ----------
+    schema : str
+        The reporting schema holding the tables.
+    table : str
+        The totals table, also the name recorded with the batch ids.
+    key : str
+        The grouping column; the totals are unique per key and order date.
+    batch_id : int
+        The micro-batch being added.
+
+    Returns
+    -------
+    list of str
+        Statements to run in one transaction, in order.
+    """
+    target = qualified_table(schema, table)
+    staging = qualified_table(schema, staging_table(table))
+    batches = qualified_table(schema, APPLIED_BATCHES)
+    columns = [key, 'order_date', *MEASURES]
+    column_list = ', '.join(quote_identifier(column) for column in columns)
+    key_list = f"{quote_identifier(key)}, {quote_identifier('order_date')}"
+    additions = ', '.join(
+        f"{quote_identifier(measure)} = t.{quote_identifier(measure)} "
+        f"+ EXCLUDED.{quote_identifier(measure)}"
+        for measure in MEASURES)
+    name = table.replace("'", "''")
+    return [
+        f"CREATE TABLE IF NOT EXISTS {target} AS "
+        f"SELECT {column_list} FROM {staging} WITH NO DATA",
+        f"CREATE UNIQUE INDEX IF NOT EXISTS "
+        f"{quote_identifier(table + '_total_key')} ON {target} ({key_list})",
+        f"CREATE TABLE IF NOT EXISTS {batches} ("
+        f"query text NOT NULL, batch_id bigint NOT NULL, "
+        f"PRIMARY KEY (query, batch_id))",
+        f"WITH applied AS ("
+        f"INSERT INTO {batches} (query, batch_id) VALUES ('{name}', {batch_id}) "
+        f"ON CONFLICT DO NOTHING RETURNING batch_id) "
+        f"INSERT INTO {target} AS t ({column_list}) "
+        f"SELECT {column_list} FROM {staging} "
+        f"WHERE EXISTS (SELECT 1 FROM applied) "
+        f"ON CONFLICT ({key_list}) DO UPDATE SET {additions}",
+    ]
+
+
+def jdbc_fold(config, table, key):
+    """
+    Build the ``foreachBatch`` function adding closed windows to the totals.
+    """
+    def fold_batch(batch_df, batch_id):
+        if batch_df.isEmpty():
+            return
+        batch_df = totals(batch_df, key)
+        write_staging(batch_df, config, table)
+        execute_jdbc(batch_df.sparkSession, config, fold_statements(
+            config.reporting_schema, table, key, batch_id))
+        logger.info(f"Batch {batch_id} added to "
+                    f"{config.reporting_schema}.{table}")
+    return fold_batch
+
+
+def read_revenue_totals(spark, location, key):
+    """
+    Running totals per key and day from the Parquet output of a query.
+    """
+    return totals(spark.read.parquet(location), key)
+
+
+def start_revenue_query(orders, name, key, config):
+    """
+    Start the query maintaining the running revenue per ``key``.
+
+    Parameters
+    ----------
+    orders : DataFrame
+        The created orders, see ``spark_app.streams.created_orders_stream``.
+    name : str
+        Query name, and the table or directory it writes.
+    key : str
+        The grouping column.
+    config : StreamingConfig
+        Sink, trigger, watermark and window settings.
+
+    Returns
+    -------
+    StreamingQuery
+        The started query.
+    """
+    partials = daily_revenue(orders, key, config.order_watermark,
+                             config.revenue_window)
+    if config.sink != 'jdbc':
+        return start_query(partials, name, config,
+                           partition_by=["order_date"])
+    logger.info(f"Starting query {name} on the jdbc sink")
+    return (partials.writeStream
+            .queryName(name)
+            .outputMode('append')
+            .trigger(processingTime=config.trigger_interval)
+            .option('checkpointLocation', config.checkpoint_location(name))
+            .foreachBatch(jdbc_fold(config, name, key))
+            .start())
@@ -0,0 +1,158 @@
+"""
+Spark schemas of the Debezium change events, derived from the models.
+
+``envelope_schema`` builds the schema of a table's change event
+(``before``, ``after``, ``op``, ``ts_ms``) from its SQLAlchemy ``Table``, so
+the parsed fields follow ``database/models`` instead of a hand-written copy
+that can drift: a field missing from the schema is never decoded, and a
+field that does not exist in the table would only ever be null.
+
+The field types follow Debezium's JSON encoding for PostgreSQL with the
+default ``time.precision.mode`` (see ``DEBEZIUM_TYPES``): dates arrive as
+days since the epoch and timestamps without time zone as microseconds
+since the epoch. ``row_columns`` decodes those back into Spark dates and
+timestamps.
+
+The schemas are built as Spark's JSON schema representation, so this
+module imports ``pyspark`` only in the functions returning Spark objects.
+"""
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    SmallInteger,
+    String,
+)
+
+# import every model module, so Base.metadata holds all tables
+import database.models.order_stats  # noqa: F401
+import database.models.orders  # noqa: F401
+import database.models.seed_manifest  # noqa: F401
+import database.models.users  # noqa: F401
+from database.models.base import Base
+
+# SQLAlchemy type -> Spark type of its Debezium JSON value; subclasses
+# first (BigInteger and SmallInteger are Integers, Float is a Numeric)
+DEBEZIUM_TYPES = (
+    (Boolean, 'boolean'),
+    (SmallInteger, 'short'),
+    (BigInteger, 'long'),
+    (Integer, 'integer'),
+    (Float, 'double'),
+    (Date, 'integer'),          # io.debezium.time.Date: days since epoch
+    (DateTime, 'long'),         # io.debezium.time.MicroTimestamp
+    (String, 'string'),
+)
+
+
+def debezium_type(column):
+    """
+    The Spark type name of ``column`` as encoded by Debezium.
+
+    Raises
+    ------
+    ValueError
+        If the column type has no mapping, e.g. ``Numeric``, which Debezium
+        encodes as base64 bytes by default.
+    """
+    column_type = column.type
+    if isinstance(column_type, DateTime) and column_type.timezone:
+        return 'string'         # io.debezium.time.ZonedTimestamp, ISO 8601
+    if isinstance(column_type, Float) and column_type.precision is not None \
+            and column_type.precision <= 24:
+        return 'float'          # REAL
+    for sqlalchemy_type, spark_type in DEBEZIUM_TYPES:
+        if isinstance(column_type, sqlalchemy_type):
+            return spark_type
+    raise ValueError(
+        f"No Debezium mapping for column {column.table.name}.{column.name} "
+        f"of type {column_type!r}.")
+
+
+def _field(name, spark_type):
+    # every field nullable: a delete's ``before`` carries only the primary
+    # key unless the table has REPLICA IDENTITY FULL
+    return {'name': name, 'type': spark_type, 'nullable': True, 'metadata': {}}
+
+
+def row_schema_json(table):
+    """
+    Schema of a row image of ``table`` in Spark's JSON representation.
+    """
+    return {
+        'type': 'struct',
+        'fields': [_field(column.name, debezium_type(column))
+                   for column in table.columns],
+    }
+
+
+def envelope_schema_json(table):
+    """
+    Schema of a change event of ``table`` in Spark's JSON representation.
+    """
+    row = row_schema_json(table)
+    return {
+        'type': 'struct',
+        'fields': [
+            _field('before', row),
+            _field('after', row),
+            _field('op', 'string'),
+            _field('ts_ms', 'long'),
+        ],
+    }
+
+
+def envelope_schemas_json(metadata=Base.metadata):
+    """
+    Change event schemas of every table, keyed by table name.
+    """
+    return {name: envelope_schema_json(table)
+            for name, table in metadata.tables.items()}
+
+
+def envelope_schema(table):
+    """
+    The change event schema of ``table`` as a Spark ``StructType``.
+    """
+    from pyspark.sql.types import StructType
+
+    return StructType.fromJson(envelope_schema_json(table))
+
+
+def row_columns(table, source):
+    """
+    Spark columns selecting the fields of ``table`` from a parsed row image.
+
+    Parameters
+    ----------
+    table : Table
+        The table of the row image.
+    source : str
+        Path of the row image, e.g. 'data.after'.
+
+    Returns
+    -------
+    list of Column
+        One column per table column, named after it, with Debezium's date
+        and timestamp encodings decoded.
+    """
+    from pyspark.sql.functions import col, date_add, expr, lit
+
+    columns = []
+    for column in table.columns:
+        value = col(f"{source}.{column.name}")
+        column_type = column.type
+        if isinstance(column_type, DateTime):
+            if column_type.timezone:
+                value = value.cast('timestamp')
+            else:
+                path = '.'.join(f"`{part}`"
+                                for part in f"{source}.{column.name}".split('.'))
+                value = expr(f"timestamp_micros({path})")
+        elif isinstance(column_type, Date):
+            value = date_add(lit('1970-01-01').cast('date'), value)
+        columns.append(value.alias(column.name))
+    return columns
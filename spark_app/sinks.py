@@ -0,0 +1,258 @@
+"""
+Output sinks of the streaming queries.
+
+``start_query`` starts a streaming DataFrame on the sink selected by
+``StreamingConfig.sink``:
+
+* ``console`` – prints each micro-batch; for debugging only, printing is
+  slow enough to become the bottleneck of the job.
+* ``parquet`` – appends to partitioned Parquet files under
+  ``<output_path>/<query name>``, exactly once through the checkpoint.
+* ``jdbc`` – upserts each micro-batch into ``<reporting_schema>.<table>`` in
+  Postgres with ``foreachBatch``: the batch is reduced to the latest row per
+  key, written to a staging table over JDBC and merged with a single
+  ``INSERT ... ON CONFLICT DO UPDATE``. A replayed batch writes the same
+  rows again, so the upsert is idempotent.
+
+Every query uses the processing-time trigger ``trigger_interval`` and its own
+checkpoint directory. The statements are built here as plain SQL and run
+through the Postgres JDBC driver already loaded for the JDBC writer, so the
+Spark image needs no Python database driver. Only the functions touching
+DataFrames need ``pyspark``.
+"""
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+JDBC_DRIVER = 'org.postgresql.Driver'
+
+
+def quote_identifier(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def qualified_table(schema, table):
+    return f"{quote_identifier(schema)}.{quote_identifier(table)}"
+
+
+def staging_table(table):
+    return f"{table}_staging"
+
+
+def upsert_statements(schema, table, columns, keys, deleted_column=None):
+    """
+    SQL merging ``<table>_staging`` into ``table``.
+
+    The target table is created on first use with ``columns`` typed as in
+    the staging table (which the JDBC writer creates from the DataFrame
+    schema) and a unique index on ``keys``, the conflict target of the
+    upsert. With ``deleted_column``, staging rows flagged by it delete their
+    key from the target instead of being upserted.
+
+    Parameters
+    ----------
+    schema : str
+        The reporting schema holding both tables.
+    table : str
+        The target table.
+    columns : sequence of str
+        The columns to copy.
+    keys : sequence of str
+        The columns identifying a row.
+    deleted_column : str, optional
+        Boolean staging column marking deleted keys; not copied.
+
+    Returns
+    -------
+    list of str
+        Statements to run in one transaction, in order.
+
+    Raises
+    ------
+    ValueError
+        If ``keys`` is empty or not a subset of ``columns``.
+    """
+    if not keys or not set(keys) <= set(columns):
+        raise ValueError(
+            f"Upsert keys {list(keys)} must be a non-empty subset of the "
+            f"columns {list(columns)}.")
+    target = qualified_table(schema, table)
+    staging = qualified_table(schema, staging_table(table))
+    column_list = ', '.join(quote_identifier(column) for column in columns)
+    key_list = ', '.join(quote_identifier(key) for key in keys)
+    updates = [f"{quote_identifier(column)} = EXCLUDED.{quote_identifier(column)}"
+               for column in columns if column not in keys]
+    on_conflict = (f"DO UPDATE SET {', '.join(updates)}" if updates
+                   else "DO NOTHING")
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {target} AS "
+        f"SELECT {column_list} FROM {staging} WITH NO DATA",
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {quote_identifier(table + '_upsert_key')} "
+        f"ON {target} ({key_list})",
+    ]
+    upserted = ""
+    if deleted_column is not None:
+        deleted = quote_identifier(deleted_column)
+        matches = ' AND '.join(f"t.{quote_identifier(key)} = s.{quote_identifier(key)}"
+                               for key in keys)
+        statements.append(f"DELETE FROM {target} AS t USING {staging} AS s "
+                          f"WHERE {matches} AND s.{deleted}")
+        upserted = f" WHERE NOT {deleted}"
+    statements.append(
+        f"INSERT INTO {target} ({column_list}) "
+        f"SELECT {column_list} FROM {staging}{upserted} "
+        f"ON CONFLICT ({key_list}) {on_conflict}")
+    return statements
+
+
+def execute_jdbc(spark, config, statements, autocommit=False):
+    """
+    Run ``statements`` in one transaction on the reporting database.
+
+    Uses the JVM-side Postgres driver through the Spark gateway.
+    ``autocommit`` runs each statement on its own, as ``VACUUM`` requires.
+    """
+    jvm = spark.sparkContext._jvm
+    properties = jvm.java.util.Properties()
+    properties.setProperty('user', config.jdbc_user)
+    properties.setProperty('password', config.jdbc_password)
+    # instantiate the driver directly: DriverManager does not see jars
+    # added with --packages from the gateway's class loader
+    connection = jvm.org.postgresql.Driver().connect(config.jdbc_url, properties)
+    try:
+        connection.setAutoCommit(autocommit)
+        statement = connection.createStatement()
+        for sql in statements:
+            statement.execute(sql)
+        if not autocommit:
+            connection.commit()
+    except Exception:
+        # in autocommit mode there is no transaction to roll back, and the
+        # driver rejects the call
+        if not autocommit:
+            connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def latest_per_key(df, keys, order_columns):
+    """
+    Keep the row with the greatest ``order_columns`` of every key.
+
+    ``INSERT ... ON CONFLICT`` cannot update one row twice in a statement,
+    so a micro-batch carrying several changes of a row is reduced first.
+    """
+    from pyspark.sql import Window
+    from pyspark.sql import functions as F
+
+    window = Window.partitionBy(*keys).orderBy(
+        *(F.col(column).desc() for column in order_columns))
+    return (df.withColumn('_row_number', F.row_number().over(window))
+            .where(F.col('_row_number') == 1)
+            .drop('_row_number'))
+
+
+def write_staging(batch_df, config, table):
+    """
+    Replace the rows of ``<reporting_schema>.<table>_staging`` with a batch.
+    """
+    execute_jdbc(batch_df.sparkSession, config, [
+        f"CREATE SCHEMA IF NOT EXISTS {quote_identifier(config.reporting_schema)}"])
+    (batch_df.write
+     .format('jdbc')
+     .option('url', config.jdbc_url)
+     .option('driver', JDBC_DRIVER)
+     .option('user', config.jdbc_user)
+     .option('password', config.jdbc_password)
+     .option('dbtable', f"{config.reporting_schema}.{staging_table(table)}")
+     # keep the staging table (and its column types) between batches
+     .option('truncate', 'true')
+     .mode('overwrite')
+     .save())
+
+
+def jdbc_upsert(config, table, keys, order_columns):
+    """
+    Build the ``foreachBatch`` function upserting into ``table``.
+
+    Parameters
+    ----------
+    config : StreamingConfig
+        Connection settings and reporting schema.
+    table : str
+        Target table in ``config.reporting_schema``.
+    keys : sequence of str
+        The columns identifying a row.
+    order_columns : sequence of str
+        Columns ordering the changes of one key, latest greatest. Empty when
+        a batch holds at most one row per key (aggregations in update mode).
+    """
+    def write_batch(batch_df, batch_id):
+        # change events without a row image (deletes) have null keys
+        batch_df = batch_df.dropna(subset=list(keys))
+        if batch_df.isEmpty():
+            return
+        if order_columns:
+            batch_df = latest_per_key(batch_df, keys, order_columns)
+        write_staging(batch_df, config, table)
+        execute_jdbc(batch_df.sparkSession, config, upsert_statements(
+            config.reporting_schema, table, batch_df.columns, keys))
+        logger.info(f"Batch {batch_id} upserted into "
+                    f"{config.reporting_schema}.{table}")
+    return write_batch
+
+
+def start_query(df, name, config, table=None, keys=None, order_columns=(),
+                partition_by=(), output_mode='append'):
+    """
+    Start a streaming query writing ``df`` to the configured sink.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The streaming DataFrame.
+    name : str
+        Query name; also names its checkpoint and Parquet directories.
+    config : StreamingConfig
+        Sink, trigger and location settings.
+    table : str, optional
+        Target table of the JDBC sink, ``name`` by default.
+    keys : sequence of str, optional
+        Columns identifying a row; required by the JDBC sink.
+    order_columns : sequence of str
+        Columns ordering the changes of one key for the JDBC sink.
+    partition_by : sequence of str
+        Partition columns of the Parquet sink.
+    output_mode : str
+        Streaming output mode; the Parquet sink supports only 'append'.
+
+    Returns
+    -------
+    StreamingQuery
+        The started query.
+
+    Raises
+    ------
+    ValueError
+        If the JDBC sink is selected without ``keys``.
+    """
+    writer = (df.writeStream
+              .queryName(name)
+              .outputMode(output_mode)
+              .trigger(processingTime=config.trigger_interval)
+              .option('checkpointLocation', config.checkpoint_location(name)))
+    if config.sink == 'parquet':
+        writer = writer.format('parquet').option(
+            'path', config.output_location(name))
+        if partition_by:
+            writer = writer.partitionBy(*partition_by)
+    elif config.sink == 'jdbc':
+        if not keys:
+            raise ValueError(f"The JDBC sink needs the key columns of {name}.")
+        writer = writer.foreachBatch(
+            jdbc_upsert(config, table or name, keys, order_columns))
+    else:
+        writer = writer.format('console').option('truncate', False)
+    logger.info(f"Starting query {name} on the {config.sink} sink")
+    return writer.start()
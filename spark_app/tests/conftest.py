@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def spark():
+    """
+    A local SparkSession; the tests using it are skipped without ``pyspark``
+    (``pip install -r requirements-spark-test.txt``, needs Java).
+    """
+    sql = pytest.importorskip("pyspark.sql")
+    session = sql.SparkSession.builder \
+        .master("local[2]") \
+        .appName("spark_app-tests") \
+        .config("spark.sql.shuffle.partitions", "2") \
+        .config("spark.sql.session.timeZone", "UTC") \
+        .config("spark.ui.enabled", "false") \
+        .getOrCreate()
+    yield session
+    session.stop()
+
+
+@pytest.fixture
+def stream_source(tmp_path):
+    """
+    Build a function returning ``(stream, write)``: a streaming DataFrame
+    over a new directory and a function adding rows to it as a Parquet file.
+    """
+    def source(spark, name, schema):
+        path = tmp_path / name
+        path.mkdir()
+
+        def write(*rows):
+            spark.createDataFrame(list(rows), schema) \
+                .coalesce(1).write.mode("append").parquet(str(path))
+        return spark.readStream.schema(schema).parquet(str(path)), write
+    return source
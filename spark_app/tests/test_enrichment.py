@@ -0,0 +1,126 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from spark_app.enrichment import (
+    OUTPUT_COLUMNS,
+    _frame,
+    _records,
+    apply_changes,
+    decode_pending,
+    encode_pending,
+    enriched_orders,
+)
+
+USERS_SCHEMA = ("customer_id INT, op STRING, name STRING, email STRING, "
+                "city STRING, event_time TIMESTAMP, kafka_offset LONG")
+ORDERS_SCHEMA = ("id INT, customer_id INT, product STRING, quantity INT, "
+                 "total_price DOUBLE, order_date DATE, event_time TIMESTAMP, "
+                 "kafka_offset LONG")
+
+ANN = {"kind": "user", "op": "c", "customer_id": 1, "name": "Ann",
+       "email": "ann@a.com", "city": "Warsaw"}
+
+
+def order(order_id, event_time="2025-01-01 10:00:00"):
+    return {"kind": "order", "order_id": order_id, "customer_id": 1,
+            "product": "Book", "quantity": 2, "total_price": 20.0,
+            "order_date": date(2025, 1, 1),
+            "event_time": pd.Timestamp(event_time)}
+
+
+def test_order_of_known_customer_is_enriched():
+    user, pending, emitted = apply_changes(None, [], [ANN, order(10)])
+
+    assert user == {"name": "Ann", "email": "ann@a.com", "city": "Warsaw"}
+    assert pending == []
+    assert [(row["order_id"], row["customer_found"], row["customer_city"])
+            for row in emitted] == [(10, True, "Warsaw")]
+
+
+def test_order_before_its_customer_waits_in_state():
+    user, pending, emitted = apply_changes(None, [], [order(10)])
+    assert (user, emitted) == (None, [])
+    assert [row["order_id"] for row in pending] == [10]
+
+    user, pending, emitted = apply_changes(user, pending, [ANN])
+    assert pending == []
+    assert [(row["order_id"], row["customer_name"]) for row in emitted] == [
+        (10, "Ann")]
+
+
+def test_updates_change_later_orders_and_deletes_drop_the_state():
+    moved = {**ANN, "op": "u", "city": "Cracow"}
+    deleted = {"kind": "user", "op": "d", "customer_id": 1,
+               "name": None, "email": None, "city": None}
+
+    user, pending, emitted = apply_changes(
+        None, [], [ANN, order(10), moved, order(11), deleted, order(12)])
+
+    assert [row["customer_city"] for row in emitted] == ["Warsaw", "Cracow"]
+    assert user is None
+    assert [row["order_id"] for row in pending] == [12]
+
+
+def test_pending_orders_survive_the_state_encoding():
+    pending = [{key: value for key, value in order(10).items()
+                if key != "kind"}]
+
+    assert decode_pending(encode_pending(pending)) == pending
+    undated = [{**pending[0], "order_date": None}]
+    assert decode_pending(encode_pending(undated)) == undated
+    assert decode_pending(None) == []
+
+
+def test_records_follow_the_stream_order():
+    users = pd.DataFrame([{**ANN, "event_time": pd.Timestamp("2025-01-01 11:00"),
+                           "kafka_offset": 5}])
+    orders = pd.DataFrame([{**order(10, "2025-01-01 10:00"), "kafka_offset": 7}])
+
+    records = _records(iter([users, orders]))
+
+    assert [record["kind"] for record in records] == ["order", "user"]
+    assert records[0]["order_id"] == 10 and records[1]["product"] is None
+    assert _records(iter([])) == []
+
+
+def test_output_frame_has_the_output_columns():
+    frame = _frame([])
+
+    assert list(frame.columns) == OUTPUT_COLUMNS
+    assert "customer_city" in OUTPUT_COLUMNS
+
+
+def test_enriched_orders_stream(spark, stream_source):
+    pytest.importorskip("pyarrow")
+    users, write_users = stream_source(spark, "users", USERS_SCHEMA)
+    orders, write_orders = stream_source(spark, "orders", ORDERS_SCHEMA)
+    query = enriched_orders(users, orders, "10 minutes", 600_000) \
+        .writeStream.format("memory").queryName("enriched") \
+        .outputMode("append").start()
+
+    def at(minute, second=0):
+        return datetime(2025, 1, 1, 10, minute, second)
+
+    try:
+        write_orders((10, 1, "Book", 2, 20.0, date(2025, 1, 1), at(0), 0))
+        query.processAllAvailable()
+        write_users((1, "c", "Ann", "ann@a.com", "Warsaw", at(0, 5), 0))
+        query.processAllAvailable()
+        write_users((1, "u", "Ann", "ann@a.com", "Cracow", at(0, 8), 1))
+        write_orders((11, 1, "Book", 1, 10.0, date(2025, 1, 1), at(0, 10), 1),
+                     (12, 2, "Pen", 1, 5.0, None, at(0, 12), 2))
+        query.processAllAvailable()
+        # later events move the watermark past the wait of order 12
+        write_users((3, "c", "Cy", "cy@a.com", "Gdansk", at(30), 2))
+        query.processAllAvailable()
+        write_users((3, "u", "Cy", "cy@a.com", "Warsaw", at(31), 3))
+        query.processAllAvailable()
+    finally:
+        query.stop()
+
+    rows = spark.table("enriched").collect()
+    assert {row.order_id: (row.customer_found, row.customer_city)
+            for row in rows} == {10: (True, "Warsaw"), 11: (True, "Cracow"),
+                                 12: (False, None)}
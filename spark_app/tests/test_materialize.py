@@ -0,0 +1,105 @@
+import json
+import os
+from datetime import date, datetime
+
+from database.models.orders import Order
+from database.models.seed_manifest import SeedManifest
+from spark_app.materialize import (
+    CHANGES_DIR,
+    change_rows,
+    changes_batch_id,
+    parquet_merge,
+    plan_state,
+    primary_key,
+    read_current_state,
+    snapshot_id,
+)
+
+ORDER_DATE = (date(2025, 1, 1) - date(1970, 1, 1)).days
+
+
+def order(order_id, quantity=1):
+    return {"id": order_id, "customer_id": 1, "product": "Book",
+            "quantity": quantity, "total_price": 10.0 * quantity,
+            "order_date": ORDER_DATE}
+
+
+def changes(spark, first_offset, *events):
+    """
+    Change rows of the orders topic messages ``(op, before, after)``.
+    """
+    from spark_app.streams import parse_changes
+
+    topic = spark.createDataFrame(
+        [(json.dumps({"op": op, "before": before, "after": after,
+                      "ts_ms": 0}), offset, datetime(2025, 1, 1))
+         for offset, (op, before, after) in enumerate(events, first_offset)],
+        "value STRING, offset LONG, timestamp TIMESTAMP")
+    return change_rows(parse_changes(topic, Order.__table__), Order.__table__)
+
+
+def current_quantities(spark, location):
+    return {row.id: row.quantity
+            for row in read_current_state(spark, location, ["id"]).collect()}
+
+
+def listing(path):
+    return sorted(name for name in os.listdir(path)
+                  if not name.startswith("."))
+
+
+def test_primary_key_names_the_merge_keys():
+    assert primary_key(Order.__table__) == ["id"]
+    assert primary_key(SeedManifest.__table__) == ["path"]
+
+
+def test_directory_names():
+    assert snapshot_id("snapshot-12") == 12
+    assert snapshot_id("snapshot-12.tmp") is None
+    assert changes_batch_id("batch_id=7") == 7
+    assert changes_batch_id("_spark_metadata") is None
+
+
+def test_without_a_snapshot_every_change_batch_is_pending():
+    assert plan_state([], ["batch_id=0", "batch_id=1", "_SUCCESS"]) == (
+        None, [0, 1], [])
+
+
+def test_latest_snapshot_replaces_older_snapshots_and_folded_changes():
+    snapshot, pending, stale = plan_state(
+        ["snapshot-4", "snapshot-9"],
+        ["batch_id=8", "batch_id=9", "batch_id=10", "batch_id=11"])
+
+    assert snapshot == 9
+    assert pending == [10, 11]
+    assert stale == ["snapshot-4", "changes/batch_id=8", "changes/batch_id=9"]
+
+
+def test_parquet_merge_applies_every_op_and_compacts(spark, tmp_path):
+    location = tmp_path / "orders_current"
+    merge = parquet_merge(str(location), ["id"], compact_every=2)
+
+    merge(changes(spark, 0,
+                  ("r", None, order(1)),
+                  ("r", None, order(2)),
+                  ("c", None, order(3)),
+                  ("t", None, None)), 0)
+    assert current_quantities(spark, str(location)) == {1: 1, 2: 1, 3: 1}
+
+    # a delete carries only the primary key in ``before``
+    merge(changes(spark, 4,
+                  ("u", order(1), order(1, quantity=4)),
+                  ("u", order(1, quantity=4), order(1, quantity=5)),
+                  ("d", {"id": 2}, None)), 1)
+    assert listing(location) == [CHANGES_DIR, "snapshot-1"]
+    assert listing(location / CHANGES_DIR) == []
+    assert current_quantities(spark, str(location)) == {1: 5, 3: 1}
+
+    batch = changes(spark, 7,
+                    ("u", order(3), order(3, quantity=2)),
+                    ("d", {"id": 3}, None),
+                    ("c", None, order(4)))
+    merge(batch, 2)
+    merge(batch, 2)     # replayed after a failure
+    assert listing(location / CHANGES_DIR) == ["batch_id=2"]
+    assert current_quantities(spark, str(location)) == {1: 5, 4: 1}
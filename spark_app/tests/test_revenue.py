@@ -0,0 +1,92 @@
+from datetime import date, datetime
+
+from spark_app.revenue import (
+    APPLIED_BATCHES,
+    daily_revenue,
+    fold_statements,
+    read_revenue_totals,
+    totals,
+)
+
+ORDERS_SCHEMA = ("id INT, customer_id INT, product STRING, quantity INT, "
+                 "total_price DOUBLE, order_date DATE, event_time TIMESTAMP")
+DAY = date(2025, 1, 1)
+NEXT_DAY = date(2025, 1, 2)
+
+
+def arrived(minute, second=0):
+    return datetime(2025, 3, 1, 10, minute, second)
+
+
+def as_dict(rows):
+    return {(row.customer_id, row.order_date):
+            (row.orders, row.quantity, row.revenue) for row in rows}
+
+
+def test_fold_statements_add_the_batch_to_the_totals_once():
+    create, index, batches, fold = fold_statements(
+        "reporting", "customer_revenue", "customer_id", 7)
+
+    assert create == (
+        'CREATE TABLE IF NOT EXISTS "reporting"."customer_revenue" AS '
+        'SELECT "customer_id", "order_date", "orders", "quantity", "revenue" '
+        'FROM "reporting"."customer_revenue_staging" WITH NO DATA')
+    assert index == (
+        'CREATE UNIQUE INDEX IF NOT EXISTS "customer_revenue_total_key" '
+        'ON "reporting"."customer_revenue" ("customer_id", "order_date")')
+    assert batches.startswith(
+        f'CREATE TABLE IF NOT EXISTS "reporting"."{APPLIED_BATCHES}" (')
+    assert fold == (
+        'WITH applied AS (INSERT INTO "reporting"."revenue_batches" '
+        "(query, batch_id) VALUES ('customer_revenue', 7) "
+        'ON CONFLICT DO NOTHING RETURNING batch_id) '
+        'INSERT INTO "reporting"."customer_revenue" AS t '
+        '("customer_id", "order_date", "orders", "quantity", "revenue") '
+        'SELECT "customer_id", "order_date", "orders", "quantity", "revenue" '
+        'FROM "reporting"."customer_revenue_staging" '
+        'WHERE EXISTS (SELECT 1 FROM applied) '
+        'ON CONFLICT ("customer_id", "order_date") DO UPDATE SET '
+        '"orders" = t."orders" + EXCLUDED."orders", '
+        '"quantity" = t."quantity" + EXCLUDED."quantity", '
+        '"revenue" = t."revenue" + EXCLUDED."revenue"')
+
+
+def test_fold_statements_escape_the_recorded_table_name():
+    fold = fold_statements("reporting", "o'brien", "product", 0)[-1]
+
+    assert "VALUES ('o''brien', 0)" in fold
+
+
+def test_closed_windows_add_up_to_daily_totals(spark, stream_source, tmp_path):
+    orders, write = stream_source(spark, "orders", ORDERS_SCHEMA)
+    query = daily_revenue(orders, "customer_id", "10 minutes", "1 minute") \
+        .writeStream.format("memory").queryName("revenue_partials") \
+        .outputMode("append").start()
+    try:
+        write((1, 1, "Book", 2, 20.0, DAY, arrived(0, 10)),
+              (2, 1, "Pen", 1, 5.0, DAY, arrived(0, 20)),
+              (3, 1, "Book", 1, 10.0, DAY, arrived(1, 30)),
+              (4, 2, "Pen", 3, 15.0, DAY, arrived(0, 30)),
+              (5, 1, "Book", 1, 10.0, None, arrived(0, 40)),
+              (6, 1, "Book", 1, 10.0, NEXT_DAY, arrived(1)))
+        query.processAllAvailable()
+        # later arrivals move the watermark past the first windows
+        write((7, 3, "Pen", 1, 5.0, DAY, arrived(30)))
+        query.processAllAvailable()
+        write((8, 3, "Pen", 1, 5.0, DAY, arrived(31)))
+        query.processAllAvailable()
+    finally:
+        query.stop()
+
+    partials = spark.table("revenue_partials")
+    expected = {(1, DAY): (3, 4, 35.0), (2, DAY): (1, 3, 15.0),
+                (1, NEXT_DAY): (1, 1, 10.0)}
+    # two arrival windows of customer 1 on DAY, the open windows not emitted
+    assert partials.where("customer_id = 1 AND order_date = '2025-01-01'") \
+        .count() == 2
+    assert as_dict(totals(partials, "customer_id").collect()) == expected
+
+    location = str(tmp_path / "customer_revenue")
+    partials.write.partitionBy("order_date").parquet(location)
+    assert as_dict(read_revenue_totals(
+        spark, location, "customer_id").collect()) == expected
@@ -0,0 +1,48 @@
+import pytest
+
+from spark_app.sinks import upsert_statements
+
+
+def test_upsert_statements_merge_staging_into_target():
+    create, index, upsert = upsert_statements(
+        "reporting", "users", ["id", "name", "city"], ["id"])
+
+    assert create == ('CREATE TABLE IF NOT EXISTS "reporting"."users" AS '
+                      'SELECT "id", "name", "city" '
+                      'FROM "reporting"."users_staging" WITH NO DATA')
+    assert index == ('CREATE UNIQUE INDEX IF NOT EXISTS "users_upsert_key" '
+                     'ON "reporting"."users" ("id")')
+    assert upsert == (
+        'INSERT INTO "reporting"."users" ("id", "name", "city") '
+        'SELECT "id", "name", "city" FROM "reporting"."users_staging" '
+        'ON CONFLICT ("id") DO UPDATE SET '
+        '"name" = EXCLUDED."name", "city" = EXCLUDED."city"')
+
+
+def test_upsert_with_only_key_columns_does_nothing_on_conflict():
+    upsert = upsert_statements("reporting", "tags", ["a", "b"], ["a", "b"])[-1]
+
+    assert upsert.endswith('ON CONFLICT ("a", "b") DO NOTHING')
+
+
+def test_deleted_rows_delete_their_key_instead_of_upserting():
+    statements = upsert_statements("reporting", "orders_current",
+                                   ["id", "product"], ["id"],
+                                   deleted_column="deleted")
+
+    assert "deleted" not in statements[0]
+    assert statements[2] == (
+        'DELETE FROM "reporting"."orders_current" AS t '
+        'USING "reporting"."orders_current_staging" AS s '
+        'WHERE t."id" = s."id" AND s."deleted"')
+    assert statements[3] == (
+        'INSERT INTO "reporting"."orders_current" ("id", "product") '
+        'SELECT "id", "product" FROM "reporting"."orders_current_staging" '
+        'WHERE NOT "deleted" '
+        'ON CONFLICT ("id") DO UPDATE SET "product" = EXCLUDED."product"')
+
+
+@pytest.mark.parametrize("keys", [[], ["missing"]])
+def test_upsert_keys_must_be_columns(keys):
+    with pytest.raises(ValueError):
+        upsert_statements("reporting", "users", ["id", "name"], keys)
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import Column, Float, Integer, MetaData, Numeric, Table
+
+from database.models.base import Base
+from database.models.orders import Order
+from database.models.users import User
+from spark_app.schemas import (
+    debezium_type,
+    envelope_schema_json,
+    envelope_schemas_json,
+    row_schema_json,
+)
+
+
+def field_types(schema):
+    return {field["name"]: field["type"] for field in schema["fields"]}
+
+
+def test_user_row_schema_has_exactly_the_model_columns():
+    assert field_types(row_schema_json(User.__table__)) == {
+        "id": "integer", "name": "string", "email": "string", "city": "string",
+    }
+
+
+def test_order_row_schema_uses_debezium_encodings():
+    assert field_types(row_schema_json(Order.__table__)) == {
+        "id": "integer", "customer_id": "integer", "product": "string",
+        "quantity": "integer", "total_price": "double",
+        # io.debezium.time.Date: days since the epoch
+        "order_date": "integer",
+    }
+
+
+def test_envelope_wraps_the_row_images():
+    envelope = envelope_schema_json(Order.__table__)
+    types = field_types(envelope)
+
+    assert list(types) == ["before", "after", "op", "ts_ms"]
+    assert types["before"] == types["after"] == row_schema_json(Order.__table__)
+    assert types["op"] == "string" and types["ts_ms"] == "long"
+    assert all(field["nullable"] for field in envelope["fields"])
+
+
+def test_every_table_gets_a_schema():
+    schemas = envelope_schemas_json()
+
+    assert set(schemas) == set(Base.metadata.tables)
+    assert {"users", "orders", "order_daily_stats", "seed_manifest"} <= set(schemas)
+    seed_manifest = field_types(field_types(schemas["seed_manifest"])["after"])
+    assert seed_manifest["size"] == "long"
+    assert seed_manifest["ingested_at"] == "long"
+
+
+def test_real_and_numeric_columns():
+    table = Table("t", MetaData(), Column("id", Integer, primary_key=True),
+                  Column("ratio", Float(precision=10)),
+                  Column("amount", Numeric(10, 2)))
+
+    assert debezium_type(table.c.ratio) == "float"
+    with pytest.raises(ValueError, match="t.amount"):
+        debezium_type(table.c.amount)
@@ -0,0 +1,72 @@
+import pytest
+
+from spark_app.config import STATE_STORE_PROVIDERS, StreamingConfig, interval_ms
+
+
+def test_defaults_match_docker_compose():
+    config = StreamingConfig.from_env({})
+
+    assert config.bootstrap_servers == "kafka:9092"
+    assert config.sink == "console"
+    assert config.max_offsets_per_trigger is None
+    assert config.state_store_provider == STATE_STORE_PROVIDERS["rocksdb"]
+    assert config.topic("users") == "dbserver1.public.users"
+    assert config.jdbc_url == "jdbc:postgresql://postgres:5432/mydb"
+
+
+def test_from_env_reads_sink_and_batch_settings():
+    config = StreamingConfig.from_env({
+        "SPARK_SINK": "jdbc",
+        "SPARK_TRIGGER_INTERVAL": "5 seconds",
+        "SPARK_MAX_OFFSETS_PER_TRIGGER": "50000",
+        "SPARK_CHECKPOINT_PATH": "/tmp/checkpoints/",
+        "SPARK_REPORTING_SCHEMA": "analytics",
+        "DB_HOST": "db", "DB_PORT": "6543", "DB_NAME": "business",
+        "DB_TOPIC_PREFIX": "cdc",
+        "SPARK_ORDER_WATERMARK": "1 hour",
+        "SPARK_REVENUE_WINDOW": "1 day",
+        "SPARK_SHUFFLE_PARTITIONS": "4",
+        "SPARK_COMPACT_EVERY": "3",
+    })
+
+    assert config.sink == "jdbc"
+    assert config.trigger_interval == "5 seconds"
+    assert config.max_offsets_per_trigger == 50000
+    assert config.checkpoint_location("users") == "/tmp/checkpoints/users"
+    assert config.reporting_schema == "analytics"
+    assert config.jdbc_url == "jdbc:postgresql://db:6543/business"
+    assert config.topic("orders") == "cdc.public.orders"
+    assert config.order_watermark == "1 hour"
+    assert config.revenue_window == "1 day"
+    assert config.shuffle_partitions == 4
+    assert config.compact_every == 3
+
+
+@pytest.mark.parametrize("env", [
+    {"SPARK_SINK": "kafka"},
+    {"SPARK_STARTING_OFFSETS": "newest"},
+    {"SPARK_MAX_OFFSETS_PER_TRIGGER": "0"},
+    {"SPARK_SHUFFLE_PARTITIONS": "0"},
+    {"SPARK_STATE_STORE": "memory"},
+    {"SPARK_COMPACT_EVERY": "0"},
+    {"SPARK_JOIN_WATERMARK": "soon"},
+    {"SPARK_REVENUE_WINDOW": "hourly"},
+])
+def test_invalid_settings_raise(env):
+    with pytest.raises(ValueError):
+        StreamingConfig.from_env(env)
+
+
+@pytest.mark.parametrize("interval, expected", [
+    ("10 minutes", 600_000),
+    ("1 day", 86_400_000),
+    ("1.5 seconds", 1500),
+])
+def test_interval_ms(interval, expected):
+    assert interval_ms(interval) == expected
+
+
+@pytest.mark.parametrize("interval", ["10", "2 weeks", "ten minutes"])
+def test_interval_ms_rejects_unknown_formats(interval):
+    with pytest.raises(ValueError):
+        interval_ms(interval)